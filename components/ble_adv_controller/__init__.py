@@ -24,6 +24,7 @@ from ..ble_adv_handler import (
     validate_ble_adv_device,
 )
 from .const import (
+    CONF_BLE_ADV_ADAPTIVE_VARIANT,
     CONF_BLE_ADV_CANCEL_TIMER,
     CONF_BLE_ADV_CONTROLLER_ID,
     CONF_BLE_ADV_MAX_DURATION,
@@ -84,6 +85,7 @@ CONFIG_SCHEMA = cv.All(
             cv.Optional(CONF_REVERSED, default=False): cv.boolean,
             cv.Optional(CONF_BLE_ADV_SHOW_CONFIG): deprecate_show_config,
             cv.Optional(CONF_BLE_ADV_CANCEL_TIMER, default=True): cv.boolean,
+            cv.Optional(CONF_BLE_ADV_ADAPTIVE_VARIANT, default=False): cv.boolean,
             cv.Optional(CONF_BLE_ADV_ON_EMITTED): validate_automation(
                 {
                     cv.GenerateID(CONF_TRIGGER_ID): cv.declare_id(BleAdvSentrigger),
@@ -112,6 +114,7 @@ async def to_code(config):
     cg.add(var.set_seq_duration(config[CONF_BLE_ADV_SEQ_DURATION]))
     cg.add(var.set_reversed(config[CONF_REVERSED]))
     cg.add(var.set_cancel_timer_on_any_change(config[CONF_BLE_ADV_CANCEL_TIMER]))
+    cg.add(var.set_adaptive_variant(config[CONF_BLE_ADV_ADAPTIVE_VARIANT]))
     for conf in config.get(CONF_BLE_ADV_ON_EMITTED, []):
         trigger = cg.new_Pvariable(conf[CONF_TRIGGER_ID], var)
         await build_automation(
@@ -7,6 +7,123 @@ namespace ble_adv_controller {
 
 static const char *TAG = "ble_adv_controller";
 
+void BleAdvCommandQueue::reserve(size_t capacity) {
+  size_t old_capacity = this->capacity();
+  capacity = std::min(capacity, MAX_CAPACITY);
+  if (capacity <= old_capacity) {
+    return;
+  }
+  this->items_.resize(capacity);
+  this->keys_.resize(capacity);
+  this->prev_.resize(capacity);
+  this->next_.resize(capacity);
+  for (size_t i = old_capacity; i < capacity; ++i) {
+    this->next_[i] = (i + 1 < capacity) ? i + 1 : this->free_head_;
+  }
+  this->free_head_ = old_capacity;
+  // the home slots depend on the table size: index again the pending generic commands
+  size_t table_size = 1;
+  while (table_size < 2 * capacity) {
+    table_size *= 2;
+  }
+  this->index_.reset(table_size);
+  for (Index index = this->head_; index != NONE; index = this->next_[index]) {
+    if (this->keys_[index] != NO_KEY) {
+      this->index_.set(this->index_.find_slot(this->keys_[index], this->keys_.data()), index);
+    }
+  }
+}
+
+uint32_t BleAdvCommandQueue::key(const BleAdvGenCmd &gen_cmd) {
+  return ((uint32_t) gen_cmd.cmd << 16) | ((uint32_t) gen_cmd.ent_type << 8) | gen_cmd.ent_index;
+}
+
+BleAdvQueueItem &BleAdvCommandQueue::push(const BleAdvGenCmd &gen_cmd) {
+  uint32_t key = BleAdvCommandQueue::key(gen_cmd);
+  if (!this->index_.empty_table()) {
+    size_t slot = this->index_.find_slot(key, this->keys_.data());
+    if (this->index_.is_used(slot)) {
+      ESP_LOGD(TAG, "Removing previous pending command");
+      this->replaced_++;
+      this->remove(this->index_.get(slot));
+    }
+  }
+  BleAdvQueueItem &item = this->items_[this->alloc(key)];
+  item = BleAdvQueueItem(gen_cmd);
+  return item;
+}
+
+BleAdvQueueItem &BleAdvCommandQueue::push() {
+  BleAdvQueueItem &item = this->items_[this->alloc(NO_KEY)];
+  item = BleAdvQueueItem();
+  return item;
+}
+
+BleAdvCommandQueue::Index BleAdvCommandQueue::alloc(uint32_t key) {
+  if (this->free_head_ == NONE) {
+    // full: drop the oldest pending custom command, the generic commands being never dropped
+    Index oldest = this->head_;
+    while ((oldest != NONE) && (this->keys_[oldest] != NO_KEY)) {
+      oldest = this->next_[oldest];
+    }
+    if (oldest != NONE) {
+      ESP_LOGW(TAG, "Command queue full (%u commands), oldest pending custom command dropped.",
+               (unsigned) this->capacity());
+      this->dropped_++;
+      this->remove(oldest);
+    } else if (this->capacity() < MAX_CAPACITY) {
+      size_t capacity = std::min(std::max(2 * this->capacity(), MIN_CAPACITY), MAX_CAPACITY);
+      ESP_LOGW(TAG, "Command queue full of generic commands (%u commands), capacity increased to %u.",
+               (unsigned) this->capacity(), (unsigned) capacity);
+      this->reserve(capacity);
+    } else {
+      ESP_LOGE(TAG, "Command queue full (%u commands), oldest pending command dropped.", (unsigned) this->capacity());
+      this->dropped_++;
+      this->remove(this->head_);
+    }
+  }
+  // take a free slot and chain it at the end of the queue
+  Index index = this->free_head_;
+  this->free_head_ = this->next_[index];
+  this->prev_[index] = this->tail_;
+  this->next_[index] = NONE;
+  if (this->tail_ != NONE) {
+    this->next_[this->tail_] = index;
+  } else {
+    this->head_ = index;
+  }
+  this->tail_ = index;
+  this->keys_[index] = key;
+  if (key != NO_KEY) {
+    this->index_.set(this->index_.find_slot(key, this->keys_.data()), index);
+  }
+  this->size_++;
+  return index;
+}
+
+void BleAdvCommandQueue::remove(Index index) {
+  if (this->keys_[index] != NO_KEY) {
+    this->index_.remove(this->keys_[index], this->keys_.data());
+  }
+  // unchain it from the queue and free it, releasing its packets if any
+  Index prev = this->prev_[index];
+  Index next = this->next_[index];
+  if (prev != NONE) {
+    this->next_[prev] = next;
+  } else {
+    this->head_ = next;
+  }
+  if (next != NONE) {
+    this->prev_[next] = prev;
+  } else {
+    this->tail_ = prev;
+  }
+  this->items_[index].params_.clear();
+  this->next_[index] = this->free_head_;
+  this->free_head_ = index;
+  this->size_--;
+}
+
 void BleAdvController::set_min_tx_duration(int tx_duration, int min, int max, int step) {
   this->number_duration_.traits.set_min_value(min);
   this->number_duration_.traits.set_max_value(max);
@@ -27,6 +144,9 @@ void BleAdvController::setup() {
 #endif
   this->select_encoding_.init("Encoding", this->get_name());
   this->number_duration_.init("Duration", this->get_name());
+  // the entities are all registered at this stage
+  this->commands_.reserve(QUEUE_CONTROLLER_COMMANDS + QUEUE_ENTITY_COMMANDS * this->entities_.size() +
+                          QUEUE_CUSTOM_COMMANDS);
 }
 
 void BleAdvController::dump_config() {
@@ -36,6 +156,14 @@ void BleAdvController::dump_config() {
   ESP_LOGCONFIG(TAG, "  Transmission Min Duration: %ld ms", this->get_min_tx_duration());
   ESP_LOGCONFIG(TAG, "  Transmission Max Duration: %ld ms", this->max_tx_duration_);
   ESP_LOGCONFIG(TAG, "  Transmission Sequencing Duration: %ld ms", this->seq_duration_);
+  ESP_LOGCONFIG(TAG, "  Adaptive 'All' Variant: %s", YESNO(this->is_adaptive_variant()));
+  ESP_LOGCONFIG(TAG,
+                "  Advertiser Queue: %" PRIu32 " commands, %" PRIu32 " after deadline, latency avg %" PRIu32
+                " ms / max %" PRIu32 " ms",
+                this->queue_stats_.nb_msgs_, this->queue_stats_.nb_missed_, this->queue_stats_.get_avg_latency(),
+                this->queue_stats_.max_latency_);
+  ESP_LOGCONFIG(TAG, "  Pending Commands: capacity %u, %" PRIu32 " replaced, %" PRIu32 " dropped",
+                (unsigned) this->commands_.capacity(), this->commands_.get_replaced(), this->commands_.get_dropped());
 }
 
 void BleAdvController::controller_command(const BleAdvGenCmd &gen_cmd) {
@@ -65,10 +193,10 @@ void BleAdvController::set_timer(float duration) {  // duration is the number of
 void BleAdvController::custom_cmd(BleAdvEncCmd &enc_cmd) {
   // enqueue a new CUSTOM command and encode the buffer(s)
   ESP_LOGD(TAG, "Controller Custom Command.");
-  this->commands_.emplace_back(CommandType::CUSTOM, EntityType::NOTYPE, 0);
+  BleAdvQueueItem &item = this->commands_.push();
   this->increase_counter();
   for (auto encoder : this->encoders_) {
-    encoder->encode(this->commands_.back().params_, enc_cmd, this->params_);
+    encoder->encode(item.params_, enc_cmd, this->params_);
   }
 }
 
@@ -83,9 +211,7 @@ void BleAdvController::custom_cmd_float(float cmd_type, float param, float arg0,
 
 void BleAdvController::raw_inject(std::string raw) {
   ESP_LOGD(TAG, "Controller Raw Injection.");
-  this->commands_.emplace_back(CommandType::CUSTOM, EntityType::NOTYPE, 0);
-  this->commands_.back().params_.emplace_back();
-  this->commands_.back().params_.back().from_hex_string(raw);
+  this->commands_.push().params_.emplace_back().from_hex_string(raw);
 }
 
 void BleAdvController::cancel_timer() {
@@ -95,8 +221,7 @@ void BleAdvController::cancel_timer() {
 }
 
 void BleAdvController::enqueue(ble_adv_handler::BleAdvParams &&params) {
-  this->commands_.emplace_back(CommandType::CUSTOM, EntityType::NOTYPE, 0);
-  std::swap(this->commands_.back().params_, params);
+  this->commands_.push().params_ = std::move(params);
 }
 
 void BleAdvController::publish(const BleAdvGenCmd &gen_cmd, bool apply_command) {
@@ -141,16 +266,12 @@ bool BleAdvController::enqueue(const BleAdvGenCmd &gen_cmd) {
     return false;
   }
 
-  // Remove any previous command of the same type in the queue
-  uint8_t nb_rm = std::count_if(this->commands_.begin(), this->commands_.end(),
-                                [&](QueueItem &q) { return q.matches_cmd(gen_cmd); });
-  if (nb_rm) {
-    ESP_LOGD(TAG, "Removing %d previous pending commands", nb_rm);
-    this->commands_.remove_if([&](QueueItem &q) { return q.matches_cmd(gen_cmd); });
-  }
+  // enqueue the new command, replacing any previous command of the same type, encoded only when dequeued
+  this->commands_.push(gen_cmd);
+  return true;
+}
 
-  // enqueue the new command and encode the buffer(s)
-  this->commands_.emplace_back(gen_cmd.cmd, gen_cmd.ent_type, gen_cmd.ent_index);
+void BleAdvController::encode(const BleAdvGenCmd &gen_cmd, ble_adv_handler::BleAdvParams &params) {
   this->increase_counter();
   for (auto &encoder : this->encoders_) {
     std::vector<BleAdvEncCmd> enc_cmds;
@@ -160,11 +281,9 @@ bool BleAdvController::enqueue(const BleAdvGenCmd &gen_cmd) {
       for (auto &sent_trigger : this->sent_triggers_) {
         sent_trigger->trigger(gen_cmd, enc_cmd);
       }
-      encoder->encode(this->commands_.back().params_, enc_cmd, this->params_);
+      encoder->encode(params, enc_cmd, this->params_);
     }
   }
-
-  return !this->commands_.back().params_.empty();
 }
 
 void BleAdvController::loop() {
@@ -172,17 +291,23 @@ void BleAdvController::loop() {
   if (this->adv_start_time_ == 0) {
     // no on going command advertised by this controller, check if any to advertise
     if (!this->commands_.empty()) {
-      QueueItem &item = this->commands_.front();
+      // taken out of the queue first, as the triggers run on encoding may enqueue new commands
+      BleAdvQueueItem item = std::move(this->commands_.front());
+      this->commands_.pop_front();
+      if (item.to_encode_) {
+        this->encode(item.gen_cmd_, item.params_);
+      }
       if (!item.params_.empty()) {
         // setup seq duration for each packet
         bool use_seq_duration = (this->seq_duration_ > 0) && (this->seq_duration_ < this->get_min_tx_duration());
         for (auto &param : item.params_) {
           param.duration_ = use_seq_duration ? this->seq_duration_ : this->get_min_tx_duration();
         }
-        this->adv_id_ = this->get_parent()->add_to_advertiser(item.params_);
+        // the command is expected to be advertised within the min duration, before the next one can be processed
+        this->adv_id_ =
+            this->get_parent()->add_to_advertiser(item.params_, this->get_min_tx_duration(), &this->queue_stats_);
         this->adv_start_time_ = now;
       }
-      this->commands_.pop_front();
     }
   } else {
     // command is being advertised by this controller, check if stop and clean-up needed
@@ -8,7 +8,6 @@
 #endif
 #include "esphome/components/ble_adv_handler/ble_adv_handler.h"
 #include <vector>
-#include <list>
 
 namespace esphome {
 namespace ble_adv_controller {
@@ -21,6 +20,77 @@ class BleAdvEntity;
 
 using BleAdvBaseSentTrigger = Trigger<const BleAdvGenCmd &, const BleAdvEncCmd &>;
 
+/**
+  BleAdvQueueItem: Pending command, either a generic command encoded when dequeued, so that only
+    the latest value of a command type is encoded and sent, or custom packets already encoded.
+ */
+class BleAdvQueueItem {
+ public:
+  BleAdvQueueItem(const BleAdvGenCmd &gen_cmd) : gen_cmd_(gen_cmd), to_encode_(true) {}
+  BleAdvQueueItem() : gen_cmd_(CommandType::CUSTOM, EntityType::NOTYPE), to_encode_(false) {}
+
+  BleAdvGenCmd gen_cmd_;
+  bool to_encode_;
+  ble_adv_handler::BleAdvParams params_;
+
+  // Only move operators to avoid data copy
+  BleAdvQueueItem(BleAdvQueueItem &&) = default;
+  BleAdvQueueItem &operator=(BleAdvQueueItem &&) = default;
+};
+
+/**
+  BleAdvCommandQueue: Queue of the pending commands of a controller, sized once at setup from its entities
+  The commands are stored in a table of slots, chained by index in their processing order.
+  The generic commands are indexed by their key (command type, entity type and index) in a hash index,
+    so that a new command replaces the pending one with the same key in O(1).
+  The capacity covers all the generic commands the controller and its entities can have pending at the same time,
+    plus some custom commands. When full, only the custom / raw commands are dropped, oldest first: the generic
+    commands are never dropped, the capacity being doubled if ever none of the pending commands is a custom one.
+ */
+class BleAdvCommandQueue {
+ public:
+  static constexpr size_t MIN_CAPACITY = 4;
+  static constexpr size_t MAX_CAPACITY = 254;
+
+  // Allocate the slots for the given capacity, keeping the pending commands
+  void reserve(size_t capacity);
+  size_t capacity() const { return this->items_.size(); }
+
+  // Add a generic command at the end of the queue, removing the pending one with the same key if any
+  BleAdvQueueItem &push(const BleAdvGenCmd &gen_cmd);
+  // Add custom packets at the end of the queue
+  BleAdvQueueItem &push();
+
+  BleAdvQueueItem &front() { return this->items_[this->head_]; }
+  void pop_front() { this->remove(this->head_); }
+  bool empty() const { return this->size_ == 0; }
+  size_t size() const { return this->size_; }
+
+  uint32_t get_replaced() const { return this->replaced_; }
+  uint32_t get_dropped() const { return this->dropped_; }
+
+ protected:
+  using Index = uint8_t;
+  static constexpr Index NONE = 0xFF;
+  static constexpr uint32_t NO_KEY = 0xFFFFFFFF;
+  static uint32_t key(const BleAdvGenCmd &gen_cmd);
+  Index alloc(uint32_t key);
+  void remove(Index index);
+
+  std::vector<BleAdvQueueItem> items_;
+  std::vector<uint32_t> keys_;
+  std::vector<Index> prev_;
+  std::vector<Index> next_;
+  Index head_{NONE};
+  Index tail_{NONE};
+  Index free_head_{NONE};
+  size_t size_{0};
+  ble_adv_handler::BleAdvHashIndex<uint32_t, Index> index_;
+
+  uint32_t replaced_{0};
+  uint32_t dropped_{0};
+};
+
 /**
   BleAdvController:
     One physical device controlled == One Controller.
@@ -31,6 +101,11 @@ using BleAdvBaseSentTrigger = Trigger<const BleAdvGenCmd &, const BleAdvEncCmd &
 class BleAdvController : public ble_adv_handler::BleAdvDevice {
  public:
   static constexpr const char *OFF_TIMER_NAME = "off_timer";
+  // Pending commands capacity: generic commands of the controller (PAIR, UNPAIR, TIMER) and of each entity
+  // (ON, OFF and up to 4 light or fan commands), plus the custom / raw commands
+  static constexpr size_t QUEUE_CONTROLLER_COMMANDS = 3;
+  static constexpr size_t QUEUE_ENTITY_COMMANDS = 6;
+  static constexpr size_t QUEUE_CUSTOM_COMMANDS = 4;
 
   void setup() override;
   void loop() override;
@@ -41,6 +116,8 @@ class BleAdvController : public ble_adv_handler::BleAdvDevice {
   uint32_t get_min_tx_duration() { return (uint32_t) this->number_duration_.state; }
   void set_max_tx_duration(uint32_t tx_duration) { this->max_tx_duration_ = tx_duration; }
   void set_seq_duration(uint32_t seq_duration) { this->seq_duration_ = seq_duration; }
+  const ble_adv_handler::BleAdvQueueStats &get_queue_stats() const { return this->queue_stats_; }
+  const BleAdvCommandQueue &get_command_queue() const { return this->commands_; }
   void set_reversed(bool reversed) { this->reversed_ = reversed; }
   bool is_reversed() const { return this->reversed_; }
   void set_cancel_timer_on_any_change(bool cancel_timer) { this->cancel_timer_on_any_change_ = cancel_timer; }
@@ -77,30 +154,14 @@ class BleAdvController : public ble_adv_handler::BleAdvDevice {
   bool cancel_timer_on_any_change_{false};
   ble_adv_handler::BleAdvNumber number_duration_;
 
-  class QueueItem {
-   public:
-    QueueItem(CommandType cmd_type, EntityType ent_type, uint8_t index)
-        : cmd_type_(cmd_type), ent_type_(ent_type), ent_index_(index) {}
-
-    bool matches_cmd(const BleAdvGenCmd &gen_cmd) {
-      return (gen_cmd.cmd == this->cmd_type_) && (gen_cmd.ent_type == this->ent_type_) &&
-             (gen_cmd.ent_index == this->ent_index_);
-    }
-
-    CommandType cmd_type_;
-    EntityType ent_type_;
-    uint8_t ent_index_;
-    ble_adv_handler::BleAdvParams params_;
+  void encode(const BleAdvGenCmd &gen_cmd, ble_adv_handler::BleAdvParams &params);
 
-    // Only move operators to avoid data copy
-    QueueItem(QueueItem &&) = default;
-    QueueItem &operator=(QueueItem &&) = default;
-  };
-  std::list<QueueItem> commands_;
+  BleAdvCommandQueue commands_;
 
   // Being advertised data properties
   uint32_t adv_start_time_ = 0;
   uint16_t adv_id_ = 0;
+  ble_adv_handler::BleAdvQueueStats queue_stats_;
 
   // Publishing commands listened from remotes/phone
   std::vector<BleAdvEntity *> entities_;
@@ -11,3 +11,4 @@ CONF_BLE_ADV_SPLIT_DIM_RGB = "separate_dim_rgb"
 CONF_BLE_ADV_FORCED_REFRESH_ON_START = "forced_refresh_on_start"
 CONF_BLE_ADV_CANCEL_TIMER = "cancel_timer_on_any_change"
 CONF_BLE_ADV_ON_EMITTED = "on_emitted"
+CONF_BLE_ADV_ADAPTIVE_VARIANT = "adaptive_variant"
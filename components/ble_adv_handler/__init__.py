@@ -1,3 +1,5 @@
+import logging
+
 from esphome import automation
 import esphome.codegen as cg
 from esphome.components.esp32_ble import CONF_BLE_ID, ESP32BLE
@@ -9,13 +11,17 @@ from esphome.const import (
     CONF_VARIANT,
     PLATFORM_ESP32,
 )
+from esphome.core import CORE
 from esphome.cpp_helpers import setup_entity
 
 from .codec import (
     BASE_CODEC_SCHEMA,
     BLE_ADV_CODECS,
+    CONF_BLE_ADV_TRANSLATOR_ID,
     BleAdvEncoder,
     codec_to_code,
+    generated_encoders_to_code,
+    get_used_codecs,
     load_default_codecs,
 )
 from .const import (
@@ -25,12 +31,16 @@ from .const import (
 )
 from .translator import (
     BASE_TRANSLATOR_SCHEMA,
+    FullTranslator,
+    generated_translators_to_code,
     load_default_translators,
     translator_to_code,
 )
 
 CONF_BLE_ADV_CODEC_ID = "codec_id"
 
+_LOGGER = logging.getLogger(__name__)
+
 AUTO_LOAD = ["esp32_ble", "select", "number"]
 DEPENDENCIES = ["esp32"]
 MULTI_CONF = False
@@ -53,9 +63,17 @@ def forced_id_mig_msg(forced_id, max_forced_id):
     return f"If migrating from previous force_id 0x{forced_id:X}, use 0x{trunc_id:X} to avoid the need to re pair"
 
 
+def get_used_by_devices():
+    # encodings and codec IDs used by the devices of the config, for codecs pruning
+    return CORE.data.setdefault(
+        "ble_adv_handler", {"encodings": set(), "codec_ids": set()}
+    )
+
+
 def validate_ble_adv_device(config):
     # validate CONF_BLE_ADV_CODEC_ID
     if CONF_BLE_ADV_CODEC_ID in config:
+        get_used_by_devices()["codec_ids"].add(config[CONF_BLE_ADV_CODEC_ID].id)
         if CONF_BLE_ADV_ENCODING in config:
             raise cv.Invalid(
                 f"'{CONF_BLE_ADV_CODEC_ID}' and '{CONF_BLE_ADV_ENCODING}' are exclusive"
@@ -76,6 +94,7 @@ def validate_ble_adv_device(config):
         raise cv.Invalid(
             f"'{encoding}' is not a valid encoding - should be one of {list(BLE_ADV_CODECS.keys())}"
         )
+    get_used_by_devices()["encodings"].add(encoding)
     enc_params = BLE_ADV_CODECS[encoding]
     pvs = enc_params["variants"]
     # variants
@@ -136,7 +155,9 @@ async def setup_ble_adv_device(var, config):
 
 
 def load_defaults(config):
-    load_default_translators(config[CONF_BLE_ADV_TRANSLATORS])
+    load_default_translators(
+        config[CONF_BLE_ADV_TRANSLATORS], config[CONF_BLE_ADV_FLATTEN_TRANSLATORS]
+    )
     load_default_codecs(
         config[CONF_BLE_ADV_CODECS], config[CONF_BLE_ADV_CODECS_DEBUG_MODE]
     )
@@ -154,6 +175,11 @@ CONF_BLE_ADV_ON_RAW = "on_raw"
 CONF_BLE_ADV_TRANSLATORS = "translators"
 CONF_BLE_ADV_CODECS = "codecs"
 CONF_BLE_ADV_CODECS_DEBUG_MODE = "codecs_debug_mode"
+CONF_BLE_ADV_FLATTEN_TRANSLATORS = "flatten_translators"
+CONF_BLE_ADV_DEDUP_WINDOW = "dedup_window"
+CONF_BLE_ADV_PRUNE_CODECS = "prune_codecs"
+CONF_BLE_ADV_ADV_MIN_SLOTS = "adv_min_slots"
+CONF_BLE_ADV_PACKET_POOL_SIZE = "packet_pool_size"
 
 CONFIG_SCHEMA = cv.All(
     cv.Schema(
@@ -166,6 +192,9 @@ CONFIG_SCHEMA = cv.All(
             cv.Optional(CONF_BLE_ADV_LOG_COMMAND, default=False): cv.boolean,
             cv.Optional(CONF_BLE_ADV_LOG_CONFIG, default=False): cv.boolean,
             cv.Optional(CONF_BLE_ADV_USE_MAX_TX_POWER, default=False): cv.boolean,
+            cv.Optional(
+                CONF_BLE_ADV_DEDUP_WINDOW, default="60s"
+            ): cv.positive_time_period_milliseconds,
             cv.Optional(CONF_BLE_ADV_ON_DECODED): automation.validate_automation(
                 {
                     cv.GenerateID(CONF_TRIGGER_ID): cv.declare_id(BleAdvDecodedTrigger),
@@ -185,6 +214,14 @@ CONFIG_SCHEMA = cv.All(
             cv.Optional(CONF_BLE_ADV_CODECS_DEBUG_MODE, default=[]): cv.ensure_list(
                 cv.use_id(BleAdvEncoder)
             ),
+            cv.Optional(CONF_BLE_ADV_FLATTEN_TRANSLATORS, default=False): cv.boolean,
+            cv.Optional(CONF_BLE_ADV_PRUNE_CODECS, default=False): cv.boolean,
+            cv.Optional(CONF_BLE_ADV_ADV_MIN_SLOTS, default=1): cv.int_range(
+                min=1, max=10
+            ),
+            cv.Optional(CONF_BLE_ADV_PACKET_POOL_SIZE, default=64): cv.int_range(
+                min=16, max=255
+            ),
         }
     ),
     cv.only_on([PLATFORM_ESP32]),
@@ -192,14 +229,45 @@ CONFIG_SCHEMA = cv.All(
 )
 
 
+def prune_codecs(config):
+    # Only keep the codecs used by the devices and the translators they need
+    all_codecs = config[CONF_BLE_ADV_CODECS]
+    all_translators = config[CONF_BLE_ADV_TRANSLATORS]
+    used = get_used_by_devices()
+    codecs = get_used_codecs(all_codecs, used["encodings"], used["codec_ids"])
+    used_tr_ids = FullTranslator.GetUsedTranslators(
+        [codec[CONF_BLE_ADV_TRANSLATOR_ID].id for codec in codecs]
+        + [tr[CONF_ID].id for tr in all_translators if "cmds" in tr]  # user defined
+    )
+    translators = [tr for tr in all_translators if tr[CONF_ID].id in used_tr_ids]
+    _LOGGER.info(
+        f"'{CONF_BLE_ADV_PRUNE_CODECS}' - Removed {len(all_codecs) - len(codecs)} of {len(all_codecs)} codecs"
+        f" and {len(all_translators) - len(translators)} of {len(all_translators)} translators,"
+        f" kept encodings: {sorted({codec['args'][0] for codec in codecs})}."
+        " See the build summary for the resulting Flash and RAM usage."
+    )
+    return codecs, translators, used_tr_ids
+
+
 async def to_code(config):
     var = cg.new_Pvariable(config[CONF_ID])
     cg.add(var.set_setup_priority(300))  # start after Bluetooth
-    for conf_tr in config.get(CONF_BLE_ADV_TRANSLATORS, []):
+    if config[CONF_BLE_ADV_PRUNE_CODECS]:
+        codecs, translators, used_tr_ids = prune_codecs(config)
+        generated_translators_to_code(
+            used_tr_ids, config[CONF_BLE_ADV_FLATTEN_TRANSLATORS]
+        )
+    else:
+        codecs = config[CONF_BLE_ADV_CODECS]
+        translators = config[CONF_BLE_ADV_TRANSLATORS]
+        generated_translators_to_code()
+    for conf_tr in translators:
         _ = await translator_to_code(conf_tr)
-    for conf_en in config.get(CONF_BLE_ADV_CODECS, []):
-        enc = await codec_to_code(conf_en)
+    generated_encoders_to_code(codecs)
+    for index, conf_en in enumerate(codecs):
+        enc = await codec_to_code(conf_en, index)
         cg.add(var.add_encoder(enc))
+    cg.add(var.set_dispatch_index(cg.RawExpression("ble_adv_handler::BLE_ADV_DISPATCH")))
     await cg.register_component(var, config)
     cg.add(var.set_scan_activated(config[CONF_BLE_ADV_SCAN_ACTIVATED]))
     cg.add(var.set_check_reencoding(config[CONF_BLE_ADV_CHECK_REENCODING]))
@@ -211,6 +279,9 @@ async def to_code(config):
         )
     )
     cg.add(var.set_use_max_tx_power(config[CONF_BLE_ADV_USE_MAX_TX_POWER]))
+    cg.add(var.set_dedup_window(config[CONF_BLE_ADV_DEDUP_WINDOW]))
+    cg.add(var.set_adv_min_slots(config[CONF_BLE_ADV_ADV_MIN_SLOTS]))
+    cg.add_define("BLE_ADV_PACKET_POOL_SIZE", config[CONF_BLE_ADV_PACKET_POOL_SIZE])
     for conf in config.get(CONF_BLE_ADV_ON_DECODED, []):
         trigger = cg.new_Pvariable(conf[CONF_TRIGGER_ID], var)
         await automation.build_automation(trigger, [(BleAdvDecodedConstRef, "x")], conf)
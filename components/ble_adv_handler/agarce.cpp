@@ -5,8 +5,7 @@ namespace esphome {
 namespace ble_adv_handler {
 
 // ref: https://github.com/NicoIIT/esphome-components/issues/17
-AgarceEncoder::AgarceEncoder(const std::string &encoding, const std::string &variant, uint8_t prefix)
-    : BleAdvEncoder(encoding, variant), prefix_(prefix) {
+AgarceEncoder::AgarceEncoder(const BleAdvEncoderDesc &desc, uint8_t prefix) : BleAdvEncoder(desc), prefix_(prefix) {
   this->len_ = sizeof(data_map_t);
 }
 
@@ -41,7 +41,7 @@ class BleAdvTranslator_agarce_base : public BleAdvTranslator_base {
 
 class AgarceEncoder : public BleAdvEncoder {
  public:
-  AgarceEncoder(const std::string &encoding, const std::string &variant, uint8_t prefix);
+  AgarceEncoder(const BleAdvEncoderDesc &desc, uint8_t prefix);
 
  protected:
   static constexpr size_t ARGS_LEN = 3;
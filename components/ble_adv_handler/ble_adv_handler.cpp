@@ -77,6 +77,229 @@ bool BleAdvParam::is_data_equal(const BleAdvParam &comp) const {
                      comp.get_const_data_buf()));
 }
 
+uint64_t BleAdvDedupSet::hash(const BleAdvParam &param) {
+  // FNV-1a 64 bits of the data, or of the full buffer if no data, including the length
+  const uint8_t *buf = param.has_data() ? param.get_const_data_buf() : param.get_const_full_buf();
+  size_t len = param.has_data() ? param.get_data_len() : param.get_full_len();
+  uint64_t hash = 0xCBF29CE484222325ULL ^ len;
+  for (size_t i = 0; i < len; ++i) {
+    hash ^= buf[i];
+    hash *= 0x100000001B3ULL;
+  }
+  return hash;
+}
+
+bool BleAdvDedupSet::check_and_add(const BleAdvParam &param, uint32_t expiry) {
+  uint64_t hash = BleAdvDedupSet::hash(param);
+  size_t slot = this->index_.find_slot(hash, this->hashes_);
+  if (this->index_.is_used(slot)) {
+    this->hits_++;
+    return true;
+  }
+  this->misses_++;
+  if (this->size_ == CAPACITY) {
+    this->evictions_++;
+    this->remove_head();
+    slot = this->index_.find_slot(hash, this->hashes_);  // the removal may have shifted the empty slot
+  }
+  size_t index = (this->head_ + this->size_) % CAPACITY;
+  this->hashes_[index] = hash;
+  this->expiries_[index] = expiry;
+  this->index_.set(slot, index);
+  this->size_++;
+  return false;
+}
+
+void BleAdvDedupSet::remove_expired(uint32_t now) {
+  // wrap around safe comparison of millis
+  while ((this->size_ > 0) && ((int32_t) (now - this->expiries_[this->head_]) > 0)) {
+    this->remove_head();
+  }
+}
+
+void BleAdvDedupSet::remove_head() {
+  this->index_.remove(this->hashes_[this->head_], this->hashes_);
+  this->head_ = (this->head_ + 1) % CAPACITY;
+  this->size_--;
+}
+
+BleAdvPacketPool &BleAdvPacketPool::get() {
+  static BleAdvPacketPool pool;
+  return pool;
+}
+
+BleAdvPacketPool::BleAdvPacketPool() {
+  for (size_t i = 0; i < CAPACITY; ++i) {
+    this->next_[i] = (i + 1 < CAPACITY) ? i + 1 : NONE;
+  }
+}
+
+BleAdvPacketPool::Handle BleAdvPacketPool::alloc() {
+  Handle handle = this->free_head_;
+  if (handle == NONE) {
+    this->failures_++;
+    ESP_LOGW(TAG, "Packet pool full (%u packets), packet dropped.", (unsigned) CAPACITY);
+    return NONE;
+  }
+  this->free_head_ = this->next_[handle];
+  this->next_[handle] = NONE;
+  this->packets_[handle] = BleAdvParam();
+  this->size_++;
+  this->high_water_ = std::max(this->high_water_, this->size_);
+  return handle;
+}
+
+void BleAdvPacketPool::release(Handle handle) {
+  this->next_[handle] = this->free_head_;
+  this->free_head_ = handle;
+  this->size_--;
+}
+
+BleAdvParams &BleAdvParams::operator=(BleAdvParams &&other) {
+  if (this != &other) {
+    this->clear();
+    std::swap(this->head_, other.head_);
+    std::swap(this->tail_, other.tail_);
+    std::swap(this->size_, other.size_);
+  }
+  return *this;
+}
+
+BleAdvParam &BleAdvParams::emplace_back() {
+  BleAdvPacketPool &pool = BleAdvPacketPool::get();
+  Handle handle = pool.alloc();
+  if (handle == BleAdvPacketPool::NONE) {
+    pool[handle] = BleAdvParam();
+    return pool[handle];
+  }
+  if (this->empty()) {
+    this->head_ = handle;
+  } else {
+    pool.set_next(this->tail_, handle);
+  }
+  this->tail_ = handle;
+  this->size_++;
+  return pool[handle];
+}
+
+BleAdvPacketPool::Handle BleAdvParams::pop_front() {
+  Handle handle = this->head_;
+  if (handle != BleAdvPacketPool::NONE) {
+    BleAdvPacketPool &pool = BleAdvPacketPool::get();
+    this->head_ = pool.get_next(handle);
+    pool.set_next(handle, BleAdvPacketPool::NONE);
+    if (this->head_ == BleAdvPacketPool::NONE) {
+      this->tail_ = BleAdvPacketPool::NONE;
+    }
+    this->size_--;
+  }
+  return handle;
+}
+
+void BleAdvParams::clear() {
+  while (!this->empty()) {
+    BleAdvPacketPool::get().release(this->pop_front());
+  }
+}
+
+void BleAdvQueueStats::add(uint32_t latency, bool missed) {
+  this->nb_msgs_++;
+  this->nb_missed_ += missed ? 1 : 0;
+  this->sum_latency_ += latency;
+  this->max_latency_ = std::max(this->max_latency_, latency);
+  this->last_latency_ = latency;
+}
+
+uint16_t BleAdvScheduler::add(BleAdvParams &params, uint32_t now, uint32_t max_delay, BleAdvQueueStats *stats) {
+  BleAdvPacketPool &pool = BleAdvPacketPool::get();
+  uint16_t msg_id = ++this->id_count_;
+  while (!params.empty()) {
+    // the scheduler cannot be full, as it can only hold the packets of the pool
+    BleAdvProcess &process = this->packets_[this->size_++];
+    process = BleAdvProcess();
+    process.packet_ = params.pop_front();
+    process.id_ = msg_id;
+    process.queued_time_ = now;
+    process.deadline_ = now + max_delay;
+    process.stats_ = stats;
+    const BleAdvParam &param = pool[process.packet_];
+    ESP_LOGD(TAG, "request start advertising - %d: %s", msg_id,
+             esphome::format_hex_pretty(param.get_const_full_buf(), param.get_full_len()).c_str());
+  }
+  return msg_id;
+}
+
+void BleAdvScheduler::remove(uint16_t msg_id) {
+  ESP_LOGD(TAG, "request stop advertising - %d", msg_id);
+  for (size_t i = 0; i < this->size_; ++i) {
+    if (this->packets_[i].id_ == msg_id) {
+      this->packets_[i].to_be_removed_ = true;
+    }
+  }
+}
+
+bool BleAdvScheduler::is_before(const BleAdvProcess &a, const BleAdvProcess &b) const {
+  if (this->is_due(a) != this->is_due(b)) {
+    return this->is_due(a);
+  }
+  // wrap around safe comparison of millis
+  if (this->is_due(a) && (a.deadline_ != b.deadline_)) {
+    return (int32_t) (a.deadline_ - b.deadline_) < 0;
+  }
+  return a.last_slot_ < b.last_slot_;
+}
+
+BleAdvParam *BleAdvScheduler::start_slot(uint32_t now) {
+  // clean-up the packets requested for removal, once they had their min slots
+  BleAdvPacketPool &pool = BleAdvPacketPool::get();
+  size_t kept = 0;
+  for (size_t i = 0; i < this->size_; ++i) {
+    BleAdvProcess &process = this->packets_[i];
+    if (process.to_be_removed_ && !this->is_due(process)) {
+      pool.release(process.packet_);
+    } else {
+      this->packets_[kept++] = process;
+    }
+  }
+  this->size_ = kept;
+  if (this->size_ == 0) {
+    return nullptr;
+  }
+
+  // select the next packet, in order on equality, and move it first
+  BleAdvProcess *first = this->packets_;
+  BleAdvProcess *next =
+      std::min_element(first, first + this->size_,
+                       [&](const BleAdvProcess &a, const BleAdvProcess &b) { return this->is_before(a, b); });
+  std::rotate(first, next, next + 1);
+  BleAdvParam &param = pool[first->packet_];
+  this->on_slot(*first, now + param.duration_);
+  return &param;
+}
+
+void BleAdvScheduler::on_slot(BleAdvProcess &process, uint32_t slot_end) {
+  process.last_slot_ = ++this->slot_count_;
+  if (process.nb_slots_++ != this->min_slots_ - 1) {
+    return;
+  }
+  // last guaranteed slot of the packet: the message is fully advertised if none of its packets is still due
+  uint16_t msg_id = process.id_;
+  if (std::any_of(this->packets_, this->packets_ + this->size_,
+                  [&](const BleAdvProcess &p) { return (p.id_ == msg_id) && this->is_due(p); })) {
+    return;
+  }
+  uint32_t latency = slot_end - process.queued_time_;
+  int32_t late = (int32_t) (slot_end - process.deadline_);
+  ESP_LOGD(TAG, "advertised - %d, in %" PRIu32 " ms, %s", msg_id, latency, (late > 0) ? "deadline missed" : "on time");
+  if (process.stats_ != nullptr) {
+    process.stats_->add(latency, late > 0);
+  }
+}
+
+bool BleAdvScheduler::is_slot_end_needed() const {
+  return (this->size_ > 1) || ((this->size_ == 1) && this->packets_[0].to_be_removed_);
+}
+
 std::string BleAdvGenCmd::str() const {
   char ret_full[100]{0};
   size_t ind = 0;
@@ -204,36 +427,78 @@ void BleAdvEncoder::translate_e2g(BleAdvGenCmd &gen_cmd, const BleAdvEncCmd &enc
   this->translator_->e2g_cmd(enc_cmd, gen_cmd);
 }
 
+std::pair<const uint8_t *, const uint8_t *> BleAdvDispatchIndex::get_encoders(uint16_t key) const {
+  const uint16_t *key_it = std::lower_bound(this->keys, this->keys + this->nb_keys, key);
+  size_t pos = ((key_it != this->keys + this->nb_keys) && (*key_it == key)) ? key_it - this->keys : this->nb_keys;
+  return {this->encoders + this->offsets[pos], this->encoders + this->offsets[pos + 1]};
+}
+
 bool BleAdvEncoder::decode(const BleAdvParam &param, BleAdvEncCmd &enc_cmd, ControllerParam_t &cont) const {
   // Check global len and header to discard most of encoders
-  size_t len = param.get_data_len() - this->header_.size();
+  size_t len = param.get_data_len() - this->desc_.header_len;
   const uint8_t *cbuf = param.get_const_data_buf();
   if (!this->check_eq(this->len_, len, "Data length"))
     return false;
-  if (!this->check_eq_buf(this->header_.data(), cbuf, this->header_.size(), "Header"))
+  if (!this->check_eq_buf(this->desc_.header, cbuf, this->desc_.header_len, "Header"))
     return false;
 
   // copy the data to be decoded, not to alter it for other decoders
   uint8_t buf[MAX_PACKET_LEN]{0};
   std::copy(cbuf, cbuf + param.get_data_len(), buf);
-  return this->decode(buf + this->header_.size(), enc_cmd, cont);
+  return this->decode(buf + this->desc_.header_len, enc_cmd, cont);
 }
 
 void BleAdvEncoder::encode(BleAdvParams &params, BleAdvEncCmd &enc_cmd, ControllerParam_t &cont) const {
-  params.emplace_back();
-  BleAdvParam &param = params.back();
-  param.init_with_ble_param(this->ad_flag_, this->adv_data_type_);
-  std::copy(this->header_.begin(), this->header_.end(), param.get_data_buf());
-  uint8_t *buf = param.get_data_buf() + this->header_.size();
+  BleAdvParam &param = params.emplace_back();
+  param.init_with_ble_param(this->desc_.ad_flag, this->desc_.adv_data_type);
+  std::copy(this->desc_.header, this->desc_.header + this->desc_.header_len, param.get_data_buf());
+  uint8_t *buf = param.get_data_buf() + this->desc_.header_len;
   this->encode(buf, enc_cmd, cont);
 
-  ESP_LOGD(this->id_.c_str(), "UUID: '0x%lX', index: %d, tx: %d, enc: %s", cont.id_, cont.index_, cont.tx_count_,
+  ESP_LOGD(this->desc_.id, "UUID: '0x%lX', index: %d, tx: %d, enc: %s", cont.id_, cont.index_, cont.tx_count_,
            this->to_str(enc_cmd).c_str());
 
-  param.set_data_len(this->len_ + this->header_.size());
-}
+  param.set_data_len(this->len_ + this->desc_.header_len);
+}
+
+// Whitening keystream of a seed, computed at compile time, to be XORed to the buffer
+struct BleAdvWhiteningKeystream {
+  constexpr BleAdvWhiteningKeystream(uint8_t seed) : seed_(seed & 0x7F), keystream_() {
+    // same LFSR as BleAdvEncoder::whiten, the highest bit of the seed being shifted out before use
+    uint8_t r = seed;
+    for (size_t i = 0; i < MAX_PACKET_LEN; i++) {
+      uint8_t b = 0;
+      for (size_t j = 0; j < 8; j++) {
+        r = (r << 1) & 0xFF;
+        if (r & 0x80) {
+          r ^= 0x11;
+          b |= 1 << j;
+        }
+        r &= 0x7F;
+      }
+      this->keystream_[i] = b;
+    }
+  }
+  uint8_t seed_;
+  uint8_t keystream_[MAX_PACKET_LEN];
+};
+
+// The seeds used by the encoders
+static constexpr BleAdvWhiteningKeystream WHITENING_KEYSTREAMS[] = {0x37, 0x48, 0x6F, 0x7F, 0xD3};
 
 void BleAdvEncoder::whiten(uint8_t *buf, size_t len, uint8_t seed) const {
+  if (len <= MAX_PACKET_LEN) {
+    for (auto &ks : WHITENING_KEYSTREAMS) {
+      if (ks.seed_ == (seed & 0x7F)) {
+        for (size_t i = 0; i < len; i++) {
+          buf[i] ^= ks.keystream_[i];
+        }
+        return;
+      }
+    }
+  }
+
+  // other seeds: run the LFSR
   uint8_t r = seed;
   for (size_t i = 0; i < len; i++) {
     uint8_t b = 0;
@@ -274,7 +539,7 @@ uint8_t BleAdvEncoder::checksum(uint8_t *buf, size_t len) const {
 bool BleAdvEncoder::check_eq(uint32_t ref, uint32_t comp, const char *msg) const {
   if (ref != comp) {
     if (this->debug_mode_) {
-      ESP_LOGD(this->id_.c_str(), "'%s' differs - expected: '0x%lX', received: '0x%lX'", msg, ref, comp);
+      ESP_LOGD(this->desc_.id, "'%s' differs - expected: '0x%lX', received: '0x%lX'", msg, ref, comp);
     }
     return false;
   }
@@ -286,7 +551,7 @@ bool BleAdvEncoder::check_eq_buf(const uint8_t *ref_buf, const uint8_t *comp_buf
     if (this->debug_mode_) {
       std::string expected = esphome::format_hex_pretty(ref_buf, len);
       std::string received = esphome::format_hex_pretty(comp_buf, len);
-      ESP_LOGD(this->id_.c_str(), "'%s' differs - expected: '%s', received: '%s'", msg, expected.c_str(),
+      ESP_LOGD(this->desc_.id, "'%s' differs - expected: '%s', received: '%s'", msg, expected.c_str(),
                received.c_str());
     }
     return false;
@@ -298,7 +563,7 @@ void BleAdvEncoder::log_buffer(const uint8_t *buf, size_t len, const char *msg)
   if (!this->debug_mode_)
     return;
   std::string buffer = esphome::format_hex_pretty(buf, len);
-  ESP_LOGD(this->id_.c_str(), "%s - %s", msg, buffer.c_str());
+  ESP_LOGD(this->desc_.id, "%s - %s", msg, buffer.c_str());
 }
 
 void BleAdvHandler::setup() {
@@ -306,10 +571,45 @@ void BleAdvHandler::setup() {
   register_service(&BleAdvHandler::on_raw_decode, "raw_decode", {"raw"});
   register_service(&BleAdvHandler::on_raw_listen, "raw_listen", {"raw"});
 #endif
-  this->scan_result_lock_ = xSemaphoreCreateMutex();
+  ESP_LOGD(TAG, "Encoders dispatch - %d keys, %d encoders tried on any packet.", (int) this->dispatch_.nb_keys,
+           (int) this->dispatch_.get_nb_any());
+  this->listen_all_ = this->log_raw_ || !this->raw_triggers_.empty() || (this->dispatch_.get_nb_any() > 0);
+}
+
+void BleAdvHandler::dump_config() {
+  ESP_LOGCONFIG(TAG, "BleAdvHandler");
+  const BleAdvPacketPool &pool = this->get_packet_pool();
+  ESP_LOGCONFIG(TAG, "  Packet Pool: %u / %u packets used, high water %u, %" PRIu32 " packets dropped",
+                (unsigned) pool.size(), (unsigned) BleAdvPacketPool::CAPACITY, (unsigned) pool.get_high_water(),
+                pool.get_failures());
+  const BleAdvScanRing &ring = this->get_scan_ring();
+  ESP_LOGCONFIG(TAG, "  Scan Ring: %u packets capacity, %" PRIu32 " received, %" PRIu32 " dropped",
+                (unsigned) BleAdvScanRing::CAPACITY, ring.get_received(), ring.get_dropped());
+  const BleAdvDedupSet &dedup = this->get_dedup_set();
+  ESP_LOGCONFIG(TAG,
+                "  Dedup Set: window %" PRIu32 " ms, %u / %u packets, %" PRIu32 " hits, %" PRIu32 " misses, %" PRIu32
+                " evictions",
+                this->dedup_window_, (unsigned) dedup.size(), (unsigned) BleAdvDedupSet::CAPACITY, dedup.get_hits(),
+                dedup.get_misses(), dedup.get_evictions());
 }
 
-void BleAdvHandler::add_encoder(BleAdvEncoder *encoder) { this->encoders_.push_back(encoder); }
+void BleAdvHandler::add_encoder(BleAdvEncoder *encoder) {
+  // stored at its index in the generated descriptors table, for direct access by integer ID
+  if (this->encoders_.size() <= encoder->get_index()) {
+    this->encoders_.resize(encoder->get_index() + 1, nullptr);
+  }
+  this->encoders_[encoder->get_index()] = encoder;
+}
+
+bool BleAdvHandler::is_listened(const BleAdvParam &param) const {
+  if (this->listen_all_) {
+    return true;
+  }
+  if (!param.has_data()) {
+    return false;
+  }
+  return this->dispatch_.has_key(BleAdvDispatchIndex::Key(param.get_data_type(), param.get_const_data_buf()[0]));
+}
 
 BleAdvEncoder *BleAdvHandler::get_encoder(const std::string &id) {
   for (auto &encoder : this->encoders_) {
@@ -332,25 +632,11 @@ std::vector<std::string> BleAdvHandler::get_ids(const std::string &encoding) {
   return ids;
 }
 
-uint16_t BleAdvHandler::add_to_advertiser(BleAdvParams &params) {
-  uint32_t msg_id = ++this->id_count;
-  for (auto &param : params) {
-    this->packets_.emplace_back(BleAdvProcess(msg_id, std::move(param)));
-    ESP_LOGD(TAG, "request start advertising - %ld: %s", msg_id,
-             esphome::format_hex_pretty(param.get_full_buf(), param.get_full_len()).c_str());
-  }
-  params.clear();  // As we moved the content, just to be sure no caller will re use it
-  return this->id_count;
+uint16_t BleAdvHandler::add_to_advertiser(BleAdvParams &params, uint32_t max_delay, BleAdvQueueStats *stats) {
+  return this->scheduler_.add(params, millis(), max_delay, stats);
 }
 
-void BleAdvHandler::remove_from_advertiser(uint16_t msg_id) {
-  ESP_LOGD(TAG, "request stop advertising - %d", msg_id);
-  for (auto &param : this->packets_) {
-    if (param.id_ == msg_id) {
-      param.to_be_removed_ = true;
-    }
-  }
-}
+void BleAdvHandler::remove_from_advertiser(uint16_t msg_id) { this->scheduler_.remove(msg_id); }
 
 // try to identify the relevant encoder
 bool BleAdvHandler::handle_raw_param(BleAdvParam &param, bool publish) {
@@ -365,22 +651,29 @@ bool BleAdvHandler::handle_raw_param(BleAdvParam &param, bool publish) {
   for (auto &raw_trigger : this->raw_triggers_) {
     raw_trigger->trigger(param);
   }
-  for (auto &encoder : this->encoders_) {
+  // Only the encoders having the same data type and first header byte can decode the packet
+  auto encoders =
+      this->dispatch_.get_encoders(BleAdvDispatchIndex::Key(param.get_data_type(), param.get_const_data_buf()[0]));
+  for (const uint8_t *index = encoders.first; index != encoders.second; ++index) {
+    BleAdvEncoder *encoder = this->encoders_[*index];
     ControllerParam_t cont;
     BleAdvDecoded_t decoded;
     if (encoder->decode(param, decoded.enc, cont)) {
       encoder->translate_e2g(decoded.gen, decoded.enc);
       if (this->log_command_) {
-        ESP_LOGD(encoder->get_id().c_str(), "Decoded OK - tx: %d, gen: %s, enc: %s", cont.tx_count_,
+        ESP_LOGD(encoder->get_id(), "Decoded OK - tx: %d, gen: %s, enc: %s", cont.tx_count_,
                  decoded.gen.str().c_str(), encoder->to_str(decoded.enc).c_str());
       }
       for (auto &device : this->devices_) {
-        if (publish && device->is_elligible(encoder->get_id(), cont)) {
-          device->publish(decoded.gen, false);
+        if (publish) {
+          device->learn_variant(encoder, cont);
+          if (device->is_elligible(encoder->get_index(), cont)) {
+            device->publish(decoded.gen, false);
+          }
         }
       }
-      decoded.conf.encoding = encoder->get_encoding().c_str();
-      decoded.conf.variant = encoder->get_variant().c_str();
+      decoded.conf.encoding = encoder->get_encoding();
+      decoded.conf.variant = encoder->get_variant();
       decoded.conf.forced_id = cont.id_;
       decoded.conf.index = cont.index_;
       if (this->log_config_) {
@@ -489,56 +782,32 @@ void BleAdvHandler::loop() {
 #endif
 
   // Cleanup expired packets
-  this->processed_packets_.remove_if([&](BleAdvParam &p) { return p.duration_ < millis(); });
+  this->processed_packets_.remove_expired(millis());
 
-  // swap packet list to further process it outside of the lock
-  std::list<BleAdvParam> new_packets;
-  if (xSemaphoreTake(this->scan_result_lock_, 5L / portTICK_PERIOD_MS)) {
-    std::swap(this->new_packets_, new_packets);
-    xSemaphoreGive(this->scan_result_lock_);
-  } else {
-    ESP_LOGW(TAG, "loop - failed to take lock");
-  }
-
-  // handle new packets
-  for (auto &param : new_packets) {
-    auto idx = std::find_if(this->processed_packets_.begin(), this->processed_packets_.end(),
-                            [&](BleAdvParam &p) { return (p == param) || p.is_data_equal(param); });
-    if (idx == this->processed_packets_.end()) {
+  // handle new packets, at most a full ring not to be stuck in case of flooding
+  BleAdvParam param;
+  for (size_t i = 0; (i < BleAdvScanRing::CAPACITY) && this->new_packets_.pop(param); ++i) {
+    if (!this->processed_packets_.check_and_add(param, param.duration_)) {
       this->handle_raw_param(param, true);
-      this->processed_packets_.emplace_back(std::move(param));
     }
   }
 
   // Process advertizing
+  uint32_t now = millis();
   if (this->adv_stop_time_ == 0) {
-    // No packet is being advertised, process with clean-up IF already processed once and requested for removal
-    this->packets_.remove_if([&](BleAdvProcess &p) { return p.processed_once_ && p.to_be_removed_; });
-    // if packets to be advertised, advertise the front one
-    if (!this->packets_.empty()) {
-      BleAdvParam &packet = this->packets_.front().param_;
+    // No packet is being advertised, advertise the one selected by the scheduler if any
+    BleAdvParam *packet = this->scheduler_.start_slot(now);
+    if (packet != nullptr) {
       this->setup_max_tx_power();
-      ESP_ERROR_CHECK_WITHOUT_ABORT(esp_ble_gap_config_adv_data_raw(packet.get_full_buf(), packet.get_full_len()));
+      ESP_ERROR_CHECK_WITHOUT_ABORT(esp_ble_gap_config_adv_data_raw(packet->get_full_buf(), packet->get_full_len()));
       ESP_ERROR_CHECK_WITHOUT_ABORT(esp_ble_gap_start_advertising(&(this->adv_params_)));
-      this->adv_stop_time_ = millis() + this->packets_.front().param_.duration_;
-      this->packets_.front().processed_once_ = true;
-    }
-  } else {
-    // Packet is being advertised, check if time to switch to next one in case:
-    // The advertise seq_duration expired AND
-    // There is more than one packet to advertise OR the front packet was requested to be removed
-    bool multi_packets = (this->packets_.size() > 1);
-    bool front_to_be_removed = this->packets_.front().to_be_removed_;
-    if ((millis() > this->adv_stop_time_) && (multi_packets || front_to_be_removed)) {
-      ESP_ERROR_CHECK_WITHOUT_ABORT(esp_ble_gap_stop_advertising());
-      this->adv_stop_time_ = 0;
-      if (front_to_be_removed) {
-        this->packets_.pop_front();
-      } else if (multi_packets) {
-        this->packets_.emplace_back(std::move(this->packets_.front()));
-        this->packets_.pop_front();
-      }
+      this->adv_stop_time_ = now + packet->duration_;
     }
+  } else if ((now > this->adv_stop_time_) && this->scheduler_.is_slot_end_needed()) {
+    // Packet is being advertised, stop it if its slot expired AND
+    // There is another packet to advertise OR it was requested to be removed
+    ESP_ERROR_CHECK_WITHOUT_ABORT(esp_ble_gap_stop_advertising());
+    this->adv_stop_time_ = 0;
   }
 }
 
@@ -546,13 +815,11 @@ void BleAdvHandler::gap_event_handler(esp_gap_ble_cb_event_t event, esp_ble_gap_
   if (event == ESP_GAP_BLE_SCAN_RESULT_EVT) {
     BleAdvParam packet;
     packet.from_raw(param->scan_rst.ble_adv, param->scan_rst.adv_data_len);
-    packet.duration_ = millis() + 60 * 1000;
-    if (xSemaphoreTake(this->scan_result_lock_, 5L / portTICK_PERIOD_MS)) {
-      this->new_packets_.emplace_back(std::move(packet));
-      xSemaphoreGive(this->scan_result_lock_);
-    } else {
-      ESP_LOGW(TAG, "evt - failed to take lock");
+    if (!this->is_listened(packet)) {
+      return;
     }
+    packet.duration_ = millis() + this->dedup_window_;
+    this->new_packets_.push(std::move(packet));
   }
 }
 
@@ -594,6 +861,12 @@ void BleAdvDevice::init(const std::string &encoding, const std::string &variant)
   this->get_parent()->register_device(this);
   this->select_encoding_.traits.set_options(this->get_parent()->get_ids(encoding));
   this->select_encoding_.state = BleAdvEncoder::ID(encoding, variant);
+  // encoders of the select options resolved once, the first option "All" having none
+  auto options = this->select_encoding_.traits.get_options();
+  this->options_encoders_.assign(1, nullptr);
+  for (size_t i = 1; i < options.size(); ++i) {
+    this->options_encoders_.push_back(this->get_parent()->get_encoder(options[i]));
+  }
   this->encoders_.clear();
   this->encoders_.push_back(this->get_parent()->get_encoder(this->select_encoding_.state));
   this->select_encoding_.add_on_state_callback(
@@ -602,20 +875,39 @@ void BleAdvDevice::init(const std::string &encoding, const std::string &variant)
 
 void BleAdvDevice::refresh_encoder(std::string id, size_t index) {
   this->encoders_.clear();
+  this->all_selected_ = (index == 0);
+  this->variant_learned_ = false;
   if (index == 0) {
     // "All" encoder selected, refresh from list, avoiding "All"
-    for (auto &aid : this->select_encoding_.traits.get_options()) {
-      if (aid != id) {
-        this->encoders_.push_back(this->get_parent()->get_encoder(aid));
-      }
-    }
+    this->encoders_.assign(this->options_encoders_.begin() + 1, this->options_encoders_.end());
   } else {
-    this->encoders_.push_back(this->get_parent()->get_encoder(id));
+    this->encoders_.push_back(this->options_encoders_[index]);
+  }
+}
+
+void BleAdvDevice::learn_variant(BleAdvEncoder *encoder, const ControllerParam_t &cont) {
+  if (!this->adaptive_variant_ || !this->all_selected_ || (cont.id_ != this->params_.id_) ||
+      (cont.index_ != this->params_.index_)) {
+    return;
+  }
+  // only the variants of the device encoding, each of them once
+  if (std::find(this->options_encoders_.begin() + 1, this->options_encoders_.end(), encoder) ==
+      this->options_encoders_.end()) {
+    return;
+  }
+  if (!this->variant_learned_) {
+    this->encoders_.clear();
+    this->variant_learned_ = true;
+  } else if (std::find(this->encoders_.begin(), this->encoders_.end(), encoder) != this->encoders_.end()) {
+    return;
   }
+  this->encoders_.push_back(encoder);
+  ESP_LOGI(TAG, "'%s' - variant learned: %s, now using %u of the %u variants.", this->get_name().c_str(),
+           encoder->get_id(), (unsigned) this->encoders_.size(), (unsigned) (this->options_encoders_.size() - 1));
 }
 
-bool BleAdvDevice::is_elligible(const std::string &enc_id, const ControllerParam_t &cont) {
-  return (this->encoders_.size() == 1) && (this->encoders_.front()->get_id() == enc_id) &&
+bool BleAdvDevice::is_elligible(uint8_t enc_index, const ControllerParam_t &cont) {
+  return (this->encoders_.size() == 1) && (this->encoders_.front()->get_index() == enc_index) &&
          (cont.id_ == this->params_.id_) && (cont.index_ == this->params_.index_);
 }
 
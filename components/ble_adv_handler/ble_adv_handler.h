@@ -11,12 +11,13 @@
 #endif
 #include "esphome/components/select/select.h"
 #include "esphome/components/number/number.h"
-
-#include <freertos/semphr.h>
+#include "ble_adv_hash_index.h"
+#include "ble_adv_ring.h"
 
 #include <esp_gap_ble_api.h>
+#include <algorithm>
+#include <cinttypes>
 #include <vector>
-#include <list>
 
 namespace esphome {
 
@@ -117,19 +118,200 @@ class BleAdvParam {
   size_t data_index_{MAX_PACKET_LEN};
 };
 
-using BleAdvParams = std::vector<ble_adv_handler::BleAdvParam>;
+#ifndef BLE_ADV_PACKET_POOL_SIZE
+#define BLE_ADV_PACKET_POOL_SIZE 64
+#endif
+
+/**
+  BleAdvPacketPool: Fixed capacity pool of the packets being encoded, queued by the controllers or advertised,
+    allocated at build time so that no heap allocation is done on each command.
+  The packets are referenced by their index in the pool, and chained by index to build the lists of packets,
+    the free packets being chained the same way.
+  When full, the packets are encoded in a scratch packet and dropped.
+ */
+class BleAdvPacketPool {
+ public:
+  using Handle = uint8_t;
+  static constexpr size_t CAPACITY = BLE_ADV_PACKET_POOL_SIZE;
+  static constexpr Handle NONE = 0xFF;
+  static_assert(CAPACITY <= NONE, "BLE_ADV_PACKET_POOL_SIZE too high");
+
+  static BleAdvPacketPool &get();
+
+  // a cleared packet, NONE if the pool is full
+  Handle alloc();
+  void release(Handle handle);
+
+  BleAdvParam &operator[](Handle handle) { return (handle != NONE) ? this->packets_[handle] : this->scratch_; }
+  Handle get_next(Handle handle) const { return this->next_[handle]; }
+  void set_next(Handle handle, Handle next) { this->next_[handle] = next; }
+
+  size_t size() const { return this->size_; }
+  size_t get_high_water() const { return this->high_water_; }
+  uint32_t get_failures() const { return this->failures_; }
+
+ protected:
+  BleAdvPacketPool();
+
+  BleAdvParam packets_[CAPACITY];
+  Handle next_[CAPACITY];
+  Handle free_head_{0};
+  BleAdvParam scratch_;
+
+  size_t size_{0};
+  size_t high_water_{0};
+  uint32_t failures_{0};
+};
+
+/**
+  BleAdvParams: List of packets owned, chained in the packet pool
+ */
+class BleAdvParams {
+  using Handle = BleAdvPacketPool::Handle;
+
+ public:
+  class iterator {
+   public:
+    iterator(Handle handle) : handle_(handle) {}
+    BleAdvParam &operator*() const { return BleAdvPacketPool::get()[this->handle_]; }
+    iterator &operator++() {
+      this->handle_ = BleAdvPacketPool::get().get_next(this->handle_);
+      return *this;
+    }
+    bool operator!=(const iterator &other) const { return this->handle_ != other.handle_; }
+
+   protected:
+    Handle handle_;
+  };
+
+  BleAdvParams() {}
+  ~BleAdvParams() { this->clear(); }
+  BleAdvParams(BleAdvParams &&other) { *this = std::move(other); }
+  BleAdvParams &operator=(BleAdvParams &&other);
+
+  // the new packet at the end of the list, the scratch packet if the pool is full
+  BleAdvParam &emplace_back();
+  // the last packet, the scratch packet if none
+  BleAdvParam &back() { return BleAdvPacketPool::get()[this->tail_]; }
+  // Detach the first packet from the list, its release being the responsibility of the caller
+  Handle pop_front();
+  void clear();
+
+  bool empty() const { return this->head_ == BleAdvPacketPool::NONE; }
+  size_t size() const { return this->size_; }
+  iterator begin() const { return iterator(this->head_); }
+  iterator end() const { return iterator(BleAdvPacketPool::NONE); }
+
+ protected:
+  Handle head_{BleAdvPacketPool::NONE};
+  Handle tail_{BleAdvPacketPool::NONE};
+  size_t size_{0};
+};
+
+/**
+  BleAdvQueueStats: Statistics of the time spent in the advertiser by the messages of a source (controller)
+    The latency of a message is the time from its registration to the end of the last slot it is guaranteed.
+ */
+struct BleAdvQueueStats {
+  uint32_t nb_msgs_{0};
+  uint32_t nb_missed_{0};  // messages fully advertised after their deadline
+  uint32_t sum_latency_{0};
+  uint32_t max_latency_{0};
+  uint32_t last_latency_{0};
+
+  void add(uint32_t latency, bool missed);
+  uint32_t get_avg_latency() const { return (this->nb_msgs_ > 0) ? (this->sum_latency_ / this->nb_msgs_) : 0; }
+};
 
 class BleAdvProcess {
  public:
-  BleAdvProcess(uint32_t id, BleAdvParam &&param) : param_(std::move(param)), id_(id) {}
-  BleAdvParam param_;
+  BleAdvPacketPool::Handle packet_{BleAdvPacketPool::NONE};
   uint32_t id_{0};
-  bool processed_once_{false};
+  uint32_t queued_time_{0};
+  uint32_t deadline_{0};
+  BleAdvQueueStats *stats_{nullptr};
+  uint16_t nb_slots_{0};
+  uint32_t last_slot_{0};  // number of the last slot it was advertised in, 0 if never
   bool to_be_removed_{false};
+};
+
+/**
+  BleAdvScheduler: Selection of the packet to be advertised in the next slot, among the packets of all the controllers
+  Each message (the packets of a command) is registered with a deadline, by which each of its packets
+    should have been advertised in min_slots slots. Until then, the message cannot be removed.
+  The packets not having their min slots are advertised first, earliest deadline first,
+    then all the packets are advertised in turn, least recently advertised first.
+  The packets are taken from the messages when added, and released to the packet pool when removed.
+ */
+class BleAdvScheduler {
+ public:
+  void set_min_slots(uint8_t min_slots) { this->min_slots_ = min_slots; }
+
+  uint16_t add(BleAdvParams &params, uint32_t now, uint32_t max_delay, BleAdvQueueStats *stats);
+  void remove(uint16_t msg_id);
+
+  // Start a new slot: clean-up the removed packets and select the one to be advertised, nullptr if none
+  BleAdvParam *start_slot(uint32_t now);
+  // The on going slot can be ended if another packet is waiting, or if its packet is to be removed
+  bool is_slot_end_needed() const;
+
+  size_t size() const { return this->size_; }
+
+ protected:
+  bool is_due(const BleAdvProcess &process) const { return process.nb_slots_ < this->min_slots_; }
+  bool is_before(const BleAdvProcess &a, const BleAdvProcess &b) const;
+  void on_slot(BleAdvProcess &process, uint32_t slot_end);
+
+  // packets being advertised, the one of the on going slot first
+  BleAdvProcess packets_[BleAdvPacketPool::CAPACITY];
+  size_t size_{0};
+  uint16_t id_count_{1};
+  uint32_t slot_count_{0};
+  uint8_t min_slots_{1};
+};
+
+/**
+  BleAdvScanRing: Ring of the received packets, filled by the BLE stack callback and drained by the loop,
+    with no allocation nor lock. When full, the received packets are dropped and counted.
+ */
+using BleAdvScanRing = BleAdvSpscRing<BleAdvParam, 64>;
+
+/**
+  BleAdvDedupSet: Fixed capacity set of the recently received packets, to process each of them only once
+  The packets are identified by a hash of their data, and stored in a ring in reception order,
+    so that the expired ones are always at the head of the ring.
+  The lookup is done in a hash index of the ring.
+  When full, the oldest packet is evicted before its expiry.
+ */
+class BleAdvDedupSet {
+ public:
+  static constexpr size_t CAPACITY = 512;
+
+  BleAdvDedupSet() { this->index_.reset(TABLE_SIZE); }
+
+  // true if the packet was already registered and is not expired, else registers it with its expiry time
+  bool check_and_add(const BleAdvParam &param, uint32_t expiry);
+  void remove_expired(uint32_t now);
 
-  // Only move operators to avoid data copy
-  BleAdvProcess(BleAdvProcess &&) = default;
-  BleAdvProcess &operator=(BleAdvProcess &&) = default;
+  uint32_t get_hits() const { return this->hits_; }
+  uint32_t get_misses() const { return this->misses_; }
+  uint32_t get_evictions() const { return this->evictions_; }
+  size_t size() const { return this->size_; }
+
+ protected:
+  static constexpr size_t TABLE_SIZE = 2 * CAPACITY;  // power of 2
+  static uint64_t hash(const BleAdvParam &param);
+  void remove_head();
+
+  uint64_t hashes_[CAPACITY]{0};
+  uint32_t expiries_[CAPACITY]{0};
+  size_t head_{0};
+  size_t size_{0};
+  BleAdvHashIndex<uint64_t, uint16_t> index_;
+
+  uint32_t hits_{0};
+  uint32_t misses_{0};
+  uint32_t evictions_{0};
 };
 
 class BleAdvGenCmd {
@@ -160,6 +342,49 @@ class BleAdvTranslator_base {
   virtual bool e2g_cmd(const BleAdvEncCmd &enc_cmd, BleAdvGenCmd &gen_cmd) const { return false; };
 };
 
+/**
+  BleAdvEncoderDesc:
+    Static description of an encoder, generated at build time in a flash resident table.
+    The index is the integer ID of the encoder, its position in the table and in the BleAdvHandler.
+    The strings are only used for the UI and the logs.
+ */
+struct BleAdvEncoderDesc {
+  static constexpr size_t MAX_HEADER_LEN = 16;
+  uint8_t index;
+  const char *id;
+  const char *encoding;
+  const char *variant;
+  uint8_t ad_flag;
+  uint8_t adv_data_type;
+  uint8_t header_len;
+  uint8_t header[MAX_HEADER_LEN];
+};
+
+/**
+  BleAdvDispatchIndex:
+    Static index of the encoders able to decode a received packet, generated at build time in flash resident tables.
+    Keyed by the data type and the first data byte of the packet, to be matched with the adv data type and
+      the first header byte of the encoders. The ad flag is not part of the key, the devices not always
+      advertising the one configured to be sent.
+    The encoders of each key include the ones tried on any packet (no header or debug mode), in integer ID order.
+ */
+struct BleAdvDispatchIndex {
+  static constexpr uint16_t NO_OFFSETS[2] = {0, 0};
+  static constexpr uint16_t Key(uint8_t data_type, uint8_t first_byte) { return (data_type << 8) | first_byte; }
+
+  const uint16_t *keys{nullptr};  // sorted
+  size_t nb_keys{0};
+  // start of the encoders of each key, then of the ones tried on any packet, then end
+  const uint16_t *offsets{NO_OFFSETS};
+  const uint8_t *encoders{nullptr};
+
+  // encoders of the key, or the ones tried on any packet if the key is unknown
+  std::pair<const uint8_t *, const uint8_t *> get_encoders(uint16_t key) const;
+  // some encoders having the key, to reject early in the BLE callback the packets no encoder can decode
+  bool has_key(uint16_t key) const { return std::binary_search(this->keys, this->keys + this->nb_keys, key); }
+  size_t get_nb_any() const { return this->offsets[this->nb_keys + 1] - this->offsets[this->nb_keys]; }
+};
+
 /**
   BleAdvEncoder:
     Base class for encoders, for registration in the BleAdvHandler
@@ -167,25 +392,17 @@ class BleAdvTranslator_base {
  */
 class BleAdvEncoder {
  public:
-  BleAdvEncoder(const std::string &encoding, const std::string &variant)
-      : id_(ID(encoding, variant)), encoding_(encoding), variant_(variant) {}
+  BleAdvEncoder(const BleAdvEncoderDesc &desc) : desc_(desc) {}
 
   static constexpr const char *VARIANT_ALL = "All";
   static std::string ID(const std::string &encoding, const std::string &variant) {
     return (encoding + " - " + variant);
   }
-  const std::string &get_id() const { return this->id_; }
-  const std::string &get_encoding() const { return this->encoding_; }
-  const std::string &get_variant() const { return this->variant_; }
+  uint8_t get_index() const { return this->desc_.index; }
+  const char *get_id() const { return this->desc_.id; }
+  const char *get_encoding() const { return this->desc_.encoding; }
+  const char *get_variant() const { return this->desc_.variant; }
 
-  void set_ble_param(uint8_t ad_flag, uint8_t adv_data_type) {
-    this->ad_flag_ = ad_flag;
-    this->adv_data_type_ = adv_data_type;
-  }
-  bool is_ble_param(uint8_t ad_flag, uint8_t adv_data_type) const {
-    return this->ad_flag_ == ad_flag && this->adv_data_type_ == adv_data_type;
-  }
-  void set_header(const std::vector<uint8_t> &&header) { this->header_ = header; }
   void set_translator(BleAdvTranslator_base *trans) { this->translator_ = trans; }
   void set_debug_mode(bool debug_mode) { this->debug_mode_ = debug_mode; }
 
@@ -210,17 +427,10 @@ class BleAdvEncoder {
   bool check_eq_buf(const uint8_t *ref_buf, const uint8_t *comp_buf, size_t len, const char *msg) const;
   void log_buffer(const uint8_t *buf, size_t len, const char *msg) const;
 
-  // encoder identifiers
-  std::string id_;
-  std::string encoding_;
-  std::string variant_;
-
-  // BLE parameters
-  uint8_t ad_flag_{0x00};
-  uint8_t adv_data_type_{ESP_BLE_AD_MANUFACTURER_SPECIFIC_TYPE};
+  // encoder identifiers, BLE parameters and header
+  const BleAdvEncoderDesc &desc_;
 
   // Common parameters
-  std::vector<uint8_t> header_;
   size_t len_{0};
   bool debug_mode_{false};
 
@@ -271,6 +481,7 @@ class BleAdvHandler : public Component,
   // component handling
   void setup() override;
   void loop() override;
+  void dump_config() override;
 
   // Options
   void set_logging(bool raw, bool cmd, bool config) {
@@ -281,14 +492,21 @@ class BleAdvHandler : public Component,
   void set_check_reencoding(bool check) { this->check_reencoding_ = check; }
   void set_scan_activated(bool scan_activated) { this->scan_activated_ = scan_activated; }
   void set_use_max_tx_power(bool use_max_tx_power) { this->use_max_tx_power_ = use_max_tx_power; }
+  void set_dedup_window(uint32_t dedup_window) { this->dedup_window_ = dedup_window; }
+  const BleAdvDedupSet &get_dedup_set() const { return this->processed_packets_; }
+  const BleAdvScanRing &get_scan_ring() const { return this->new_packets_; }
+  const BleAdvPacketPool &get_packet_pool() const { return BleAdvPacketPool::get(); }
 
   // Encoder registration and access
   void add_encoder(BleAdvEncoder *encoder);
+  void set_dispatch_index(const BleAdvDispatchIndex &dispatch) { this->dispatch_ = dispatch; }
   BleAdvEncoder *get_encoder(const std::string &id);
   std::vector<std::string> get_ids(const std::string &encoding);
 
   // Advertiser
-  uint16_t add_to_advertiser(BleAdvParams &params);
+  void set_adv_min_slots(uint8_t min_slots) { this->scheduler_.set_min_slots(min_slots); }
+  const BleAdvScheduler &get_scheduler() const { return this->scheduler_; }
+  uint16_t add_to_advertiser(BleAdvParams &params, uint32_t max_delay = 0, BleAdvQueueStats *stats = nullptr);
   void remove_from_advertiser(uint16_t msg_id);
 
   // Children devices handling
@@ -313,13 +531,19 @@ class BleAdvHandler : public Component,
   // ref to registered encoders
   std::vector<BleAdvEncoder *> encoders_;
 
+  // encoders to be tried on a received packet
+  BleAdvDispatchIndex dispatch_;
+
+  // early rejection of the scanned packets no encoder can decode, unless all of them are to be logged / triggered
+  bool is_listened(const BleAdvParam &param) const;
+  bool listen_all_{true};
+
   /**
     Performing ADV
    */
 
   // packets being advertised
-  std::list<BleAdvProcess> packets_;
-  uint16_t id_count = 1;
+  BleAdvScheduler scheduler_;
   uint32_t adv_stop_time_ = 0;
 
   esp_ble_adv_params_t adv_params_ = {
@@ -342,7 +566,6 @@ class BleAdvHandler : public Component,
    */
   void gap_event_handler(esp_gap_ble_cb_event_t event, esp_ble_gap_cb_param_t *param);
   bool scan_started_{false};
-  SemaphoreHandle_t scan_result_lock_;
 
   esp_ble_scan_params_t scan_params_ = {
       .scan_type = BLE_SCAN_TYPE_PASSIVE,
@@ -362,9 +585,10 @@ class BleAdvHandler : public Component,
   bool check_reencoding_{false};
   bool scan_activated_{false};
 
-  // Packets listened / already captured once
-  std::list<BleAdvParam> new_packets_;
-  std::list<BleAdvParam> processed_packets_;
+  // Packets listened / already captured once during the dedup window
+  BleAdvScanRing new_packets_;
+  BleAdvDedupSet processed_packets_;
+  uint32_t dedup_window_{60 * 1000};
 
   // children devices listening
   std::vector<BleAdvDevice *> devices_;
@@ -430,14 +654,23 @@ class BleAdvDevice : public Component,
   void set_index(uint8_t index) { this->params_.index_ = index; }
   void init(const std::string &encoding, const std::string &variant);
   void refresh_encoder(std::string id, size_t index);
+  void set_adaptive_variant(bool adaptive_variant) { this->adaptive_variant_ = adaptive_variant; }
+  bool is_adaptive_variant() const { return this->adaptive_variant_; }
+  // When 'All' is selected in adaptive mode, restrict the encoders to the variants decoded with the device id / index
+  void learn_variant(BleAdvEncoder *encoder, const ControllerParam_t &cont);
 
-  bool is_elligible(const std::string &enc_id, const ControllerParam_t &cont);
+  bool is_elligible(uint8_t enc_index, const ControllerParam_t &cont);
   virtual void publish(const BleAdvGenCmd &gen_cmd, bool apply_command) = 0;
 
  protected:
   ControllerParam_t params_;
   BleAdvSelect select_encoding_;
+  std::vector<BleAdvEncoder *> options_encoders_;
   std::vector<BleAdvEncoder *> encoders_;
+
+  bool adaptive_variant_{false};
+  bool all_selected_{false};
+  bool variant_learned_{false};
 };
 
 }  // namespace ble_adv_handler
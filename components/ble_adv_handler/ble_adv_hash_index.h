@@ -0,0 +1,64 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+namespace esphome {
+namespace ble_adv_handler {
+
+/**
+  BleAdvHashIndex: Open addressing table with linear probing, indexing by their key the entries of
+    an array of keys owned by the caller. The table size is a power of 2, allocated once by reset().
+  The removal is done by backward shift deletion, so that no tombstone is needed.
+ */
+template<typename K, typename I> class BleAdvHashIndex {
+ public:
+  // Set the table size, a power of 2 above the number of entries, and empty it
+  void reset(size_t table_size) { this->table_.assign(table_size, 0); }
+  bool empty_table() const { return this->table_.empty(); }
+
+  // Slot of the table having the key, or the empty slot where to add it
+  size_t find_slot(K key, const K *keys) const {
+    size_t mask = this->table_.size() - 1;
+    size_t slot = this->home(key);
+    while ((this->table_[slot] != 0) && (keys[this->table_[slot] - 1] != key)) {
+      slot = (slot + 1) & mask;
+    }
+    return slot;
+  }
+  bool is_used(size_t slot) const { return this->table_[slot] != 0; }
+  I get(size_t slot) const { return this->table_[slot] - 1; }
+  void set(size_t slot, I index) { this->table_[slot] = index + 1; }
+
+  // Remove the key, still stored in the keys, moving back the following entries of its probing sequence
+  // that would not be found anymore with an empty slot before them
+  void remove(K key, const K *keys) {
+    size_t mask = this->table_.size() - 1;
+    size_t slot = this->find_slot(key, keys);
+    size_t next = slot;
+    while (true) {
+      next = (next + 1) & mask;
+      if (this->table_[next] == 0) {
+        break;
+      }
+      size_t home = this->home(keys[this->table_[next] - 1]);
+      if (((next - home) & mask) >= ((next - slot) & mask)) {
+        this->table_[slot] = this->table_[next];
+        slot = next;
+      }
+    }
+    this->table_[slot] = 0;
+  }
+
+ protected:
+  // Fibonacci hashing, to spread the keys differing only by a few bits
+  size_t home(K key) const {
+    return (size_t) (((uint64_t) key * 0x9E3779B97F4A7C15ULL) >> 40) & (this->table_.size() - 1);
+  }
+
+  std::vector<I> table_;  // index in the keys + 1, 0 for an empty slot
+};
+
+}  // namespace ble_adv_handler
+}  // namespace esphome
@@ -0,0 +1,60 @@
+#pragma once
+
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <utility>
+
+namespace esphome {
+namespace ble_adv_handler {
+
+/**
+  BleAdvSpscRing: Single Producer / Single Consumer lock free ring of fixed capacity,
+    the producer and the consumer never allocating nor blocking.
+  When full, the pushed items are dropped and counted.
+  No dependency on ESPHome nor ESP-IDF, to be stress tested on host (tests/host).
+ */
+template<typename T, size_t N> class BleAdvSpscRing {
+ public:
+  static constexpr size_t CAPACITY = N;
+  static_assert((N & (N - 1)) == 0, "BleAdvSpscRing capacity must be a power of 2");
+
+  // Producer side: false if the ring is full and the item dropped
+  bool push(T &&item) {
+    this->received_.fetch_add(1, std::memory_order_relaxed);
+    size_t tail = this->tail_.load(std::memory_order_relaxed);
+    if (tail - this->head_.load(std::memory_order_acquire) == CAPACITY) {
+      this->dropped_.fetch_add(1, std::memory_order_relaxed);
+      return false;
+    }
+    this->slots_[tail & (CAPACITY - 1)] = std::move(item);
+    this->tail_.store(tail + 1, std::memory_order_release);
+    return true;
+  }
+
+  // Consumer side: false if the ring is empty
+  bool pop(T &item) {
+    size_t head = this->head_.load(std::memory_order_relaxed);
+    if (head == this->tail_.load(std::memory_order_acquire)) {
+      return false;
+    }
+    item = std::move(this->slots_[head & (CAPACITY - 1)]);
+    this->head_.store(head + 1, std::memory_order_release);
+    return true;
+  }
+
+  uint32_t get_received() const { return this->received_.load(std::memory_order_relaxed); }
+  uint32_t get_dropped() const { return this->dropped_.load(std::memory_order_relaxed); }
+
+ protected:
+  T slots_[CAPACITY];
+  // free running counters of the pushed / popped items, the slot being the counter modulo CAPACITY
+  std::atomic<size_t> tail_{0};
+  std::atomic<size_t> head_{0};
+
+  std::atomic<uint32_t> received_{0};
+  std::atomic<uint32_t> dropped_{0};
+};
+
+}  // namespace ble_adv_handler
+}  // namespace esphome
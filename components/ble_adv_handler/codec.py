@@ -1,6 +1,8 @@
 import esphome.codegen as cg
 import esphome.config_validation as cv
 from esphome.const import CONF_ID
+from esphome.core import CORE
+from esphome.helpers import cpp_string_escape, write_file_if_changed
 
 from .translator import BleAdvTranslator
 
@@ -9,12 +11,17 @@ BleAdvEncoder = bleadvhandler_ns.class_("BleAdvEncoder")
 
 CONF_BLE_ADV_TRANSLATOR_ID = "translator_id"
 
+GENERATED_ENCODERS_FILE = "ble_adv_generated_encoders.h"
+MAX_HEADER_LEN = 16  # BleAdvEncoderDesc::MAX_HEADER_LEN
+
 BASE_CODEC_SCHEMA = cv.Schema(
     {
         cv.GenerateID(): cv.declare_id(BleAdvEncoder),
         cv.GenerateID(CONF_BLE_ADV_TRANSLATOR_ID): cv.use_id(BleAdvTranslator),
         cv.Required("class"): cv.string,
-        cv.Required("header"): cv.ensure_list(cv.hex_uint8_t),
+        cv.Required("header"): cv.All(
+            cv.ensure_list(cv.hex_uint8_t), cv.Length(max=MAX_HEADER_LEN)
+        ),
         cv.Optional("max_forced_id", default=0xFFFFFFFF): cv.hex_uint32_t,
         cv.Optional("ble_param", default=[0x19, 0x03]): cv.ensure_list(cv.hex_uint8_t),
         cv.Optional("args", default=[]): cv.ensure_list(cv.valid),
@@ -42,11 +49,103 @@ def load_default_codecs(codecs, codecs_debug_mode):
     return codecs
 
 
-async def codec_to_code(config):
+def get_used_codecs(codecs, used_encodings, used_ids):
+    # Codecs of the encodings used by devices (whole family, needed by the encoding select and its 'All' variant),
+    # the ones used directly by ID, the ones in debug mode, and the user defined ones
+    used_encodings = set(used_encodings) | {
+        codec["args"][0] for codec in codecs if codec[CONF_ID].id in used_ids
+    }
+    return [
+        codec
+        for codec in codecs
+        if codec["args"][0] in used_encodings
+        or codec["args"][0] == "user_defined"
+        or codec["debug_mode"]
+    ]
+
+
+def get_encoder_desc_cpp(index, config):
+    encoding, variant = config["args"][0:2]
+    ad_flag, adv_data_type = config["ble_param"]
+    header = ", ".join(f"0x{x:02X}" for x in config["header"])
+    strs = ", ".join(
+        cpp_string_escape(x) for x in [f"{encoding} - {variant}", encoding, variant]
+    )
+    return (
+        f"    {{{index}, {strs}, 0x{ad_flag:02X}, 0x{adv_data_type:02X},"
+        f" {len(config['header'])}, {{{header}}}}},"
+    )
+
+
+def get_std_array_cpp(name, cpp_type, values, fmt="{}"):
+    items = ", ".join(fmt.format(x) for x in values)
+    return f"static constexpr std::array<{cpp_type}, {len(values)}> {name}{{{items}}};"
+
+
+def get_dispatch_index_cpp(codecs):
+    # Encoders able to decode a received packet by (adv data type, first header byte) key, as searched in
+    # BleAdvDispatchIndex: the encoders tried on any packet (no header or debug mode) are part of all the keys
+    any_indexes = [
+        index
+        for index, codec in enumerate(codecs)
+        if not codec["header"] or codec["debug_mode"]
+    ]
+    by_key = {}
+    for index, codec in enumerate(codecs):
+        if index not in any_indexes:
+            key = (codec["ble_param"][1] << 8) | codec["header"][0]
+            by_key.setdefault(key, set()).add(index)
+    keys = sorted(by_key)
+    offsets = []
+    encoders = []
+    for key in keys:
+        offsets.append(len(encoders))
+        encoders += sorted(by_key[key] | set(any_indexes))
+    offsets += [len(encoders), len(encoders) + len(any_indexes)]
+    encoders += any_indexes
+    return [
+        get_std_array_cpp("BLE_ADV_DISPATCH_KEYS", "uint16_t", keys, "0x{:04X}"),
+        get_std_array_cpp("BLE_ADV_DISPATCH_OFFSETS", "uint16_t", offsets),
+        get_std_array_cpp("BLE_ADV_DISPATCH_ENCODERS", "uint8_t", encoders),
+        "static constexpr BleAdvDispatchIndex BLE_ADV_DISPATCH{BLE_ADV_DISPATCH_KEYS.data(), BLE_ADV_DISPATCH_KEYS.size(),",
+        "                                                      BLE_ADV_DISPATCH_OFFSETS.data(), BLE_ADV_DISPATCH_ENCODERS.data()};",
+    ]
+
+
+def generated_encoders_to_code(codecs):
+    # Write the descriptors of the encoders in a flash resident table, indexed by the encoder integer ID,
+    # and the index dispatching the received packets to them,
+    # in the build folder of the config as for the generated translators.
+    content = "\n".join(
+        [
+            "#pragma once",
+            "",
+            '#include "esphome/components/ble_adv_handler/ble_adv_handler.h"',
+            "#include <array>",
+            "",
+            "namespace esphome {",
+            "namespace ble_adv_handler {",
+            "",
+            "static constexpr BleAdvEncoderDesc BLE_ADV_ENCODERS[] = {",
+            *[get_encoder_desc_cpp(index, codec) for index, codec in enumerate(codecs)],
+            "};",
+            "",
+            *get_dispatch_index_cpp(codecs),
+            "",
+            "}  // namespace ble_adv_handler",
+            "}  // namespace esphome",
+            "",
+        ]
+    )
+    write_file_if_changed(CORE.relative_src_path(GENERATED_ENCODERS_FILE), content)
+    cg.add_global(cg.RawStatement(f'#include "{GENERATED_ENCODERS_FILE}"'))
+
+
+async def codec_to_code(config, index):
+    # the encoding and variant are in the descriptor at 'index' of the generated table
     class_gen = bleadvhandler_ns.class_(config["class"], BleAdvEncoder)
-    var = cg.Pvariable(config[CONF_ID], class_gen.new(*config["args"]))
-    cg.add(var.set_ble_param(*config["ble_param"]))
-    cg.add(var.set_header(config["header"]))
+    desc = cg.RawExpression(f"ble_adv_handler::BLE_ADV_ENCODERS[{index}]")
+    var = cg.Pvariable(config[CONF_ID], class_gen.new(desc, *config["args"][2:]))
     cg.add(
         var.set_translator(await cg.get_variable(config[CONF_BLE_ADV_TRANSLATOR_ID]))
     )
@@ -8,9 +8,8 @@
 namespace esphome {
 namespace ble_adv_handler {
 
-FanLampEncoder::FanLampEncoder(const std::string &encoding, const std::string &variant,
-                               const std::vector<uint8_t> &prefix)
-    : BleAdvEncoder(encoding, variant), prefix_(prefix) {}
+FanLampEncoder::FanLampEncoder(const BleAdvEncoderDesc &desc, const std::vector<uint8_t> &prefix)
+    : BleAdvEncoder(desc), prefix_(prefix) {}
 
 uint16_t FanLampEncoder::get_seed(uint16_t forced_seed) const {
   return (forced_seed == 0) ? (uint16_t) rand() % 0xFFF5 : forced_seed;
@@ -20,9 +19,9 @@ uint16_t FanLampEncoder::crc16(uint8_t *buf, size_t len, uint16_t seed) const {
   return esphome::crc16be(buf, len, seed);
 }
 
-FanLampEncoderV1::FanLampEncoderV1(const std::string &encoding, const std::string &variant, uint8_t pair_arg3,
-                                   bool pair_arg_only_on_pair, bool xor1, uint8_t supp_prefix, uint16_t forced_crc16_2)
-    : FanLampEncoder(encoding, variant, {0xAA, 0x98, 0x43, 0xAF, 0x0B, 0x46, 0x46, 0x46}),
+FanLampEncoderV1::FanLampEncoderV1(const BleAdvEncoderDesc &desc, uint8_t pair_arg3, bool pair_arg_only_on_pair,
+                                   bool xor1, uint8_t supp_prefix, uint16_t forced_crc16_2)
+    : FanLampEncoder(desc, {0xAA, 0x98, 0x43, 0xAF, 0x0B, 0x46, 0x46, 0x46}),
       pair_arg3_(pair_arg3),
       pair_arg_only_on_pair_(pair_arg_only_on_pair),
       with_crc2_(supp_prefix == 0x00 || forced_crc16_2 != 0),
@@ -141,9 +140,9 @@ void FanLampEncoderV1::encode(uint8_t *buf, BleAdvEncCmd &enc_cmd, ControllerPar
   this->whiten(buf, this->len_, 0x6F);
 }
 
-FanLampEncoderV2::FanLampEncoderV2(const std::string &encoding, const std::string &variant,
-                                   const std::vector<uint8_t> &&prefix, uint16_t device_type, bool with_sign)
-    : FanLampEncoder(encoding, variant, prefix), device_type_(device_type), with_sign_(with_sign) {
+FanLampEncoderV2::FanLampEncoderV2(const BleAdvEncoderDesc &desc, const std::vector<uint8_t> &&prefix,
+                                   uint16_t device_type, bool with_sign)
+    : FanLampEncoder(desc, prefix), device_type_(device_type), with_sign_(with_sign) {
   this->len_ = this->prefix_.size() + sizeof(data_map_t);
 }
 
@@ -154,19 +153,39 @@ std::string FanLampEncoderV2::to_str(const BleAdvEncCmd &enc_cmd) const {
   return ret;
 }
 
+/**
+  FanLampSignKey: AES context of the sign, with the key schedule of the last seed / tx count.
+    The key only depends on them, so the schedule is shared by all the instances and reused
+    by the successive signs of a same packet: re encoding check, 'All' variant, decoding by several variants.
+    Only used from the main loop.
+ */
+class FanLampSignKey {
+ public:
+  FanLampSignKey() { mbedtls_aes_init(&this->aes_ctx_); }
+
+  mbedtls_aes_context *get(uint8_t tx_count, uint16_t seed) {
+    uint32_t key_id = (1 << 24) | (tx_count << 16) | seed;
+    if (key_id != this->key_id_) {
+      uint8_t sigkey[16] = {0, 0, 0, 0x0D, 0xBF, 0xE6, 0x42, 0x68, 0x41, 0x99, 0x2D, 0x0F, 0xB0, 0x54, 0xBB, 0x16};
+      sigkey[0] = seed & 0xff;
+      sigkey[1] = (seed >> 8) & 0xff;
+      sigkey[2] = tx_count;
+      mbedtls_aes_setkey_enc(&this->aes_ctx_, sigkey, sizeof(sigkey) * 8);
+      this->key_id_ = key_id;
+    }
+    return &this->aes_ctx_;
+  }
+
+ protected:
+  mbedtls_aes_context aes_ctx_;
+  uint32_t key_id_{0};  // no key set
+};
+
 uint16_t FanLampEncoderV2::sign(uint8_t *buf, uint8_t tx_count, uint16_t seed) const {
-  uint8_t sigkey[16] = {0, 0, 0, 0x0D, 0xBF, 0xE6, 0x42, 0x68, 0x41, 0x99, 0x2D, 0x0F, 0xB0, 0x54, 0xBB, 0x16};
-
-  sigkey[0] = seed & 0xff;
-  sigkey[1] = (seed >> 8) & 0xff;
-  sigkey[2] = tx_count;
-  mbedtls_aes_context aes_ctx;
-  mbedtls_aes_init(&aes_ctx);
-  mbedtls_aes_setkey_enc(&aes_ctx, sigkey, sizeof(sigkey) * 8);
+  static FanLampSignKey sign_key;
   uint8_t aes_in[16], aes_out[16];
   memcpy(aes_in, buf, 16);
-  mbedtls_aes_crypt_ecb(&aes_ctx, ESP_AES_ENCRYPT, aes_in, aes_out);
-  mbedtls_aes_free(&aes_ctx);
+  mbedtls_aes_crypt_ecb(sign_key.get(tx_count, seed), ESP_AES_ENCRYPT, aes_in, aes_out);
   uint16_t sign = ((uint16_t *) aes_out)[0];
   return sign == 0 ? 0xffff : sign;
 }
@@ -7,7 +7,7 @@ namespace ble_adv_handler {
 
 class FanLampEncoder : public BleAdvEncoder {
  public:
-  FanLampEncoder(const std::string &encoding, const std::string &variant, const std::vector<uint8_t> &prefix);
+  FanLampEncoder(const BleAdvEncoderDesc &desc, const std::vector<uint8_t> &prefix);
 
  protected:
   uint16_t get_seed(uint16_t forced_seed = 0) const;
@@ -18,9 +18,8 @@ class FanLampEncoder : public BleAdvEncoder {
 
 class FanLampEncoderV1 : public FanLampEncoder {
  public:
-  FanLampEncoderV1(const std::string &encoding, const std::string &variant, uint8_t pair_arg3,
-                   bool pair_arg_only_on_pair = true, bool xor1 = false, uint8_t supp_prefix = 0x00,
-                   uint16_t forced_crc16_2 = 0x0000);
+  FanLampEncoderV1(const BleAdvEncoderDesc &desc, uint8_t pair_arg3, bool pair_arg_only_on_pair = true,
+                   bool xor1 = false, uint8_t supp_prefix = 0x00, uint16_t forced_crc16_2 = 0x0000);
 
  protected:
   static constexpr size_t ARGS_LEN = 3;
@@ -49,8 +48,8 @@ class FanLampEncoderV1 : public FanLampEncoder {
 
 class FanLampEncoderV2 : public FanLampEncoder {
  public:
-  FanLampEncoderV2(const std::string &encoding, const std::string &variant, const std::vector<uint8_t> &&prefix,
-                   uint16_t device_type, bool with_sign);
+  FanLampEncoderV2(const BleAdvEncoderDesc &desc, const std::vector<uint8_t> &&prefix, uint16_t device_type,
+                   bool with_sign);
 
  protected:
   static constexpr size_t ARGS_LEN = 2;
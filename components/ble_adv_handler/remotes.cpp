@@ -4,8 +4,7 @@
 namespace esphome {
 namespace ble_adv_handler {
 
-RemoteEncoder::RemoteEncoder(const std::string &encoding, const std::string &variant)
-    : BleAdvEncoder(encoding, variant) {
+RemoteEncoder::RemoteEncoder(const BleAdvEncoderDesc &desc) : BleAdvEncoder(desc) {
   this->len_ = sizeof(data_map_t);
 }
 
@@ -7,7 +7,7 @@ namespace ble_adv_handler {
 
 class RemoteEncoder : public BleAdvEncoder {
  public:
-  RemoteEncoder(const std::string &encoding, const std::string &variant);
+  RemoteEncoder(const BleAdvEncoderDesc &desc);
 
  protected:
   struct data_map_t {
@@ -1,10 +1,16 @@
 # type: ignore     as the whole file is based on generated functions not covered by type hinting
-from functools import partialmethod
+from bisect import bisect_right, insort
+from functools import cache, partialmethod
+import logging
+from math import inf
 import os
+import struct
 
 import esphome.codegen as cg
 import esphome.config_validation as cv
 from esphome.const import CONF_ID
+from esphome.core import CORE
+from esphome.helpers import write_file_if_changed
 
 bleadvhandler_ns = cg.esphome_ns.namespace("ble_adv_handler")
 # Crappy way to force the relevant prefix at C++ code generation time
@@ -13,11 +19,82 @@ CT = cg.esphome_ns.namespace("CommandType").enum("")
 FST = cg.esphome_ns.namespace("FanSubCmdType").enum("")
 BleAdvTranslator = bleadvhandler_ns.class_("BleAdvTranslator_base")
 
+GENERATED_TRANSLATORS_FILE = "ble_adv_generated_translators.h"
+
+_LOGGER = logging.getLogger(__name__)
+
 
 def rewrite_float(val):
     return f"{val}f" if isinstance(val, float) else f"{val}"
 
 
+### Host evaluation of translators, reproducing the C++ types and arithmetic of the generated code ###
+# The values are python scalars, or NumPy arrays of a column of commands for the batch evaluation
+# (tools/ble_adv_batch.py), NumPy not being needed by the component
+def is_array(val):
+    return hasattr(val, "dtype")
+
+
+def is_float(val):
+    return val.dtype.kind == "f" if is_array(val) else isinstance(val, float)
+
+
+def is_int(val):
+    return val.dtype.kind in "iu" if is_array(val) else isinstance(val, int)
+
+
+def to_float32(val):
+    if is_array(val):
+        return val.astype("float32")
+    return struct.unpack("f", struct.pack("f", val))[0]
+
+
+def to_uint8(val):
+    if is_array(val):
+        return val.astype("int64") & 0xFF
+    return int(val) & 0xFF
+
+
+def host_value(val):
+    # "0x28" => 40, "CommandType::ON" => "ON", 0.1 => 0.1f
+    if isinstance(val, str):
+        return int(val, 0) if val[:1].isdigit() else val.split("::")[-1]
+    if isinstance(val, float):
+        return to_float32(val)
+    return val
+
+
+def host_cast(field_val, val):
+    # Assignment of val to a C++ field having the type of field_val: float, uint8_t or enum
+    if is_float(field_val):
+        return to_float32(val)
+    if is_int(field_val):
+        return to_uint8(val)
+    return val
+
+
+def host_arith(op, left, right):
+    # C++ arithmetic: float as soon as one of the operands is a float, int otherwise
+    if is_float(left) or is_float(right):
+        left = to_float32(left)
+        right = to_float32(right)
+        if op == "+":
+            return to_float32(left + right)
+        if op == "-":
+            return to_float32(left - right)
+        if op == "*":
+            return to_float32(left * right)
+        return to_float32(left / right)
+    if op == "+":
+        return left + right
+    if op == "-":
+        return left - right
+    if op == "*":
+        return left * right
+    quotient = abs(left) // abs(right)  # C++ integer division truncates toward 0
+    return quotient * (1 - 2 * ((left < 0) != (right < 0)))
+
+
 class MultiplyParamAction:
     def __init__(self, factor):
         self._factor = factor
@@ -25,6 +102,9 @@ class MultiplyParamAction:
     def apply(self, statement, reverse=False):
         return f"({statement}) {'/' if reverse else '*'} {rewrite_float(self._factor)}"
 
+    def eval(self, value, reverse=False):
+        return host_arith("/" if reverse else "*", value, host_value(self._factor))
+
 
 class InverseParamAction:
     def __init__(self, max_value):
@@ -33,6 +113,9 @@ class InverseParamAction:
     def apply(self, statement, reverse=False):
         return f"({rewrite_float(self._max)} - ({statement}))"
 
+    def eval(self, value, reverse=False):
+        return host_arith("-", host_value(self._max), value)
+
 
 class ModuloParamAction:
     def __init__(self, factor):
@@ -43,6 +126,11 @@ class ModuloParamAction:
             return f"(uint8_t)({statement}) % {self._factor}"
         return statement
 
+    def eval(self, value, reverse=False):
+        if reverse:
+            return to_uint8(value) % self._factor
+        return value
+
 
 class CmdParam:
     def __init__(self, conf_name, cpp_name, class_instance_ref):
@@ -108,12 +196,31 @@ class CmdParam:
             return True
         return False
 
+    def covers(self, comp):
+        # all the values matching comp also match self, once converted to their C++ type
+        if (self._min is not None) and (
+            (comp._min is None) or (host_value(comp._min) < host_value(self._min))
+        ):
+            return False
+        if (self._max is not None) and (
+            (comp._max is None) or (host_value(comp._max) > host_value(self._max))
+        ):
+            return False
+        return True
+
     def get_cpp(self):
         cpp_statement = f"{self._class_instance_ref}.{self._cpp_name}"
         for action in self._actions:
             cpp_statement = action.apply(cpp_statement)
         return cpp_statement
 
+    def get_cpp_label(self):
+        # value of an 'eq' param as a switch case label, "0x28" and 40 giving the same label
+        try:
+            return f"0x{int(str(self._min), 0):02X}"
+        except ValueError:
+            return str(self._min)
+
     def get_cpp_cond(self):
         cond_list = []
         if self.is_eq():
@@ -143,6 +250,36 @@ class CmdParam:
             return f"{self._class_instance_ref}.{self._cpp_name} = {cpp_statement}; "
         return ""
 
+    def eval(self, values):
+        value = values[self._conf_name]
+        for action in self._actions:
+            value = action.eval(value)
+        return value
+
+    def eval_cond(self, values):
+        value = values[self._conf_name]
+        if self.is_eq():
+            return value == host_value(self._min)
+        cond = True
+        if self._min is not None:
+            cond = cond & (value >= host_value(self._min))
+        if self._max is not None:
+            cond = cond & (value <= host_value(self._max))
+        return cond
+
+    def eval_exec(self, values, from_values):
+        if self.is_eq():
+            value = host_value(self._min)
+        elif self._copy_from:
+            value = self._copy_from[0].eval(from_values)
+            for from_param in self._copy_from[1:]:
+                value = host_arith("+", value, from_param.eval(from_values))
+            for action in self._actions[::-1]:
+                value = action.eval(value, True)
+        else:
+            return
+        values[self._conf_name] = host_cast(values[self._conf_name], value)
+
 
 class CmdBase:
     ## Represents the Conditions on a BleAdvGenCmd / BleAdvEncCmd
@@ -188,12 +325,22 @@ class CmdBase:
                 return False
         return True
 
-    def get_cpp_cond(self):
+    def covers(self, comp) -> bool:
+        for name, cmd_param in self._attribs.items():
+            if not cmd_param.covers(comp._attribs[name]):
+                return False
+        return True
+
+    def get_cpp_cond(self, excluded=()):
         return " && ".join(
             list(
                 filter(
                     len,
-                    [cmd_param.get_cpp_cond() for cmd_param in self._attribs.values()],
+                    [
+                        cmd_param.get_cpp_cond()
+                        for name, cmd_param in self._attribs.items()
+                        if name not in excluded
+                    ],
                 )
             )
         )
@@ -203,6 +350,26 @@ class CmdBase:
             [cmd_param.get_cpp_exec() for cmd_param in self._attribs.values()]
         )
 
+    @classmethod
+    def host_cmd(cls, values=None):
+        # Host representation of a command: dict of its field values by config name,
+        # starting from the defaults of the C++ class, as generated / received by the software
+        cmd = dict(cls.HOST_DEFAULTS)
+        for name, val in (values or {}).items():
+            cmd[name] = host_cast(cmd[name], host_value(val))
+        return cmd
+
+    def eval_cond(self, values, excluded=()):
+        cond = True
+        for name, cmd_param in self._attribs.items():
+            if name not in excluded:
+                cond = cond & cmd_param.eval_cond(values)
+        return cond
+
+    def eval_exec(self, values, from_values):
+        for cmd_param in self._attribs.values():
+            cmd_param.eval_exec(values, from_values)
+
     def shortcuts_map(param, with_modifier):
         shortcuts = {}
         shortcuts[f"{param}"] = partialmethod(CmdBase.set_eq, param)
@@ -259,6 +426,8 @@ class EncCmd(CmdBase):
         ["arg1", "args[1]", cv.uint8_t, True, False],
         ["arg2", "args[2]", cv.uint8_t, True, False],
     ]
+    # Default values of BleAdvEncCmd fields
+    HOST_DEFAULTS = {"cmd": 0xFF, "param": 0, "arg0": 0, "arg1": 0, "arg2": 0}
 
     def __init__(self, cmd: int):
         super().__init__([CmdParam(x[0], x[1], "{ename}") for x in EncCmd.ATTRIBS])
@@ -295,6 +464,16 @@ class GenCmd(CmdBase):
         ["arg1", "args[1]", cv.float_range(), True, False],
         ["arg2", "args[2]", cv.float_range(), True, False],
     ]
+    # Default values of BleAdvGenCmd fields
+    HOST_DEFAULTS = {
+        "cmd": "NOCMD",
+        "type": "NOTYPE",
+        "index": 0,
+        "param": 0,
+        "arg0": 0.0,
+        "arg1": 0.0,
+        "arg2": 0.0,
+    }
 
     def __init__(self, cmd: str, entity: str, index: int = 0):
         super().__init__([CmdParam(x[0], x[1], "{gname}") for x in GenCmd.ATTRIBS])
@@ -364,11 +543,49 @@ class Trans:
         self._gen.get_param(g_param)._actions.append(MultiplyParamAction(float(multi)))
         return self._field_copy(g_param, e_param)
 
+    def get_cpp_g2e_label(self):
+        return self._gen.get_param("cmd").get_cpp_label()
+
+    def get_cpp_e2g_label(self):
+        return self._enc.get_param("cmd").get_cpp_label()
+
+    @staticmethod
+    def get_cpp_case(cond, exec):
+        # 'cmd' is already checked by the switch: no condition left means unconditional
+        return (
+            f"if ({cond}) {{ {exec}return true; }}"
+            if cond
+            else f"{{ {exec}return true; }}"
+        )
+
     def get_cpp_g2e(self, gname, ename):
-        return f"if ({self._gen.get_cpp_cond().format(gname=gname, ename=ename)}) {{ {self._enc.get_cpp_exec().format(gname=gname, ename=ename)}return true; }}"
+        return self.get_cpp_case(
+            self._gen.get_cpp_cond(["cmd"]).format(gname=gname, ename=ename),
+            self._enc.get_cpp_exec().format(gname=gname, ename=ename),
+        )
 
     def get_cpp_e2g(self, gname, ename):
-        return f"if ({self._enc.get_cpp_cond().format(gname=gname, ename=ename)}) {{ {self._gen.get_cpp_exec().format(gname=gname, ename=ename)}return true; }}"
+        return self.get_cpp_case(
+            self._enc.get_cpp_cond(["cmd"]).format(gname=gname, ename=ename),
+            self._gen.get_cpp_exec().format(gname=gname, ename=ename),
+        )
+
+    def get_host_sides(self, direct=True):
+        # (checked, executed) commands of the g2e translation if direct, of the e2g one otherwise
+        return (self._gen, self._enc) if direct else (self._enc, self._gen)
+
+    def eval_g2e(self, gen, enc):
+        # 'cmd' already checked by the caller, as by the switch in C++
+        if not self._gen.eval_cond(gen, ["cmd"]):
+            return False
+        self._enc.eval_exec(enc, gen)
+        return True
+
+    def eval_e2g(self, enc, gen):
+        if not self._enc.eval_cond(enc, ["cmd"]):
+            return False
+        self._gen.eval_exec(gen, enc)
+        return True
 
     # shortcut 'copy' and 'multi' functions for each combination of args and param
     # copy_arg0 / multi_arg0_to_arg2 / multi_param / copy_param_to_arg1 / ...
@@ -397,9 +614,64 @@ class Trans:
     SHORTCUTS.append(Shortcut("no_reverse", no_reverse, cv.boolean, False))
 
 
+class CmdIndex:
+    ## Index of Commands by the values of their 'key' params, sorted by the min of a 'sort' param
+    # Used to only compare a command with the previous ones that could possibly intersect with it
+    def __init__(self, key_params, sort_param):
+        self._key_params = key_params
+        self._sort_param = sort_param
+        self._buckets = {}
+
+    def copy(self):
+        index = CmdIndex(self._key_params, self._sort_param)
+        index._buckets = {key: list(bucket) for key, bucket in self._buckets.items()}
+        return index
+
+    def _key(self, cmd):
+        # None if one of the key params is not a single value: to be compared with all buckets
+        params = [cmd.get_param(name) for name in self._key_params]
+        return (
+            tuple(param._min for param in params)
+            if all(param.is_eq() for param in params)
+            else None
+        )
+
+    def _bounds(self, cmd):
+        param = cmd.get_param(self._sort_param)
+        return (
+            -inf if param._min is None else param._min,
+            inf if param._max is None else param._max,
+        )
+
+    def add(self, pos, cmd):
+        bucket = self._buckets.setdefault(self._key(cmd), [])
+        insort(bucket, (self._bounds(cmd), pos, cmd), key=lambda x: (x[0][0], x[1]))
+
+    def first_intersecting(self, cmd):
+        # (pos, cmd) of the first added command intersecting with cmd, None if none
+        key = self._key(cmd)
+        if key is None:
+            buckets = self._buckets.values()
+        else:
+            buckets = [self._buckets.get(key, []), self._buckets.get(None, [])]
+        cmd_min, cmd_max = self._bounds(cmd)
+        found = None
+        for bucket in buckets:
+            # only the commands with their interval overlapping the one of cmd
+            end = bisect_right(bucket, cmd_max, key=lambda x: x[0][0])
+            for (_, prev_max), pos, prev_cmd in bucket[:end]:
+                if prev_max < cmd_min or (found is not None and pos > found[0]):
+                    continue
+                if cmd.intersects(prev_cmd):
+                    found = (pos, prev_cmd)
+        return found
+
+
 class FullTranslator:
     REGISTERED_TRANSLATORS = {}
     EXLUSIVE_CMD_PAIRS = []
+    GENERATED_CPP = ""
+    SORTED_TRANSLATORS = []
 
     @classmethod
     def Get(cls, id):
@@ -416,17 +688,72 @@ class FullTranslator:
         self._id = id
         self._cmds = cmds
         self._extend = extend
+        self._check_state = None
+        self._cmds_recursive = {}
+        self._shadowed = {}
+        self._host_tables = None
+
+    def get_cmds_recursive(self, override_order=False):
+        # parent commands first, or child commands first in override order (as evaluated in cpp)
+        # memoized, the extend chain being checked free of loop by GenerateAllTranslators
+        if override_order not in self._cmds_recursive:
+            if not self._extend:
+                cmds = self._cmds
+            else:
+                parent_cmds = self.Get(self._extend).get_cmds_recursive(override_order)
+                cmds = (
+                    self._cmds + parent_cmds
+                    if override_order
+                    else parent_cmds + self._cmds
+                )
+            self._cmds_recursive[override_order] = cmds
+        return self._cmds_recursive[override_order]
+
+    def get_root(self):
+        return self if not self._extend else self.Get(self._extend).get_root()
+
+    def get_host_tables(self):
+        # g2e and e2g commands of the extend chain in override order, by value of 'cmd', as dispatched in cpp
+        if self._host_tables is None:
+            g2e_cmds = {}
+            e2g_cmds = {}
+            for cmd in self.get_cmds_recursive(override_order=True):
+                if not cmd._no_direct:
+                    g2e_cmds.setdefault(
+                        host_value(cmd._gen.get_param("cmd")._min), []
+                    ).append(cmd)
+                if not cmd._no_reverse:
+                    e2g_cmds.setdefault(
+                        host_value(cmd._enc.get_param("cmd")._min), []
+                    ).append(cmd)
+            self._host_tables = (g2e_cmds, e2g_cmds)
+        return self._host_tables
+
+    def g2e(self, gen):
+        # Host evaluation of g2e_cmd, gen being the BleAdvGenCmd field values by config name
+        # (cmd, type, index, param, arg0, ...): the BleAdvEncCmd field values, None if not translated.
+        # The commands hard coded in the root translators defined in software (agarce_base) are not evaluated
+        gen = GenCmd.host_cmd(gen)
+        for cmd in self.get_host_tables()[0].get(gen["cmd"], []):
+            enc = EncCmd.host_cmd()
+            if cmd.eval_g2e(gen, enc):
+                return enc
+        return None
 
-    def get_cmds_recursive(self, level=0):
-        if level > 10:
-            raise cv.Invalid(
-                "Translator extend depth > 10, please check for reference loop."
-            )
-        return (
-            self._cmds
-            if not self._extend
-            else (self.Get(self._extend).get_cmds_recursive(level + 1) + self._cmds)
-        )
+    def e2g(self, enc):
+        # Host evaluation of e2g_cmd, reverse of g2e
+        enc = EncCmd.host_cmd(enc)
+        for cmd in self.get_host_tables()[1].get(enc["cmd"], []):
+            gen = GenCmd.host_cmd()
+            if cmd.eval_e2g(enc, gen):
+                return gen
+        return None
+
+    def g2e_all(self, gens):
+        return [self.g2e(gen) for gen in gens]
+
+    def e2g_all(self, encs):
+        return [self.e2g(enc) for enc in encs]
 
     def check_duplicate(self, cmd_ref, cmd_cmp):
         if cmd_ref.intersects(cmd_cmp):
@@ -443,10 +770,34 @@ class FullTranslator:
                     f"Translator ID '{self._id}': Incompatible Commands ({reason}) \n {cmd_ref}\n    and \n {cmd_cmp}\n"
                 )
 
+    def get_exclusive_sides(self, cmd_gen):
+        # (pair index, side) of the exclusive pairs intersecting with cmd_gen
+        sides = []
+        for ind, (_, pair1, pair2) in enumerate(self.EXLUSIVE_CMD_PAIRS):
+            if cmd_gen.intersects(pair1):
+                sides.append((ind, 0))
+            if cmd_gen.intersects(pair2):
+                sides.append((ind, 1))
+        return sides
+
     def check_consistency(self):
-        cmds = self.get_cmds_recursive()
-        checked_cmds = []
-        for cmd in cmds:
+        # Incremental check: the commands of the parent were already checked and their
+        # indexes are cached, only the own commands are compared with the previous ones
+        if self._check_state is not None:
+            return self._check_state
+        if self._extend:
+            enc_index, gen_index, excl_index, nb_cmds = self.Get(
+                self._extend
+            ).check_consistency()
+            enc_index = enc_index.copy()
+            gen_index = gen_index.copy()
+            excl_index = dict(excl_index)
+        else:
+            enc_index = CmdIndex(["cmd"], "param")
+            gen_index = CmdIndex(["cmd", "type", "index"], "arg0")
+            excl_index = {}
+            nb_cmds = 0
+        for pos, cmd in enumerate(self._cmds, nb_cmds):
             err = cmd._gen.validate()
             if err is not None:
                 raise cv.Invalid(
@@ -457,88 +808,248 @@ class FullTranslator:
                 raise cv.Invalid(
                     f"Translator ID '{self._id}': Invalid enc Command({err}) \n {cmd._enc}\n"
                 )
-            for prev_cmd in checked_cmds:
-                if not cmd._no_reverse and not prev_cmd._no_reverse:
-                    self.check_duplicate(cmd._enc, prev_cmd._enc)
-                if not cmd._no_direct and not prev_cmd._no_direct:
-                    self.check_duplicate(cmd._gen, prev_cmd._gen)
-                    self.check_exclusive(cmd._gen, prev_cmd._gen)
-            checked_cmds.append(cmd)
+            # conflicts with previous commands, the first previous one being reported
+            conflicts = []
+            if not cmd._no_reverse:
+                if prev := enc_index.first_intersecting(cmd._enc):
+                    conflicts.append(
+                        (prev[0], 0, self.check_duplicate, cmd._enc, prev[1])
+                    )
+                enc_index.add(pos, cmd._enc)
+            if not cmd._no_direct:
+                if prev := gen_index.first_intersecting(cmd._gen):
+                    conflicts.append(
+                        (prev[0], 1, self.check_duplicate, cmd._gen, prev[1])
+                    )
+                sides = self.get_exclusive_sides(cmd._gen)
+                for ind, side in sides:
+                    if prev := excl_index.get((ind, 1 - side)):
+                        conflicts.append(
+                            (prev[0], 2, self.check_exclusive, cmd._gen, prev[1])
+                        )
+                gen_index.add(pos, cmd._gen)
+                for ind, side in sides:
+                    excl_index.setdefault((ind, side), (pos, cmd._gen))
+            if conflicts:
+                _, _, check, cmd_ref, cmd_cmp = min(conflicts, key=lambda x: x[:2])
+                check(cmd_ref, cmd_cmp)
+        self._check_state = (
+            enc_index,
+            gen_index,
+            excl_index,
+            nb_cmds + len(self._cmds),
+        )
+        return self._check_state
 
     def get_class_name(self):
         return f"BleAdvTranslator_{self._id}"
 
-    def get_cpp_class(self):
+    @staticmethod
+    def get_cpp_switch(switch_ref, cases):
+        # One 'case' per command value, the remaining conditions being checked in the original order
+        if not cases:
+            return ""
+        sw = f"\n    switch ({switch_ref}) {{"
+        for label, stmts in cases.items():
+            sw += f"\n      case {label}:"
+            for stmt in stmts:
+                sw += f"\n        {stmt}"
+            sw += "\n        break;"
+        sw += "\n      default:"
+        sw += "\n        break;"
+        sw += "\n    }"
+        return sw
+
+    @staticmethod
+    def get_cpp_byte_index(index_name, cases):
+        # 256 entries table from a command byte to its case number (0: no case), to have the
+        # switch on dense case numbers resolved as a direct jump whatever the number of commands
+        try:
+            keys = [int(label, 0) for label in cases]
+        except ValueError:
+            return None, None
+        if not keys or len(keys) > 255 or not all(0 <= key < 256 for key in keys):
+            return None, None
+        index = [0] * 256
+        for num, key in enumerate(keys, 1):
+            index[key] = num
+        decl = f"\n  static constexpr uint8_t {index_name}[256] = {{"
+        for row in range(0, 256, 16):
+            decl += f"\n    {', '.join(str(x) for x in index[row : row + 16])},"
+        decl += "\n  };"
+        return decl, dict(zip(range(1, len(keys) + 1), cases.values()))
+
+    def get_class_cmds(self, flatten=False):
+        # flatten: a final class directly inheriting from the root translator (defined in software),
+        # with all the commands of the extend chain in override order, instead of calling the parent
+        if flatten:
+            return self.get_root(), self.get_cmds_recursive(override_order=True)
+        return FullTranslator.Get(self._extend), self._cmds
+
+    @staticmethod
+    def get_shadowed(cmds, side):
+        # (cmd, shadowing cmd) for each command whose 'gen' / 'enc' side is fully covered by the one
+        # of a previous command, and then never reached as the cpp returns on the first match.
+        # The consistency check rejects intersecting commands, but different values in config can
+        # still be the same once converted to their C++ type (float)
+        shadowed = []
+        previous = {}
+        for cmd in cmds:
+            if cmd._no_direct if side == "gen" else cmd._no_reverse:
+                continue
+            cond = cmd._gen if side == "gen" else cmd._enc
+            prev_conds = previous.setdefault(cond.get_param("cmd").get_cpp_label(), [])
+            for prev_cmd, prev_cond in prev_conds:
+                if prev_cond.covers(cond):
+                    shadowed.append((cmd, prev_cmd))
+                    break
+            else:
+                prev_conds.append((cmd, cond))
+        return shadowed
+
+    def get_class_shadowed(self, side, flatten=False):
+        # shadowed commands of the generated class, memoized as used for both generation and report
+        if (side, flatten) not in self._shadowed:
+            self._shadowed[(side, flatten)] = self.get_shadowed(
+                self.get_class_cmds(flatten)[1], side
+            )
+        return self._shadowed[(side, flatten)]
+
+    def get_cpp_class(self, flatten=False):
         gname = "g"
         ename = "e"
-        inh_class = FullTranslator.Get(self._extend).get_class_name()
-        cl = f"\nclass {self.get_class_name()}: public {inh_class}\n"
+        inh_trans, cmds = self.get_class_cmds(flatten)
+        inh_class = inh_trans.get_class_name()
+        g2e_shadowed = {cmd for cmd, _ in self.get_class_shadowed("gen", flatten)}
+        e2g_shadowed = {cmd for cmd, _ in self.get_class_shadowed("enc", flatten)}
+        g2e_cases = {}
+        e2g_cases = {}
+        for conds in cmds:
+            if not conds._no_direct and conds not in g2e_shadowed:
+                g2e_cases.setdefault(conds.get_cpp_g2e_label(), []).append(
+                    conds.get_cpp_g2e(gname, ename)
+                )
+            if not conds._no_reverse and conds not in e2g_shadowed:
+                e2g_cases.setdefault(conds.get_cpp_e2g_label(), []).append(
+                    conds.get_cpp_e2g(gname, ename)
+                )
+        cl = f"\nclass {self.get_class_name()}{' final' if flatten else ''}: public {inh_class}\n"
         cl += "{\n public:"
         cl += f"\n  bool g2e_cmd(const BleAdvGenCmd & {gname}, BleAdvEncCmd & {ename}) const override"
         cl += "\n  {"
-        for conds in self._cmds:
-            if not conds._no_direct:
-                cl += f"\n    {conds.get_cpp_g2e(gname, ename)}"
+        cl += self.get_cpp_switch(f"{gname}.cmd", g2e_cases)
         cl += f"\n    return {inh_class}::g2e_cmd({gname}, {ename});"
         cl += "\n  }"  # end of g2e
         cl += f"\n  bool e2g_cmd(const BleAdvEncCmd & {ename}, BleAdvGenCmd & {gname}) const override"
         cl += "\n  {"
-        for conds in self._cmds:
-            if not conds._no_reverse:
-                cl += f"\n    {conds.get_cpp_e2g(gname, ename)}"
+        e2g_index, e2g_index_cases = self.get_cpp_byte_index("E2G_INDEX", e2g_cases)
+        if e2g_index:
+            cl += self.get_cpp_switch(f"E2G_INDEX[{ename}.cmd]", e2g_index_cases)
+        else:
+            cl += self.get_cpp_switch(f"{ename}.cmd", e2g_cases)
         cl += f"\n    return {inh_class}::e2g_cmd({ename}, {gname});"
         cl += "\n  }"  # end of e2g
+        if e2g_index:
+            cl += "\n\n protected:"
+            cl += e2g_index
         cl += "\n};\n"
         return cl
 
     @classmethod
-    def GenerateAllTranslators(cls):
-        # sort the translators in the good order to have inheritance working in cpp
+    def GenerateAllTranslators(cls, flatten=False):
+        # sort the translators in the good order to have inheritance working in cpp:
+        # topological sort, each translator being added once the one it extends is sorted
         sorted_translators = []
-        map_translators = {}
+        children = {}
         for trans in cls.REGISTERED_TRANSLATORS.values():
-            map_translators.setdefault(trans._extend, []).append(trans)
-        sorted_translators = map_translators.pop(None)
-        while map_translators:
-            for trans in sorted_translators:
-                if trans._id in map_translators:
-                    sorted_translators += map_translators.pop(trans._id)
+            if trans._extend is None:
+                sorted_translators.append(trans)
+            elif trans._extend not in cls.REGISTERED_TRANSLATORS:
+                raise cv.Invalid(
+                    f"Translator ID '{trans._id}': extended translator '{trans._extend}' does not exist."
+                )
+            else:
+                children.setdefault(trans._extend, []).append(trans)
+        for trans in sorted_translators:  # extended while iterating
+            sorted_translators += children.pop(trans._id, [])
+        if children:
+            loop_ids = [trans._id for sub in children.values() for trans in sub]
+            raise cv.Invalid(
+                f"Translator IDs {loop_ids}: extend reference loop, please check 'extend'."
+            )
 
         # check consistency
         for trans in sorted_translators:
             trans.check_consistency()
 
-        # write the translator classes in "generated_translators.h"
-        with open(
-            os.path.join(os.path.dirname(__file__), "generated_translators.h"), "w"
-        ) as gen_file:
-            gen_file.write(
-                "// Generated Translators - GENERATED FILE: DO NOT EDIT NOR COMMIT"
-            )
-            gen_file.write('\n#include "ble_adv_handler.h"')
-            gen_file.write("\nnamespace esphome {")
-            gen_file.write("\nnamespace ble_adv_handler {\n")
-            for trans in sorted_translators:
-                if trans._extend is not None:
-                    gen_file.write(trans.get_cpp_class())
-            gen_file.write("\n} // namespace ble_adv_handler")
-            gen_file.write("\n} // namespace esphome")
-            gen_file.write("\n")
+        # report the commands never reached, not generated: once, on the translator defining the command,
+        # as when flattened the classes of the children include the commands of their parents
+        owners = {id(cmd): trans for trans in sorted_translators for cmd in trans._cmds}
+        reported = set()
+        for trans in sorted_translators:
+            if trans._extend is not None:
+                for side, direction in [("gen", "g2e"), ("enc", "e2g")]:
+                    for cmd, by in trans.get_class_shadowed(side, flatten):
+                        if (id(cmd), id(by), direction) in reported:
+                            continue
+                        reported.add((id(cmd), id(by), direction))
+                        _LOGGER.info(
+                            f"Translator ID '{owners[id(cmd)]._id}': Command never reached in {direction}, removed \n {cmd}\n    shadowed by \n {by}\n"
+                        )
+
+        # generate the translator classes, written at code generation time
+        cls.SORTED_TRANSLATORS = sorted_translators
+        cls.GENERATED_CPP = cls.GenerateCpp(sorted_translators, flatten)
+
+    @staticmethod
+    def GenerateCpp(sorted_translators, flatten=False):
+        content = "// Generated Translators - GENERATED FILE: DO NOT EDIT NOR COMMIT"
+        content += "\n#pragma once"
+        content += '\n#include "esphome/components/ble_adv_handler/ble_adv_handler.h"'
+        content += '\n#include "esphome/components/ble_adv_handler/agarce.h"'
+        content += "\nnamespace esphome {"
+        content += "\nnamespace ble_adv_handler {\n"
+        for trans in sorted_translators:
+            if trans._extend is not None:
+                content += trans.get_cpp_class(flatten)
+        content += "\n} // namespace ble_adv_handler"
+        content += "\n} // namespace esphome"
+        content += "\n"
+        return content
+
+    @classmethod
+    def GetUsedTranslators(cls, translator_ids):
+        # the translators and all the ones they extend
+        used_ids = set()
+        for trans_id in translator_ids:
+            while trans_id is not None and trans_id not in used_ids:
+                used_ids.add(trans_id)
+                trans_id = cls.Get(trans_id)._extend
+        return used_ids
+
+
+@cache
+def get_translator_cmd_schema():
+    # Built on first use only, as compiling the schemas of all shortcuts is costly
+    # and only needed when the user defines its own translators
+    return cv.Schema(
+        {
+            cv.Required("gen"): cv.Schema(GenCmd.SHORTCUTS.get_schema()),
+            cv.Required("enc"): cv.Schema(EncCmd.SHORTCUTS.get_schema()),
+            cv.Optional("trans"): cv.Schema(Trans.SHORTCUTS.get_schema()),
+        }
+    )
+
+
+def validate_translator_cmd(value):
+    return get_translator_cmd_schema()(value)
 
 
 BASE_TRANSLATOR_SCHEMA = cv.Schema(
     {
         cv.GenerateID(): cv.declare_id(BleAdvTranslator),
         cv.Optional("extend"): cv.use_id(BleAdvTranslator),
-        cv.Optional("cmds", default=[]): cv.ensure_list(
-            cv.Schema(
-                {
-                    cv.Required("gen"): cv.Schema(GenCmd.SHORTCUTS.get_schema()),
-                    cv.Required("enc"): cv.Schema(EncCmd.SHORTCUTS.get_schema()),
-                    cv.Optional("trans"): cv.Schema(Trans.SHORTCUTS.get_schema()),
-                }
-            )
-        ),
+        cv.Optional("cmds", default=[]): cv.ensure_list(validate_translator_cmd),
     }
 )
 
@@ -549,7 +1060,10 @@ def cmd_config(cmd, cmd_conf):
     return cmd
 
 
-def load_default_translators(translators):
+def load_default_translators(translators, flatten=False):
+    # Register the Default Translators first, so that they keep their place ahead of the user defined ones
+    default_translators = get_default_translators()
+
     # Complete the map of translators with user defined configs, for Class Generation
     for config in translators:
         extend_id = config["extend"].id if "extend" in config else None
@@ -565,7 +1079,7 @@ def load_default_translators(translators):
         FullTranslator(config[CONF_ID].id, extend_id, cmds)
 
     # Generate Stub config with only ID for Default Translators, for use as reference in config
-    for translator in BLE_ADV_DEFAULT_TRANSLATORS:
+    for translator in default_translators:
         translators.append(
             {
                 CONF_ID: cv.declare_id(BleAdvTranslator)(translator._id),
@@ -573,11 +1087,36 @@ def load_default_translators(translators):
         )
 
     # Check consistency and generate the cpp translators
-    FullTranslator.GenerateAllTranslators()
+    FullTranslator.GenerateAllTranslators(flatten)
 
     return translators
 
 
+def generated_translators_to_code(used_ids=None, flatten=False):
+    # Write the generated translators in the build folder of the config and include them in main.cpp,
+    # as the components folder can be shared by several configs built in parallel.
+    # Also remove the file generated in the components folder by previous versions: as all the headers of
+    # the component are included by esphome, it would define the translators twice. The components folder
+    # may be read only (git cache of external components), in which case the file cannot be removed.
+    # used_ids: only generate those translators, None for all.
+    legacy_file = os.path.join(os.path.dirname(__file__), "generated_translators.h")
+    if os.path.isfile(legacy_file):
+        try:
+            os.remove(legacy_file)
+        except OSError as err:
+            _LOGGER.warning(
+                f"Unable to remove '{legacy_file}' generated by a previous version ({err}),"
+                " remove it manually if the build fails with translators defined twice."
+            )
+    content = FullTranslator.GENERATED_CPP
+    if used_ids is not None:
+        content = FullTranslator.GenerateCpp(
+            [x for x in FullTranslator.SORTED_TRANSLATORS if x._id in used_ids], flatten
+        )
+    write_file_if_changed(CORE.relative_src_path(GENERATED_TRANSLATORS_FILE), content)
+    cg.add_global(cg.RawStatement(f'#include "{GENERATED_TRANSLATORS_FILE}"'))
+
+
 async def translator_to_code(config):
     class_gen = bleadvhandler_ns.class_(
         FullTranslator.Get(config[CONF_ID].id).get_class_name()
@@ -588,446 +1127,475 @@ async def translator_to_code(config):
 ### Mutual Exclusions as can be triggered simultaneously by the Entities in the software ###
 # The translator must then define ONLY one of them for a same Entity
 # Consider entity index can go up to 3, even if only 0 and 1 are effectivelly used for Light, and only 0 for Fan
-for i in range(3):
-    # Fan
-    FullTranslator.Add_exclusive(
-        "Fan - Full / On Off Speed",
-        FanCmd(CT.FAN_FULL, i).param(0),
-        FanCmd(CT.FAN_ONOFF_SPEED, i),
-    )
-    FullTranslator.Add_exclusive(
-        "Fan - Full / Direction", FanCmd(CT.FAN_FULL, i).param(0), FanCmd(CT.FAN_DIR, i)
-    )
-    FullTranslator.Add_exclusive(
-        "Fan - Full / Oscillation",
-        FanCmd(CT.FAN_FULL, i).param(0),
-        FanCmd(CT.FAN_OSC, i),
-    )
+@cache
+def register_exclusive_cmd_pairs():
+    for i in range(3):
+        # Fan
+        FullTranslator.Add_exclusive(
+            "Fan - Full / On Off Speed",
+            FanCmd(CT.FAN_FULL, i).param(0),
+            FanCmd(CT.FAN_ONOFF_SPEED, i),
+        )
+        FullTranslator.Add_exclusive(
+            "Fan - Full / Direction",
+            FanCmd(CT.FAN_FULL, i).param(0),
+            FanCmd(CT.FAN_DIR, i),
+        )
+        FullTranslator.Add_exclusive(
+            "Fan - Full / Oscillation",
+            FanCmd(CT.FAN_FULL, i).param(0),
+            FanCmd(CT.FAN_OSC, i),
+        )
 
-    # CWW Light
-    FullTranslator.Add_exclusive(
-        "Light CWW - Brightness / Cold and Warm",
-        LightCmd(CT.LIGHT_CWW_DIM, i).param(0),
-        LightCmd(CT.LIGHT_CWW_COLD_WARM, i).param(0),
-    )
-    FullTranslator.Add_exclusive(
-        "Light CWW - Color Temperature / Cold and Warm",
-        LightCmd(CT.LIGHT_CWW_WARM, i).param(0),
-        LightCmd(CT.LIGHT_CWW_COLD_WARM, i).param(0),
-    )
-    FullTranslator.Add_exclusive(
-        "Light CWW - Brightness / Full BR and CT",
-        LightCmd(CT.LIGHT_CWW_DIM, i).param(0),
-        LightCmd(CT.LIGHT_CWW_WARM_DIM, i).param(0),
-    )
-    FullTranslator.Add_exclusive(
-        "Light CWW - Color Temperature / Full BR and CT",
-        LightCmd(CT.LIGHT_CWW_WARM, i).param(0),
-        LightCmd(CT.LIGHT_CWW_WARM_DIM, i).param(0),
-    )
-    FullTranslator.Add_exclusive(
-        "Light CWW - Full BR and CT / Cold and Warm",
-        LightCmd(CT.LIGHT_CWW_WARM_DIM, i).param(0),
-        LightCmd(CT.LIGHT_CWW_COLD_WARM, i).param(0),
-    )
+        # CWW Light
+        FullTranslator.Add_exclusive(
+            "Light CWW - Brightness / Cold and Warm",
+            LightCmd(CT.LIGHT_CWW_DIM, i).param(0),
+            LightCmd(CT.LIGHT_CWW_COLD_WARM, i).param(0),
+        )
+        FullTranslator.Add_exclusive(
+            "Light CWW - Color Temperature / Cold and Warm",
+            LightCmd(CT.LIGHT_CWW_WARM, i).param(0),
+            LightCmd(CT.LIGHT_CWW_COLD_WARM, i).param(0),
+        )
+        FullTranslator.Add_exclusive(
+            "Light CWW - Brightness / Full BR and CT",
+            LightCmd(CT.LIGHT_CWW_DIM, i).param(0),
+            LightCmd(CT.LIGHT_CWW_WARM_DIM, i).param(0),
+        )
+        FullTranslator.Add_exclusive(
+            "Light CWW - Color Temperature / Full BR and CT",
+            LightCmd(CT.LIGHT_CWW_WARM, i).param(0),
+            LightCmd(CT.LIGHT_CWW_WARM_DIM, i).param(0),
+        )
+        FullTranslator.Add_exclusive(
+            "Light CWW - Full BR and CT / Cold and Warm",
+            LightCmd(CT.LIGHT_CWW_WARM_DIM, i).param(0),
+            LightCmd(CT.LIGHT_CWW_COLD_WARM, i).param(0),
+        )
+
+        # RGB Light
+        FullTranslator.Add_exclusive(
+            "Light RGB - Brightness / Full RGB",
+            LightCmd(CT.LIGHT_RGB_DIM, i).param(0),
+            LightCmd(CT.LIGHT_RGB_FULL, i).param(0),
+        )
+        FullTranslator.Add_exclusive(
+            "Light RGB - RGB / Full RGB",
+            LightCmd(CT.LIGHT_RGB_RGB, i).param(0),
+            LightCmd(CT.LIGHT_RGB_FULL, i).param(0),
+        )
 
-    # RGB Light
-    FullTranslator.Add_exclusive(
-        "Light RGB - Brightness / Full RGB",
-        LightCmd(CT.LIGHT_RGB_DIM, i).param(0),
-        LightCmd(CT.LIGHT_RGB_FULL, i).param(0),
-    )
-    FullTranslator.Add_exclusive(
-        "Light RGB - RGB / Full RGB",
-        LightCmd(CT.LIGHT_RGB_RGB, i).param(0),
-        LightCmd(CT.LIGHT_RGB_FULL, i).param(0),
-    )
 
 ########################################
 ###  DEFAULT TRANSLATORS DEFINITION  ###
 ########################################
 BLE_ADV_BASE_TRANSLATORS = ["base", "agarce_base"]  # translators defined in software
 
-BLE_ADV_DEFAULT_TRANSLATORS = [
-    *[FullTranslator(x, None, []) for x in BLE_ADV_BASE_TRANSLATORS],
-    FullTranslator(
-        "default_translator_fanlamp_common",
-        "base",
-        [
-            Trans(ContCmd(CT.PAIR), EncCmd(0x28)),
-            Trans(ContCmd(CT.UNPAIR), EncCmd(0x45)),
-            Trans(AllCmd(CT.OFF), EncCmd(0x6F)),
-            Trans(LightCmd(CT.TOGGLE), EncCmd(0x09)),
-            Trans(LightCmd(CT.ON), EncCmd(0x10)),
-            Trans(LightCmd(CT.OFF), EncCmd(0x11)),
-            Trans(LightCmd(CT.ON, 1), EncCmd(0x12)),
-            Trans(LightCmd(CT.OFF, 1), EncCmd(0x13)),
-            Trans(LightCmd(CT.LIGHT_CWW_COLD_WARM), EncCmd(0x21).param(0x00))
-            .multi_arg0(255)
-            .multi_arg1(255),
-            # Physical Remote and app phone shortcut buttons, only reverse
-            Trans(LightCmd(CT.LIGHT_CWW_COLD_WARM), EncCmd(0x21).param(0x40))
-            .multi_arg0(255)
-            .multi_arg1(255)
-            .no_direct(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0.1).arg1(0.1), EncCmd(0x23)
-            ).no_direct(),  # night mode
-            Trans(
-                LightCmd(CT.LIGHT_CWW_WARM).param(1), EncCmd(0x21).param(0x24)
-            ).no_direct(),  # K+
-            Trans(
-                LightCmd(CT.LIGHT_CWW_WARM).param(2), EncCmd(0x21).param(0x18)
-            ).no_direct(),  # K-
-            Trans(
-                LightCmd(CT.LIGHT_CWW_DIM).param(1), EncCmd(0x21).param(0x14)
-            ).no_direct(),  # B+
-            Trans(
-                LightCmd(CT.LIGHT_CWW_DIM).param(2), EncCmd(0x21).param(0x28)
-            ).no_direct(),  # B-
-            Trans(FanCmd(CT.FAN_OSC_TOGGLE), EncCmd(0x33)).no_direct(),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_flv1",
-        "default_translator_fanlamp_common",
-        [
-            Trans(ContCmd(CT.TIMER).arg0_max(0xFF), EncCmd(0x51)).copy_arg0(),
-            Trans(
-                ContCmd(CT.TIMER).arg0_min(0x100), EncCmd(0x51).arg0(0xFF)
-            ).no_reverse(),
-            Trans(FanCmd(CT.FAN_DIR), EncCmd(0x15)).copy_arg0(),
-            Trans(FanCmd(CT.FAN_OSC), EncCmd(0x16)).copy_arg0(),
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg1(3), EncCmd(0x31)).copy_arg0(),
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg1(6), EncCmd(0x32).arg1(6)).copy_arg0(),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_flv2",
-        "default_translator_fanlamp_common",
-        [
-            Trans(ContCmd(CT.TIMER), EncCmd(0x41).multi_arg0(256).modulo_param(256))
-            .copy_arg0_to_param()
-            .copy_arg0(),
-            Trans(LightCmd(CT.LIGHT_RGB_FULL), EncCmd(0x22))
-            .multi_arg0_to_param(255)
-            .multi_arg1_to_arg0(255)
-            .multi_arg2_to_arg1(255),
-            Trans(FanCmd(CT.FAN_DIR).arg0(0), EncCmd(0x15).param(0x00)),
-            Trans(FanCmd(CT.FAN_DIR).arg0(1), EncCmd(0x15).param(0x01)),
-            Trans(FanCmd(CT.FAN_OSC).arg0(0), EncCmd(0x16).param(0x00)),
-            Trans(FanCmd(CT.FAN_OSC).arg0(1), EncCmd(0x16).param(0x01)),
-            Trans(
-                FanCmd(CT.FAN_ONOFF_SPEED).arg1(3), EncCmd(0x31).param(0x00)
-            ).copy_arg0(),
-            Trans(
-                FanCmd(CT.FAN_ONOFF_SPEED).arg1(6), EncCmd(0x31).param(0x20)
-            ).copy_arg0(),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_zjv0",
-        "base",
-        [
-            Trans(ContCmd(CT.PAIR), EncCmd(0xB4)),
-            Trans(ContCmd(CT.UNPAIR), EncCmd(0xB0)),
-            Trans(ContCmd(CT.TIMER).arg0(60), EncCmd(0xD4)),
-            Trans(ContCmd(CT.TIMER).arg0(120), EncCmd(0xD5)),
-            Trans(ContCmd(CT.TIMER).arg0(240), EncCmd(0xD6)),
-            Trans(ContCmd(CT.TIMER).arg0(480), EncCmd(0xD7)),
-            Trans(LightCmd(CT.ON), EncCmd(0xB3)),
-            Trans(LightCmd(CT.OFF), EncCmd(0xB2)),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_DIM).multi_arg0(1000.0),
-                EncCmd(0xB5).multi_arg1(256.0).modulo_arg2(256),
-            )
-            .copy_arg0_to_arg1()
-            .copy_arg0_to_arg2(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_WARM).multi_arg0(1000.0),
-                EncCmd(0xB7).multi_arg1(256.0).modulo_arg2(256),
-            )
-            .copy_arg0_to_arg1()
-            .copy_arg0_to_arg2(),
-            Trans(LightCmd(CT.ON, 1), EncCmd(0xA6).arg0(1)),
-            Trans(LightCmd(CT.OFF, 1), EncCmd(0xA6).arg0(2)),
-            Trans(FanCmd(CT.FAN_DIR).arg0(0), EncCmd(0xD9)),
-            Trans(FanCmd(CT.FAN_DIR).arg0(1), EncCmd(0xDA)),
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(0), EncCmd(0xD8)),
-            # Fan speed_count 3, direct and reverse
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(1).arg1(3), EncCmd(0xD2)),
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(2).arg1(3), EncCmd(0xD1)),
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(3).arg1(3), EncCmd(0xD0)),
-            # Fan speed_count 6, direct only
-            Trans(
-                FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(1).arg0_max(2).arg1(6), EncCmd(0xD2)
-            ).no_reverse(),
-            Trans(
-                FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(3).arg0_max(4).arg1(6), EncCmd(0xD1)
-            ).no_reverse(),
-            Trans(
-                FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(5).arg0_max(6).arg1(6), EncCmd(0xD0)
-            ).no_reverse(),
-            # Physical remote and phone app shortcut buttons, reverse only
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0.1).arg1(0.1),
-                EncCmd(0xA1).arg0(25).arg1(25),
-            ).no_direct(),  # night mode
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(0),
-                EncCmd(0xA2).arg0(255).arg1(0),
-            ).no_direct(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0).arg1(1),
-                EncCmd(0xA3).arg0(0).arg1(255),
-            ).no_direct(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(1),
-                EncCmd(0xA4).arg0(255).arg1(255),
-            ).no_direct(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(0), EncCmd(0xA7).arg0(1)
-            ).no_direct(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0).arg1(1), EncCmd(0xA7).arg0(2)
-            ).no_direct(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(1), EncCmd(0xA7).arg0(3)
-            ).no_direct(),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_zjv1v2_common",
-        "base",
-        [
-            Trans(ContCmd(CT.PAIR), EncCmd(0xA2)),
-            Trans(ContCmd(CT.UNPAIR), EncCmd(0xA3)),
-            Trans(ContCmd(CT.TIMER), EncCmd(0xD9)).multi_arg0(1.0 / 60.0),
-            Trans(LightCmd(CT.ON), EncCmd(0xA5)),
-            Trans(LightCmd(CT.OFF), EncCmd(0xA6)),
-            Trans(LightCmd(CT.ON, 1), EncCmd(0xAF)),
-            Trans(LightCmd(CT.OFF, 1), EncCmd(0xB0)),
-            Trans(FanCmd(CT.FAN_DIR).arg0(0), EncCmd(0xDB)),
-            Trans(FanCmd(CT.FAN_DIR).arg0(1), EncCmd(0xDA)),
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(0), EncCmd(0xD7)),
-            # Fan speed_count 3 configured
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(1).arg1(3), EncCmd(0xD6)),
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(2).arg1(3), EncCmd(0xD5)),
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(3).arg1(3), EncCmd(0xD4)),
-            # Fan speed_count 6 configured, used for send only
-            Trans(
-                FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(1).arg0_max(2).arg1(6), EncCmd(0xD6)
-            ).no_reverse(),
-            Trans(
-                FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(3).arg0_max(4).arg1(6), EncCmd(0xD5)
-            ).no_reverse(),
-            Trans(
-                FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(5).arg0_max(6).arg1(6), EncCmd(0xD4)
-            ).no_reverse(),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_zjv1",
-        "default_translator_zjv1v2_common",
-        [
-            Trans(LightCmd(CT.LIGHT_CWW_DIM), EncCmd(0xAD)).multi_arg0(250),
-            Trans(LightCmd(CT.LIGHT_CWW_WARM), EncCmd(0xAE)).multi_arg0(250),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_zjv2fl",
-        "default_translator_zjv1v2_common",
-        [
-            Trans(LightCmd(CT.LIGHT_CWW_COLD_WARM), EncCmd(0xA8))
-            .multi_arg0(250)
-            .multi_arg1(250),
-            Trans(LightCmd(CT.LIGHT_RGB_DIM), EncCmd(0xC8)).multi_arg0(250),
-            Trans(LightCmd(CT.LIGHT_RGB_RGB), EncCmd(0xCA))
-            .multi_arg0(255)
-            .multi_arg1(255)
-            .multi_arg2(255),
-            # req from app, only reverse, replaced by CT.LIGHT_CWW_COLD_WARM on direct to get ride of flickering
-            Trans(LightCmd(CT.LIGHT_CWW_DIM), EncCmd(0xAD)).multi_arg0(250).no_direct(),
-            Trans(LightCmd(CT.LIGHT_CWW_WARM), EncCmd(0xAE))
-            .multi_arg0(250)
-            .no_direct(),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_zjv2",
-        "default_translator_zjv1v2_common",
-        [
-            Trans(LightCmd(CT.LIGHT_CWW_DIM), EncCmd(0xAD)).multi_arg0(250),
-            Trans(LightCmd(CT.LIGHT_CWW_WARM), EncCmd(0xAE)).multi_arg0(250),
-            Trans(LightCmd(CT.LIGHT_RGB_DIM), EncCmd(0xC8)).multi_arg0(250),
-            Trans(LightCmd(CT.LIGHT_RGB_RGB), EncCmd(0xCA))
-            .multi_arg0(255)
-            .multi_arg1(255)
-            .multi_arg2(255),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_zjvr1",
-        "base",
-        [
-            Trans(ContCmd(CT.PAIR), EncCmd(0xA2)),
-            Trans(ContCmd(CT.UNPAIR), EncCmd(0xA3)),
-            Trans(LightCmd(CT.ON), EncCmd(0xA5)),
-            Trans(LightCmd(CT.OFF), EncCmd(0xA6)),
-            Trans(LightCmd(CT.LIGHT_CWW_COLD_WARM), EncCmd(0xA8))
-            .multi_arg0(250)
-            .multi_arg1(250),
-            #  Missing: AF / A7 / A9 / AC / AB / AA
-        ],
-    ),
-    FullTranslator(
-        "default_translator_remote",
-        "base",
-        [
-            Trans(LightCmd(CT.ON), EncCmd(0x08)),
-            Trans(LightCmd(CT.OFF), EncCmd(0x06)),
-            Trans(LightCmd(CT.TOGGLE, 1), EncCmd(0x13)),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0).arg1(0.1), EncCmd(0x10)
-            ).no_direct(),  # night mode
-            Trans(LightCmd(CT.LIGHT_CWW_WARM), EncCmd(0x0A))
-            .copy_arg0()
-            .no_direct(),  # K+
-            Trans(LightCmd(CT.LIGHT_CWW_WARM), EncCmd(0x0B))
-            .copy_arg0()
-            .no_direct(),  # K-
-            Trans(LightCmd(CT.LIGHT_CWW_DIM), EncCmd(0x02))
-            .copy_arg0()
-            .no_direct(),  # B+
-            Trans(LightCmd(CT.LIGHT_CWW_DIM), EncCmd(0x03))
-            .copy_arg0()
-            .no_direct(),  # B-
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM), EncCmd(0x07)
-            ).no_direct(),  # CCT / brightness Cycle
-        ],
-    ),
-    FullTranslator(
-        "default_translator_agv3",
-        "agarce_base",
-        [
-            Trans(ContCmd(CT.PAIR), EncCmd(0x00).arg0(1)),
-            Trans(ContCmd(CT.UNPAIR), EncCmd(0x00).arg0(0)),
-            Trans(AllCmd(CT.OFF), EncCmd(0x70).arg0_max(1)),
-            Trans(AllCmd(CT.ON), EncCmd(0x70).arg0_min(2)),
-            Trans(LightCmd(CT.ON), EncCmd(0x10).arg0(1)),
-            Trans(LightCmd(CT.OFF), EncCmd(0x10).arg0(0)),
-            Trans(LightCmd(CT.LIGHT_CWW_WARM_DIM).inv_arg0(1.0), EncCmd(0x20))
-            .multi_arg0(100)
-            .multi_arg1(100),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_zhimei_common_light",
-        "base",
-        [
-            Trans(ContCmd(CT.UNPAIR), EncCmd(0xB0)),
-            Trans(ContCmd(CT.TIMER), EncCmd(0xA5).multi_arg0(60.0).modulo_arg1(60))
-            .copy_arg0()
-            .copy_arg0_to_arg1(),
-            Trans(LightCmd(CT.ON), EncCmd(0xB3)),
-            Trans(LightCmd(CT.OFF), EncCmd(0xB2)),
-            Trans(LightCmd(CT.ON, 1), EncCmd(0xA6).arg0(2)),
-            Trans(LightCmd(CT.OFF, 1), EncCmd(0xA6).arg0(1)),
-            Trans(LightCmd(CT.LIGHT_RGB_FULL, 1), EncCmd(0xCA))
-            .multi_arg0(255)
-            .multi_arg1(255)
-            .multi_arg2(255),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_DIM).multi_arg0(1000.0),
-                EncCmd(0xB5).multi_arg1(256.0).modulo_arg2(256),
-            )
-            .copy_arg0_to_arg1()
-            .copy_arg0_to_arg2(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_WARM).inv_arg0(1.0).multi_arg0(1000.0),
-                EncCmd(0xB7).multi_arg1(256.0).modulo_arg2(256),
-            )
-            .copy_arg0_to_arg1()
-            .copy_arg0_to_arg2(),
-            # Shortcut phone app buttons, only reverse
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0.1).arg1(0.1),
-                EncCmd(0xA1).arg0(25).arg1(25),
-            ).no_direct(),  # night mode
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0).arg1(1), EncCmd(0xA7).arg0(1)
-            ).no_direct(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(0), EncCmd(0xA7).arg0(2)
-            ).no_direct(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(1), EncCmd(0xA7).arg0(3)
-            ).no_direct(),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_zmv1",
-        "default_translator_zhimei_common_light",
-        [
-            Trans(ContCmd(CT.PAIR), EncCmd(0xB4).arg0(170).arg1(102).arg2(85)),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_zmv2",
-        "default_translator_zhimei_common_light",
-        [
-            Trans(ContCmd(CT.PAIR), EncCmd(0xB4)),
-        ],
-    ),
-    FullTranslator(
-        "default_translator_zhimei_fan",
-        "base",
-        [
-            Trans(ContCmd(CT.UNPAIR), EncCmd(0xB0)),
-            Trans(ContCmd(CT.PAIR), EncCmd(0xB4).arg0(170).arg1(102).arg2(85)),
-            Trans(ContCmd(CT.TIMER), EncCmd(0xD4)).multi_arg0(1.0 / 60.0),
-            Trans(AllCmd(CT.ON), EncCmd(0xB3)),
-            Trans(AllCmd(CT.OFF), EncCmd(0xB2)),
-            Trans(LightCmd(CT.ON), EncCmd(0xA6).arg0(2)),
-            Trans(LightCmd(CT.OFF), EncCmd(0xA6).arg0(1)),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_DIM).multi_arg0(1000.0),
-                EncCmd(0xB5).multi_arg1(256.0).modulo_arg2(256),
-            )
-            .copy_arg0_to_arg1()
-            .copy_arg0_to_arg2(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_WARM).inv_arg0(1.0).multi_arg0(1000.0),
-                EncCmd(0xB7).multi_arg1(256.0).modulo_arg2(256),
-            )
-            .copy_arg0_to_arg1()
-            .copy_arg0_to_arg2(),
-            Trans(FanCmd(CT.FAN_DIR).arg0(0), EncCmd(0xD9)),
-            Trans(FanCmd(CT.FAN_DIR).arg0(1), EncCmd(0xDA)),
-            Trans(FanCmd(CT.FAN_OSC).arg0(0), EncCmd(0xDE).arg0(1)),
-            Trans(FanCmd(CT.FAN_OSC).arg0(1), EncCmd(0xDE).arg0(2)),
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(0), EncCmd(0xD1)),
-            Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(1).arg1(3), EncCmd(0xD3))
-            .multi_arg0(2)
-            .no_reverse(),
-            Trans(
-                FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(1).arg1(6), EncCmd(0xD3)
-            ).copy_arg0(),
-            # Shortcut phone app buttons, only reverse
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0.1).arg1(0.1),
-                EncCmd(0xA1).arg0(25).arg1(25),
-            ).no_direct(),  # night mode
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0).arg1(1), EncCmd(0xA7).arg0(1)
-            ).no_direct(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(0), EncCmd(0xA7).arg0(2)
-            ).no_direct(),
-            Trans(
-                LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(1), EncCmd(0xA7).arg0(3)
-            ).no_direct(),
-        ],
-    ),
-]
+
+@cache
+def get_default_translators():
+    # Built on first use only, in order not to slow down the import of the component
+    register_exclusive_cmd_pairs()
+    return [
+        *[FullTranslator(x, None, []) for x in BLE_ADV_BASE_TRANSLATORS],
+        FullTranslator(
+            "default_translator_fanlamp_common",
+            "base",
+            [
+                Trans(ContCmd(CT.PAIR), EncCmd(0x28)),
+                Trans(ContCmd(CT.UNPAIR), EncCmd(0x45)),
+                Trans(AllCmd(CT.OFF), EncCmd(0x6F)),
+                Trans(LightCmd(CT.TOGGLE), EncCmd(0x09)),
+                Trans(LightCmd(CT.ON), EncCmd(0x10)),
+                Trans(LightCmd(CT.OFF), EncCmd(0x11)),
+                Trans(LightCmd(CT.ON, 1), EncCmd(0x12)),
+                Trans(LightCmd(CT.OFF, 1), EncCmd(0x13)),
+                Trans(LightCmd(CT.LIGHT_CWW_COLD_WARM), EncCmd(0x21).param(0x00))
+                .multi_arg0(255)
+                .multi_arg1(255),
+                # Physical Remote and app phone shortcut buttons, only reverse
+                Trans(LightCmd(CT.LIGHT_CWW_COLD_WARM), EncCmd(0x21).param(0x40))
+                .multi_arg0(255)
+                .multi_arg1(255)
+                .no_direct(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0.1).arg1(0.1), EncCmd(0x23)
+                ).no_direct(),  # night mode
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_WARM).param(1), EncCmd(0x21).param(0x24)
+                ).no_direct(),  # K+
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_WARM).param(2), EncCmd(0x21).param(0x18)
+                ).no_direct(),  # K-
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_DIM).param(1), EncCmd(0x21).param(0x14)
+                ).no_direct(),  # B+
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_DIM).param(2), EncCmd(0x21).param(0x28)
+                ).no_direct(),  # B-
+                Trans(FanCmd(CT.FAN_OSC_TOGGLE), EncCmd(0x33)).no_direct(),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_flv1",
+            "default_translator_fanlamp_common",
+            [
+                Trans(ContCmd(CT.TIMER).arg0_max(0xFF), EncCmd(0x51)).copy_arg0(),
+                Trans(
+                    ContCmd(CT.TIMER).arg0_min(0x100), EncCmd(0x51).arg0(0xFF)
+                ).no_reverse(),
+                Trans(FanCmd(CT.FAN_DIR), EncCmd(0x15)).copy_arg0(),
+                Trans(FanCmd(CT.FAN_OSC), EncCmd(0x16)).copy_arg0(),
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg1(3), EncCmd(0x31)).copy_arg0(),
+                Trans(
+                    FanCmd(CT.FAN_ONOFF_SPEED).arg1(6), EncCmd(0x32).arg1(6)
+                ).copy_arg0(),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_flv2",
+            "default_translator_fanlamp_common",
+            [
+                Trans(ContCmd(CT.TIMER), EncCmd(0x41).multi_arg0(256).modulo_param(256))
+                .copy_arg0_to_param()
+                .copy_arg0(),
+                Trans(LightCmd(CT.LIGHT_RGB_FULL), EncCmd(0x22))
+                .multi_arg0_to_param(255)
+                .multi_arg1_to_arg0(255)
+                .multi_arg2_to_arg1(255),
+                Trans(FanCmd(CT.FAN_DIR).arg0(0), EncCmd(0x15).param(0x00)),
+                Trans(FanCmd(CT.FAN_DIR).arg0(1), EncCmd(0x15).param(0x01)),
+                Trans(FanCmd(CT.FAN_OSC).arg0(0), EncCmd(0x16).param(0x00)),
+                Trans(FanCmd(CT.FAN_OSC).arg0(1), EncCmd(0x16).param(0x01)),
+                Trans(
+                    FanCmd(CT.FAN_ONOFF_SPEED).arg1(3), EncCmd(0x31).param(0x00)
+                ).copy_arg0(),
+                Trans(
+                    FanCmd(CT.FAN_ONOFF_SPEED).arg1(6), EncCmd(0x31).param(0x20)
+                ).copy_arg0(),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_zjv0",
+            "base",
+            [
+                Trans(ContCmd(CT.PAIR), EncCmd(0xB4)),
+                Trans(ContCmd(CT.UNPAIR), EncCmd(0xB0)),
+                Trans(ContCmd(CT.TIMER).arg0(60), EncCmd(0xD4)),
+                Trans(ContCmd(CT.TIMER).arg0(120), EncCmd(0xD5)),
+                Trans(ContCmd(CT.TIMER).arg0(240), EncCmd(0xD6)),
+                Trans(ContCmd(CT.TIMER).arg0(480), EncCmd(0xD7)),
+                Trans(LightCmd(CT.ON), EncCmd(0xB3)),
+                Trans(LightCmd(CT.OFF), EncCmd(0xB2)),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_DIM).multi_arg0(1000.0),
+                    EncCmd(0xB5).multi_arg1(256.0).modulo_arg2(256),
+                )
+                .copy_arg0_to_arg1()
+                .copy_arg0_to_arg2(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_WARM).multi_arg0(1000.0),
+                    EncCmd(0xB7).multi_arg1(256.0).modulo_arg2(256),
+                )
+                .copy_arg0_to_arg1()
+                .copy_arg0_to_arg2(),
+                Trans(LightCmd(CT.ON, 1), EncCmd(0xA6).arg0(1)),
+                Trans(LightCmd(CT.OFF, 1), EncCmd(0xA6).arg0(2)),
+                Trans(FanCmd(CT.FAN_DIR).arg0(0), EncCmd(0xD9)),
+                Trans(FanCmd(CT.FAN_DIR).arg0(1), EncCmd(0xDA)),
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(0), EncCmd(0xD8)),
+                # Fan speed_count 3, direct and reverse
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(1).arg1(3), EncCmd(0xD2)),
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(2).arg1(3), EncCmd(0xD1)),
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(3).arg1(3), EncCmd(0xD0)),
+                # Fan speed_count 6, direct only
+                Trans(
+                    FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(1).arg0_max(2).arg1(6),
+                    EncCmd(0xD2),
+                ).no_reverse(),
+                Trans(
+                    FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(3).arg0_max(4).arg1(6),
+                    EncCmd(0xD1),
+                ).no_reverse(),
+                Trans(
+                    FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(5).arg0_max(6).arg1(6),
+                    EncCmd(0xD0),
+                ).no_reverse(),
+                # Physical remote and phone app shortcut buttons, reverse only
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0.1).arg1(0.1),
+                    EncCmd(0xA1).arg0(25).arg1(25),
+                ).no_direct(),  # night mode
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(0),
+                    EncCmd(0xA2).arg0(255).arg1(0),
+                ).no_direct(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0).arg1(1),
+                    EncCmd(0xA3).arg0(0).arg1(255),
+                ).no_direct(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(1),
+                    EncCmd(0xA4).arg0(255).arg1(255),
+                ).no_direct(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(0),
+                    EncCmd(0xA7).arg0(1),
+                ).no_direct(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0).arg1(1),
+                    EncCmd(0xA7).arg0(2),
+                ).no_direct(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(1),
+                    EncCmd(0xA7).arg0(3),
+                ).no_direct(),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_zjv1v2_common",
+            "base",
+            [
+                Trans(ContCmd(CT.PAIR), EncCmd(0xA2)),
+                Trans(ContCmd(CT.UNPAIR), EncCmd(0xA3)),
+                Trans(ContCmd(CT.TIMER), EncCmd(0xD9)).multi_arg0(1.0 / 60.0),
+                Trans(LightCmd(CT.ON), EncCmd(0xA5)),
+                Trans(LightCmd(CT.OFF), EncCmd(0xA6)),
+                Trans(LightCmd(CT.ON, 1), EncCmd(0xAF)),
+                Trans(LightCmd(CT.OFF, 1), EncCmd(0xB0)),
+                Trans(FanCmd(CT.FAN_DIR).arg0(0), EncCmd(0xDB)),
+                Trans(FanCmd(CT.FAN_DIR).arg0(1), EncCmd(0xDA)),
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(0), EncCmd(0xD7)),
+                # Fan speed_count 3 configured
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(1).arg1(3), EncCmd(0xD6)),
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(2).arg1(3), EncCmd(0xD5)),
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(3).arg1(3), EncCmd(0xD4)),
+                # Fan speed_count 6 configured, used for send only
+                Trans(
+                    FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(1).arg0_max(2).arg1(6),
+                    EncCmd(0xD6),
+                ).no_reverse(),
+                Trans(
+                    FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(3).arg0_max(4).arg1(6),
+                    EncCmd(0xD5),
+                ).no_reverse(),
+                Trans(
+                    FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(5).arg0_max(6).arg1(6),
+                    EncCmd(0xD4),
+                ).no_reverse(),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_zjv1",
+            "default_translator_zjv1v2_common",
+            [
+                Trans(LightCmd(CT.LIGHT_CWW_DIM), EncCmd(0xAD)).multi_arg0(250),
+                Trans(LightCmd(CT.LIGHT_CWW_WARM), EncCmd(0xAE)).multi_arg0(250),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_zjv2fl",
+            "default_translator_zjv1v2_common",
+            [
+                Trans(LightCmd(CT.LIGHT_CWW_COLD_WARM), EncCmd(0xA8))
+                .multi_arg0(250)
+                .multi_arg1(250),
+                Trans(LightCmd(CT.LIGHT_RGB_DIM), EncCmd(0xC8)).multi_arg0(250),
+                Trans(LightCmd(CT.LIGHT_RGB_RGB), EncCmd(0xCA))
+                .multi_arg0(255)
+                .multi_arg1(255)
+                .multi_arg2(255),
+                # req from app, only reverse, replaced by CT.LIGHT_CWW_COLD_WARM on direct to get ride of flickering
+                Trans(LightCmd(CT.LIGHT_CWW_DIM), EncCmd(0xAD))
+                .multi_arg0(250)
+                .no_direct(),
+                Trans(LightCmd(CT.LIGHT_CWW_WARM), EncCmd(0xAE))
+                .multi_arg0(250)
+                .no_direct(),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_zjv2",
+            "default_translator_zjv1v2_common",
+            [
+                Trans(LightCmd(CT.LIGHT_CWW_DIM), EncCmd(0xAD)).multi_arg0(250),
+                Trans(LightCmd(CT.LIGHT_CWW_WARM), EncCmd(0xAE)).multi_arg0(250),
+                Trans(LightCmd(CT.LIGHT_RGB_DIM), EncCmd(0xC8)).multi_arg0(250),
+                Trans(LightCmd(CT.LIGHT_RGB_RGB), EncCmd(0xCA))
+                .multi_arg0(255)
+                .multi_arg1(255)
+                .multi_arg2(255),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_zjvr1",
+            "base",
+            [
+                Trans(ContCmd(CT.PAIR), EncCmd(0xA2)),
+                Trans(ContCmd(CT.UNPAIR), EncCmd(0xA3)),
+                Trans(LightCmd(CT.ON), EncCmd(0xA5)),
+                Trans(LightCmd(CT.OFF), EncCmd(0xA6)),
+                Trans(LightCmd(CT.LIGHT_CWW_COLD_WARM), EncCmd(0xA8))
+                .multi_arg0(250)
+                .multi_arg1(250),
+                #  Missing: AF / A7 / A9 / AC / AB / AA
+            ],
+        ),
+        FullTranslator(
+            "default_translator_remote",
+            "base",
+            [
+                Trans(LightCmd(CT.ON), EncCmd(0x08)),
+                Trans(LightCmd(CT.OFF), EncCmd(0x06)),
+                Trans(LightCmd(CT.TOGGLE, 1), EncCmd(0x13)),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0).arg1(0.1), EncCmd(0x10)
+                ).no_direct(),  # night mode
+                Trans(LightCmd(CT.LIGHT_CWW_WARM), EncCmd(0x0A))
+                .copy_arg0()
+                .no_direct(),  # K+
+                Trans(LightCmd(CT.LIGHT_CWW_WARM), EncCmd(0x0B))
+                .copy_arg0()
+                .no_direct(),  # K-
+                Trans(LightCmd(CT.LIGHT_CWW_DIM), EncCmd(0x02))
+                .copy_arg0()
+                .no_direct(),  # B+
+                Trans(LightCmd(CT.LIGHT_CWW_DIM), EncCmd(0x03))
+                .copy_arg0()
+                .no_direct(),  # B-
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM), EncCmd(0x07)
+                ).no_direct(),  # CCT / brightness Cycle
+            ],
+        ),
+        FullTranslator(
+            "default_translator_agv3",
+            "agarce_base",
+            [
+                Trans(ContCmd(CT.PAIR), EncCmd(0x00).arg0(1)),
+                Trans(ContCmd(CT.UNPAIR), EncCmd(0x00).arg0(0)),
+                Trans(AllCmd(CT.OFF), EncCmd(0x70).arg0_max(1)),
+                Trans(AllCmd(CT.ON), EncCmd(0x70).arg0_min(2)),
+                Trans(LightCmd(CT.ON), EncCmd(0x10).arg0(1)),
+                Trans(LightCmd(CT.OFF), EncCmd(0x10).arg0(0)),
+                Trans(LightCmd(CT.LIGHT_CWW_WARM_DIM).inv_arg0(1.0), EncCmd(0x20))
+                .multi_arg0(100)
+                .multi_arg1(100),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_zhimei_common_light",
+            "base",
+            [
+                Trans(ContCmd(CT.UNPAIR), EncCmd(0xB0)),
+                Trans(ContCmd(CT.TIMER), EncCmd(0xA5).multi_arg0(60.0).modulo_arg1(60))
+                .copy_arg0()
+                .copy_arg0_to_arg1(),
+                Trans(LightCmd(CT.ON), EncCmd(0xB3)),
+                Trans(LightCmd(CT.OFF), EncCmd(0xB2)),
+                Trans(LightCmd(CT.ON, 1), EncCmd(0xA6).arg0(2)),
+                Trans(LightCmd(CT.OFF, 1), EncCmd(0xA6).arg0(1)),
+                Trans(LightCmd(CT.LIGHT_RGB_FULL, 1), EncCmd(0xCA))
+                .multi_arg0(255)
+                .multi_arg1(255)
+                .multi_arg2(255),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_DIM).multi_arg0(1000.0),
+                    EncCmd(0xB5).multi_arg1(256.0).modulo_arg2(256),
+                )
+                .copy_arg0_to_arg1()
+                .copy_arg0_to_arg2(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_WARM).inv_arg0(1.0).multi_arg0(1000.0),
+                    EncCmd(0xB7).multi_arg1(256.0).modulo_arg2(256),
+                )
+                .copy_arg0_to_arg1()
+                .copy_arg0_to_arg2(),
+                # Shortcut phone app buttons, only reverse
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0.1).arg1(0.1),
+                    EncCmd(0xA1).arg0(25).arg1(25),
+                ).no_direct(),  # night mode
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0).arg1(1),
+                    EncCmd(0xA7).arg0(1),
+                ).no_direct(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(0),
+                    EncCmd(0xA7).arg0(2),
+                ).no_direct(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(1),
+                    EncCmd(0xA7).arg0(3),
+                ).no_direct(),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_zmv1",
+            "default_translator_zhimei_common_light",
+            [
+                Trans(ContCmd(CT.PAIR), EncCmd(0xB4).arg0(170).arg1(102).arg2(85)),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_zmv2",
+            "default_translator_zhimei_common_light",
+            [
+                Trans(ContCmd(CT.PAIR), EncCmd(0xB4)),
+            ],
+        ),
+        FullTranslator(
+            "default_translator_zhimei_fan",
+            "base",
+            [
+                Trans(ContCmd(CT.UNPAIR), EncCmd(0xB0)),
+                Trans(ContCmd(CT.PAIR), EncCmd(0xB4).arg0(170).arg1(102).arg2(85)),
+                Trans(ContCmd(CT.TIMER), EncCmd(0xD4)).multi_arg0(1.0 / 60.0),
+                Trans(AllCmd(CT.ON), EncCmd(0xB3)),
+                Trans(AllCmd(CT.OFF), EncCmd(0xB2)),
+                Trans(LightCmd(CT.ON), EncCmd(0xA6).arg0(2)),
+                Trans(LightCmd(CT.OFF), EncCmd(0xA6).arg0(1)),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_DIM).multi_arg0(1000.0),
+                    EncCmd(0xB5).multi_arg1(256.0).modulo_arg2(256),
+                )
+                .copy_arg0_to_arg1()
+                .copy_arg0_to_arg2(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_WARM).inv_arg0(1.0).multi_arg0(1000.0),
+                    EncCmd(0xB7).multi_arg1(256.0).modulo_arg2(256),
+                )
+                .copy_arg0_to_arg1()
+                .copy_arg0_to_arg2(),
+                Trans(FanCmd(CT.FAN_DIR).arg0(0), EncCmd(0xD9)),
+                Trans(FanCmd(CT.FAN_DIR).arg0(1), EncCmd(0xDA)),
+                Trans(FanCmd(CT.FAN_OSC).arg0(0), EncCmd(0xDE).arg0(1)),
+                Trans(FanCmd(CT.FAN_OSC).arg0(1), EncCmd(0xDE).arg0(2)),
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0(0), EncCmd(0xD1)),
+                Trans(FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(1).arg1(3), EncCmd(0xD3))
+                .multi_arg0(2)
+                .no_reverse(),
+                Trans(
+                    FanCmd(CT.FAN_ONOFF_SPEED).arg0_min(1).arg1(6), EncCmd(0xD3)
+                ).copy_arg0(),
+                # Shortcut phone app buttons, only reverse
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0.1).arg1(0.1),
+                    EncCmd(0xA1).arg0(25).arg1(25),
+                ).no_direct(),  # night mode
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(0).arg1(1),
+                    EncCmd(0xA7).arg0(1),
+                ).no_direct(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(0),
+                    EncCmd(0xA7).arg0(2),
+                ).no_direct(),
+                Trans(
+                    LightCmd(CT.LIGHT_CWW_COLD_WARM).arg0(1).arg1(1),
+                    EncCmd(0xA7).arg0(3),
+                ).no_direct(),
+            ],
+        ),
+    ]
@@ -37,8 +37,8 @@ void ZhijiaEncoder::xor_all(uint8_t *buf, size_t len, uint16_t pivot) const {
   }
 }
 
-ZhijiaEncoderV0::ZhijiaEncoderV0(const std::string &encoding, const std::string &variant, std::vector<uint8_t> &&mac)
-    : ZhijiaEncoder(encoding, variant, mac) {
+ZhijiaEncoderV0::ZhijiaEncoderV0(const BleAdvEncoderDesc &desc, std::vector<uint8_t> &&mac)
+    : ZhijiaEncoder(desc, mac) {
   this->len_ = sizeof(data_map_t);
 }
 
@@ -97,9 +97,8 @@ void ZhijiaEncoderV0::encode(uint8_t *buf, BleAdvEncCmd &enc_cmd, ControllerPara
   this->whiten(buf, this->len_, 0x37);
 }
 
-ZhijiaEncoderV1::ZhijiaEncoderV1(const std::string &encoding, const std::string &variant, std::vector<uint8_t> &&mac,
-                                 uint8_t uid_start)
-    : ZhijiaEncoder(encoding, variant, mac), uid_start_(uid_start) {
+ZhijiaEncoderV1::ZhijiaEncoderV1(const BleAdvEncoderDesc &desc, std::vector<uint8_t> &&mac, uint8_t uid_start)
+    : ZhijiaEncoder(desc, mac), uid_start_(uid_start) {
   this->len_ = sizeof(data_map_t);
 }
 
@@ -205,8 +204,8 @@ void ZhijiaEncoderV1::encode(uint8_t *buf, BleAdvEncCmd &enc_cmd, ControllerPara
   this->whiten(buf, this->len_, 0x37);
 }
 
-ZhijiaEncoderV2::ZhijiaEncoderV2(const std::string &encoding, const std::string &variant, std::vector<uint8_t> &&mac)
-    : ZhijiaEncoderV1(encoding, variant, std::move(mac)) {
+ZhijiaEncoderV2::ZhijiaEncoderV2(const BleAdvEncoderDesc &desc, std::vector<uint8_t> &&mac)
+    : ZhijiaEncoderV1(desc, std::move(mac)) {
   this->len_ = sizeof(data_map_t);
 }
 
@@ -257,9 +256,8 @@ void ZhijiaEncoderV2::encode(uint8_t *buf, BleAdvEncCmd &enc_cmd, ControllerPara
   this->whiten(buf, this->len_, 0x6F);
 }
 
-ZhijiaEncoderRemote::ZhijiaEncoderRemote(const std::string &encoding, const std::string &variant,
-                                         std::vector<uint8_t> &&mac)
-    : ZhijiaEncoderV1(encoding, variant, std::move(mac)) {
+ZhijiaEncoderRemote::ZhijiaEncoderRemote(const BleAdvEncoderDesc &desc, std::vector<uint8_t> &&mac)
+    : ZhijiaEncoderV1(desc, std::move(mac)) {
   this->len_ = sizeof(data_map_t);
 }
 
@@ -272,7 +270,7 @@ bool ZhijiaEncoderRemote::decode(uint8_t *buf, BleAdvEncCmd &enc_cmd, Controller
   this->log_buffer(buf, this->len_, "Decoded");
 
   std::string decoded = esphome::format_hex_pretty(buf, this->len_);
-  ESP_LOGD(this->id_.c_str(), "Decoded  - %s", decoded.c_str());
+  ESP_LOGD(this->desc_.id, "Decoded  - %s", decoded.c_str());
 
   if (!this->from_txdata(data->txdata, enc_cmd, cont))
     return false;
@@ -286,7 +284,7 @@ bool ZhijiaEncoderRemote::decode(uint8_t *buf, BleAdvEncCmd &enc_cmd, Controller
 
   // Attempt to have more info so that we could deduce more effisciently the encoding
   if ((data->pivot ^ 0x06) != eff_pivot) {
-    ESP_LOGE(this->id_.c_str(), "Pivot different than expected, please open an issue to component owner.");
+    ESP_LOGE(this->desc_.id, "Pivot different than expected, please open an issue to component owner.");
   }
 
   return true;
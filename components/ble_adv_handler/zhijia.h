@@ -7,8 +7,7 @@ namespace ble_adv_handler {
 
 class ZhijiaEncoder : public BleAdvEncoder {
  public:
-  ZhijiaEncoder(const std::string &encoding, const std::string &variant, std::vector<uint8_t> &mac)
-      : BleAdvEncoder(encoding, variant), mac_(mac) {}
+  ZhijiaEncoder(const BleAdvEncoderDesc &desc, std::vector<uint8_t> &mac) : BleAdvEncoder(desc), mac_(mac) {}
 
  protected:
   virtual std::string to_str(const BleAdvEncCmd &enc_cmd) const override;
@@ -23,7 +22,7 @@ class ZhijiaEncoder : public BleAdvEncoder {
 
 class ZhijiaEncoderV0 : public ZhijiaEncoder {
  public:
-  ZhijiaEncoderV0(const std::string &encoding, const std::string &variant, std::vector<uint8_t> &&mac);
+  ZhijiaEncoderV0(const BleAdvEncoderDesc &desc, std::vector<uint8_t> &&mac);
 
  protected:
   static constexpr size_t UUID_LEN = 2;
@@ -41,8 +40,7 @@ class ZhijiaEncoderV0 : public ZhijiaEncoder {
 
 class ZhijiaEncoderV1 : public ZhijiaEncoder {
  public:
-  ZhijiaEncoderV1(const std::string &encoding, const std::string &variant, std::vector<uint8_t> &&mac,
-                  uint8_t uid_start = 0);
+  ZhijiaEncoderV1(const BleAdvEncoderDesc &desc, std::vector<uint8_t> &&mac, uint8_t uid_start = 0);
 
  protected:
   static constexpr size_t ADDR_LEN = 3;
@@ -67,7 +65,7 @@ class ZhijiaEncoderV1 : public ZhijiaEncoder {
 
 class ZhijiaEncoderV2 : public ZhijiaEncoderV1 {
  public:
-  ZhijiaEncoderV2(const std::string &encoding, const std::string &variant, std::vector<uint8_t> &&mac);
+  ZhijiaEncoderV2(const BleAdvEncoderDesc &desc, std::vector<uint8_t> &&mac);
 
  protected:
   static constexpr size_t SPARE_LEN = 7;
@@ -83,7 +81,7 @@ class ZhijiaEncoderV2 : public ZhijiaEncoderV1 {
 
 class ZhijiaEncoderRemote : public ZhijiaEncoderV1 {
  public:
-  ZhijiaEncoderRemote(const std::string &encoding, const std::string &variant, std::vector<uint8_t> &&mac);
+  ZhijiaEncoderRemote(const BleAdvEncoderDesc &desc, std::vector<uint8_t> &&mac);
 
  protected:
   struct data_map_t {
@@ -11,15 +11,14 @@ std::string ZhimeiEncoder::to_str(const BleAdvEncCmd &enc_cmd) const {
   return ret;
 }
 
-ZhimeiEncoderV0::ZhimeiEncoderV0(const std::string &encoding, const std::string &variant)
-    : ZhimeiEncoder(encoding, variant) {
+ZhimeiEncoderV0::ZhimeiEncoderV0(const BleAdvEncoderDesc &desc) : ZhimeiEncoder(desc) {
   this->len_ = sizeof(data_map_t);
 }
 
 uint8_t ZhimeiEncoderV0::checksum(uint8_t *buf, size_t len) const {
   uint8_t cec = 0;
-  for (size_t i = 0; i < this->header_.size(); ++i) {
-    cec += this->header_[i];
+  for (size_t i = 0; i < this->desc_.header_len; ++i) {
+    cec += this->desc_.header[i];
   }
   for (size_t i = 0; i < len; ++i) {
     cec += buf[i];
@@ -60,8 +59,7 @@ void ZhimeiEncoderV0::encode(uint8_t *buf, BleAdvEncCmd &enc_cmd, ControllerPara
 
 constexpr uint8_t ZhimeiEncoderV1::MATRIX[];
 
-ZhimeiEncoderV1::ZhimeiEncoderV1(const std::string &encoding, const std::string &variant)
-    : ZhimeiEncoder(encoding, variant) {
+ZhimeiEncoderV1::ZhimeiEncoderV1(const BleAdvEncoderDesc &desc) : ZhimeiEncoder(desc) {
   this->len_ = sizeof(data_map_t);
 }
 
@@ -146,8 +144,7 @@ void ZhimeiEncoderV1::encode(uint8_t *buf, BleAdvEncCmd &enc_cmd, ControllerPara
 
 constexpr uint8_t ZhimeiEncoderV2::PREFIX[];
 
-ZhimeiEncoderV2::ZhimeiEncoderV2(const std::string &encoding, const std::string &variant)
-    : ZhimeiEncoder(encoding, variant) {
+ZhimeiEncoderV2::ZhimeiEncoderV2(const BleAdvEncoderDesc &desc) : ZhimeiEncoder(desc) {
   this->len_ = sizeof(data_map_t);
 }
 
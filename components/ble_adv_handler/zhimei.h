@@ -7,7 +7,7 @@ namespace ble_adv_handler {
 
 class ZhimeiEncoder : public BleAdvEncoder {
  public:
-  ZhimeiEncoder(const std::string &encoding, const std::string &variant) : BleAdvEncoder(encoding, variant) {}
+  ZhimeiEncoder(const BleAdvEncoderDesc &desc) : BleAdvEncoder(desc) {}
 
  protected:
   virtual std::string to_str(const BleAdvEncCmd &enc_cmd) const override;
@@ -15,7 +15,7 @@ class ZhimeiEncoder : public BleAdvEncoder {
 
 class ZhimeiEncoderV0 : public ZhimeiEncoder {
  public:
-  ZhimeiEncoderV0(const std::string &encoding, const std::string &variant);
+  ZhimeiEncoderV0(const BleAdvEncoderDesc &desc);
 
  protected:
   static constexpr size_t ARGS_LEN = 3;
@@ -35,7 +35,7 @@ class ZhimeiEncoderV0 : public ZhimeiEncoder {
 
 class ZhimeiEncoderV1 : public ZhimeiEncoder {
  public:
-  ZhimeiEncoderV1(const std::string &encoding, const std::string &variant);
+  ZhimeiEncoderV1(const BleAdvEncoderDesc &desc);
 
  protected:
   static constexpr uint8_t MATRIX[16] = {29, 4, 17, 32, 152, 117, 40, 70, 11, 175, 67, 172, 214, 190, 137, 142};
@@ -66,7 +66,7 @@ class ZhimeiEncoderV1 : public ZhimeiEncoder {
 
 class ZhimeiEncoderV2 : public ZhimeiEncoder {
  public:
-  ZhimeiEncoderV2(const std::string &encoding, const std::string &variant);
+  ZhimeiEncoderV2(const BleAdvEncoderDesc &desc);
 
  protected:
   static constexpr size_t PREFIX_LEN = 3;
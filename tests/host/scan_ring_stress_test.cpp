@@ -0,0 +1,162 @@
+// Host stress test of the ring passing the scanned packets from the BLE stack callback to the loop.
+// A producer thread feeds synthetic scan events as the BLE stack would, while the main thread drains them
+// as BleAdvHandler::loop does. Checks that no packet is lost nor corrupted up to the ring capacity.
+//
+// Build and run, from the repository root:
+//   g++ -std=gnu++17 -O2 -pthread -fsanitize=thread tests/host/scan_ring_stress_test.cpp -o /tmp/scan_ring_test
+//   /tmp/scan_ring_test
+
+#include "../../components/ble_adv_handler/ble_adv_ring.h"
+
+#include <atomic>
+#include <chrono>
+#include <cstdio>
+#include <thread>
+#include <vector>
+
+using esphome::ble_adv_handler::BleAdvSpscRing;
+
+// Same capacity and same kind of slot as BleAdvScanRing: a full advertising buffer
+struct ScanEvent {
+  uint32_t seq_{0};
+  uint8_t len_{0};
+  uint8_t buf_[31]{0};
+
+  void fill(uint32_t seq) {
+    this->seq_ = seq;
+    this->len_ = 1 + seq % 31;
+    for (uint8_t i = 0; i < this->len_; ++i) {
+      this->buf_[i] = (uint8_t) (seq * 31 + i);
+    }
+  }
+  bool is_valid() const {
+    if (this->len_ != 1 + this->seq_ % 31) {
+      return false;
+    }
+    for (uint8_t i = 0; i < this->len_; ++i) {
+      if (this->buf_[i] != (uint8_t) (this->seq_ * 31 + i)) {
+        return false;
+      }
+    }
+    return true;
+  }
+};
+using Ring = BleAdvSpscRing<ScanEvent, 64>;
+
+static std::atomic<int> failures{0};  // checked from both threads
+
+static void check(bool cond, const char *msg) {
+  if (!cond) {
+    printf("FAILED: %s\n", msg);
+    failures++;
+  }
+}
+
+// The consumer stopped: a burst of exactly CAPACITY events is fully kept, the next one is dropped
+static void test_burst_up_to_capacity() {
+  static Ring ring;
+  for (uint32_t round = 0; round < 100; ++round) {
+    std::thread producer([&] {
+      for (uint32_t i = 0; i < Ring::CAPACITY; ++i) {
+        ScanEvent event;
+        event.fill(round * 1000 + i);
+        check(ring.push(std::move(event)), "burst: push refused before capacity");
+      }
+    });
+    producer.join();
+    ScanEvent extra;
+    extra.fill(0);
+    check(!ring.push(std::move(extra)), "burst: push accepted over capacity");
+    ScanEvent event;
+    for (uint32_t i = 0; i < Ring::CAPACITY; ++i) {
+      check(ring.pop(event), "burst: event lost");
+      check(event.seq_ == round * 1000 + i && event.is_valid(), "burst: event out of order or corrupted");
+    }
+    check(!ring.pop(event), "burst: extra event popped");
+  }
+  check(ring.get_received() == 100 * (Ring::CAPACITY + 1), "burst: received counter");
+  check(ring.get_dropped() == 100, "burst: dropped counter");
+}
+
+// Producer and consumer running concurrently, the producer never having more than CAPACITY events
+// in flight: all of them are received in order, none is dropped
+static void test_concurrent_no_loss() {
+  static Ring ring;
+  static std::atomic<uint32_t> consumed{0};
+  const uint32_t nb_events = 2000000;
+  std::thread producer([&] {
+    for (uint32_t seq = 0; seq < nb_events; ++seq) {
+      while (seq - consumed.load(std::memory_order_acquire) >= Ring::CAPACITY) {
+        std::this_thread::yield();
+      }
+      ScanEvent event;
+      event.fill(seq);
+      check(ring.push(std::move(event)), "concurrent: push refused with less than capacity in flight");
+    }
+  });
+  ScanEvent event;
+  uint32_t expected = 0;
+  while (expected < nb_events) {
+    // drained in bulk, at most a full ring, as BleAdvHandler::loop
+    for (size_t i = 0; (i < Ring::CAPACITY) && ring.pop(event); ++i) {
+      if (event.seq_ != expected || !event.is_valid()) {
+        check(false, "concurrent: event out of order or corrupted");
+        expected = event.seq_;
+      }
+      consumed.store(++expected, std::memory_order_release);
+    }
+    std::this_thread::yield();
+  }
+  producer.join();
+  check(!ring.pop(event), "concurrent: extra event popped");
+  check(ring.get_received() == nb_events, "concurrent: received counter");
+  check(ring.get_dropped() == 0, "concurrent: dropped counter");
+}
+
+// Producer flooding faster than the consumer: every event is either received in order or counted as dropped
+static void test_flooding_counted() {
+  static Ring ring;
+  const uint32_t nb_events = 1000000;
+  std::atomic<bool> done{false};
+  std::vector<bool> pushed(nb_events, false);
+  std::thread producer([&] {
+    for (uint32_t seq = 0; seq < nb_events; ++seq) {
+      ScanEvent event;
+      event.fill(seq);
+      pushed[seq] = ring.push(std::move(event));
+    }
+    done.store(true, std::memory_order_release);
+  });
+  ScanEvent event;
+  std::vector<uint32_t> popped;
+  while (true) {
+    bool finished = done.load(std::memory_order_acquire);
+    while (ring.pop(event)) {
+      check(event.is_valid(), "flooding: event corrupted");
+      popped.push_back(event.seq_);
+    }
+    if (finished) {
+      break;
+    }
+    std::this_thread::sleep_for(std::chrono::microseconds(50));
+  }
+  producer.join();
+  std::vector<uint32_t> accepted;
+  for (uint32_t seq = 0; seq < nb_events; ++seq) {
+    if (pushed[seq]) {
+      accepted.push_back(seq);
+    }
+  }
+  check(popped == accepted, "flooding: received events differ from the accepted ones");
+  check(ring.get_received() == nb_events, "flooding: received counter");
+  check(ring.get_dropped() == nb_events - accepted.size(), "flooding: dropped counter");
+  printf("flooding: %u of %u events dropped\n", (unsigned) ring.get_dropped(), (unsigned) nb_events);
+}
+
+int main() {
+  test_burst_up_to_capacity();
+  test_concurrent_no_loss();
+  test_flooding_counted();
+  printf(failures.load() ? "FAILED\n" : "OK\n");
+  return failures.load() ? 1 : 0;
+}
@@ -0,0 +1,272 @@
+# Host regression test of the translators evaluation, without flashing a device.
+# - the reference translations were given by the C++ generated for the default translators, compiled on host,
+# - the batch evaluation with NumPy (tools/ble_adv_batch.py) gives the same result as the single command one
+#   on a parameter sweep of all the default translators, and of a translator overriding some commands.
+#
+# Run from the repository root, in the ESPHome python environment having numpy installed:
+#   python tests/host/translator_eval_test.py
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "tools")
+)
+
+from ble_adv_batch import e2g, g2e
+from ble_adv_handler.translator import (
+    CT,
+    ContCmd,
+    EncCmd,
+    FullTranslator,
+    GenCmd,
+    Trans,
+    get_default_translators,
+)
+
+TRANSLATORS = [
+    *get_default_translators(),
+    # Overrides the TIMER commands of default_translator_flv1 up to 60
+    FullTranslator(
+        "test_translator_override",
+        "default_translator_flv1",
+        [Trans(ContCmd(CT.TIMER).arg0_max(60), EncCmd(0x52)).copy_arg0()],
+    ),
+]
+# The commands hard coded in agarce_base are not evaluated on host
+EVALUATED = [x for x in TRANSLATORS if x.get_root()._id != "agarce_base"]
+
+GEN_CMDS = [
+    "NOCMD",
+    "PAIR",
+    "UNPAIR",
+    "CUSTOM",
+    "TIMER",
+    "TOGGLE",
+    "ON",
+    "OFF",
+    "LIGHT_CWW_DIM",
+    "LIGHT_CWW_WARM",
+    "LIGHT_CWW_COLD_WARM",
+    "LIGHT_CWW_WARM_DIM",
+    "LIGHT_RGB_FULL",
+    "LIGHT_RGB_DIM",
+    "LIGHT_RGB_RGB",
+    "FAN_FULL",
+    "FAN_ONOFF_SPEED",
+    "FAN_DIR",
+    "FAN_OSC",
+    "FAN_DIR_TOGGLE",
+    "FAN_OSC_TOGGLE",
+]
+ENT_TYPES = ["NOTYPE", "CONTROLLER", "LIGHT", "FAN", "ALL"]
+GEN_ARGS = [0, 0.05, 0.1, 0.3, 0.5, 0.77, 1, 1.5, 2, 3, 6, 60, 120, 255, 256, 480, 1000]
+
+# (translator, generic command, encoder command) as translated by the C++, None if not translated
+G2E_REFS = [
+    (
+        "default_translator_flv1",
+        {"cmd": "TIMER", "type": "CONTROLLER", "arg0": 30},
+        {"cmd": 0x51, "arg0": 30},
+    ),
+    (
+        "default_translator_flv1",
+        {"cmd": "TIMER", "type": "CONTROLLER", "arg0": 600},
+        {"cmd": 0x51, "arg0": 255},
+    ),
+    (
+        "default_translator_flv1",
+        {"cmd": "LIGHT_RGB_FULL", "type": "LIGHT", "arg0": 1.0},
+        None,
+    ),
+    (
+        "default_translator_flv2",
+        {"cmd": "TIMER", "type": "CONTROLLER", "arg0": 300},
+        {"cmd": 0x41, "param": 44, "arg0": 1},
+    ),
+    (
+        "default_translator_flv2",
+        {
+            "cmd": "LIGHT_RGB_FULL",
+            "type": "LIGHT",
+            "arg0": 0.5,
+            "arg1": 0.25,
+            "arg2": 1.0,
+        },
+        {"cmd": 0x22, "param": 127, "arg0": 63, "arg1": 255},
+    ),
+    (
+        "default_translator_flv2",
+        {"cmd": "FAN_OSC", "type": "FAN", "arg0": 1},
+        {"cmd": 0x16, "param": 1},
+    ),
+    (
+        "default_translator_zjv0",
+        {"cmd": "LIGHT_CWW_DIM", "type": "LIGHT", "arg0": 0.7},
+        {"cmd": 0xB5, "arg1": 2, "arg2": 188},
+    ),
+    (
+        "default_translator_zjv1v2_common",
+        {"cmd": "TIMER", "type": "CONTROLLER", "arg0": 3600},
+        {"cmd": 0xD9, "arg0": 60},
+    ),
+    (
+        "default_translator_agv3",
+        {"cmd": "LIGHT_CWW_WARM_DIM", "type": "LIGHT", "arg0": 0.3, "arg1": 0.6},
+        {"cmd": 0x20, "arg0": 70, "arg1": 60},
+    ),
+    (
+        "default_translator_zhimei_common_light",
+        {"cmd": "LIGHT_CWW_WARM", "type": "LIGHT", "arg0": 0.25},
+        {"cmd": 0xB7, "arg1": 2, "arg2": 238},
+    ),
+    (
+        "test_translator_override",
+        {"cmd": "TIMER", "type": "CONTROLLER", "arg0": 30},
+        {"cmd": 0x52, "arg0": 30},
+    ),
+    (
+        "test_translator_override",
+        {"cmd": "TIMER", "type": "CONTROLLER", "arg0": 100},
+        {"cmd": 0x51, "arg0": 100},
+    ),
+]
+E2G_REFS = [
+    (
+        "default_translator_flv2",
+        {"cmd": 0x41, "param": 44, "arg0": 1},
+        {"cmd": "TIMER", "type": "CONTROLLER", "arg0": 300.0},
+    ),
+    (
+        "default_translator_flv2",
+        {"cmd": 0x16, "param": 1},
+        {"cmd": "FAN_OSC", "type": "FAN", "arg0": 1.0},
+    ),
+    (
+        "default_translator_fanlamp_common",
+        {"cmd": 0x21, "param": 0x40, "arg0": 128, "arg1": 64},
+        {
+            "cmd": "LIGHT_CWW_COLD_WARM",
+            "type": "LIGHT",
+            "arg0": 0.501960813999176,
+            "arg1": 0.250980406999588,
+        },
+    ),
+    (
+        "default_translator_zjv0",
+        {"cmd": 0xB5, "arg1": 2, "arg2": 188},
+        {"cmd": "LIGHT_CWW_DIM", "type": "LIGHT", "arg0": 0.699999988079071},
+    ),
+    (
+        "default_translator_zjv1v2_common",
+        {"cmd": 0xD9, "arg0": 60},
+        {"cmd": "TIMER", "type": "CONTROLLER", "arg0": 3599.999755859375},
+    ),
+    (
+        "default_translator_agv3",
+        {"cmd": 0x20, "arg0": 77, "arg1": 200},
+        {
+            "cmd": "LIGHT_CWW_WARM_DIM",
+            "type": "LIGHT",
+            "arg0": 0.23000001907348633,
+            "arg1": 2.0,
+        },
+    ),
+    ("default_translator_zhimei_common_light", {"cmd": 0x99}, None),
+]
+
+
+def row(columns, translated, index):
+    # The command of a row of the batch result, as given by the single command evaluation
+    if not translated[index]:
+        return None
+    return {
+        name: column[index].item() if hasattr(column[index], "item") else column[index]
+        for name, column in columns.items()
+    }
+
+
+def check_refs(refs, ref_class, single, batch):
+    for trans_id, cmd, ref in refs:
+        translator = FullTranslator.Get(trans_id)
+        expected = None if ref is None else ref_class.host_cmd(ref)
+        assert single(translator, cmd) == expected, f"{trans_id}: {cmd}"
+        columns, translated = batch(
+            translator, {name: [val] for name, val in cmd.items()}
+        )
+        assert row(columns, translated, 0) == expected, f"{trans_id}: {cmd} (batch)"
+
+
+def test_g2e_refs():
+    check_refs(G2E_REFS, EncCmd, FullTranslator.g2e, g2e)
+
+
+def test_e2g_refs():
+    check_refs(E2G_REFS, GenCmd, FullTranslator.e2g, e2g)
+
+
+def sweep(translator, rand, size):
+    # Random generic and encoder commands, the encoder ones mostly with a 'cmd' known by the translator
+    gens = {
+        "cmd": [rand.choice(GEN_CMDS) for _ in range(size)],
+        "type": [rand.choice(ENT_TYPES) for _ in range(size)],
+        "index": [rand.randint(0, 2) for _ in range(size)],
+        "param": [rand.randint(0, 300) for _ in range(size)],
+    }
+    for arg in ["arg0", "arg1", "arg2"]:
+        gens[arg] = [
+            rand.choice([*GEN_ARGS, rand.uniform(-10.0, 300.0)]) for _ in range(size)
+        ]
+    enc_cmds = list(translator.get_host_tables()[1]) or [0]
+    encs = {
+        "cmd": [
+            rand.choice(enc_cmds) if rand.random() < 0.8 else rand.randint(0, 255)
+            for _ in range(size)
+        ]
+    }
+    for name in ["param", "arg0", "arg1", "arg2"]:
+        encs[name] = [rand.randint(0, 255) for _ in range(size)]
+    return gens, encs
+
+
+def run_sweep(size):
+    # Number of commands translated, durations of the batch and single command evaluations
+    rand = random.Random(1)
+    durations = [0.0, 0.0]
+    for translator in EVALUATED:
+        gens, encs = sweep(translator, rand, size)
+        for cmds, single, batch in [
+            (gens, translator.g2e, g2e),
+            (encs, translator.e2g, e2g),
+        ]:
+            start = time.perf_counter()
+            columns, translated = batch(translator, cmds)
+            durations[0] += time.perf_counter() - start
+            rows = [
+                {name: column[index] for name, column in cmds.items()}
+                for index in range(size)
+            ]
+            start = time.perf_counter()
+            expected = [single(cmd) for cmd in rows]
+            durations[1] += time.perf_counter() - start
+            for index, cmd in enumerate(rows):
+                assert row(columns, translated, index) == expected[index], (
+                    f"{translator._id}: {cmd}"
+                )
+    return 2 * size * len(EVALUATED), durations
+
+
+def test_batch_as_single():
+    run_sweep(2000)
+
+
+if __name__ == "__main__":
+    test_g2e_refs()
+    test_e2g_refs()
+    nb_cmds, (batch_duration, single_duration) = run_sweep(2000)
+    print(
+        f"{nb_cmds} commands translated: batch {batch_duration:.3f}s, single {single_duration:.3f}s"
+    )
+    print("OK")
@@ -0,0 +1,203 @@
+"""Batch versions with NumPy of the encoding utils of 'ble_adv_handler', for the analysis of large captures.
+
+The packets are handled as (N, L) arrays of uint8, one packet per row, and each util processes
+all the rows at once, with the same result as the C++ util of the same name for each row:
+    - reverse_all / whiten / checksum: BleAdvEncoder utils,
+    - crc16 / crc16be: esphome helpers, with the same parameters and defaults, table driven.
+The seeds and crc init values can be given per row as (N,) arrays, to try many of them at once.
+
+The translators are evaluated the same way on columns of commands, one (N,) array per field:
+    - g2e / e2g: FullTranslator.g2e / e2g of the rule objects of the component, for each row,
+      the float fields being float32, the uint8_t ones int64 wrapped to 0..255, the enums str objects.
+
+Typical use, when looking for the parameters of a new variant in a capture, from the 'tools' folder:
+    from ble_adv_batch import load_adv_data, crc16be, u16
+    data = load_adv_data(["capture.log"])[26]  # the packets with 26 bytes of data
+    buf = data[:, 2:]  # without the 2 bytes of header
+    seed = u16(buf, 20)
+    valid = crc16be(buf[:, :22], ~seed) == u16(buf, 22)  # the rows with a valid FanLamp V2 crc
+
+or to sweep the parameters of a translator:
+    from ble_adv_batch import g2e
+    from ble_adv_handler.translator import FullTranslator, get_default_translators
+    get_default_translators()
+    timers = {"cmd": ["TIMER"] * 7200, "type": ["CONTROLLER"] * 7200, "arg0": np.arange(7200) / 2}
+    encs, translated = g2e(FullTranslator.Get("default_translator_flv2"), timers)
+
+Requires numpy (not needed by the component): pip install numpy
+"""
+
+from functools import cache
+
+import numpy as np
+from ble_adv_decode import (
+    MAX_PACKET_LEN,
+    REVERSED_BYTES,
+    get_adv_data,
+    parse_hex_line,
+    read_lines,
+    whitening_keystream,
+)
+from ble_adv_handler.translator import EncCmd, GenCmd, host_cast
+
+REVERSED_BYTES_ARRAY = np.frombuffer(REVERSED_BYTES, dtype=np.uint8)
+
+# keystreams of all the whitening seeds, indexed by seed & 0x7F
+WHITENING_KEYSTREAMS = np.array(
+    [list(whitening_keystream(seed)) for seed in range(0x80)], dtype=np.uint8
+)
+
+
+#########################
+## Packets
+#########################
+def packets_to_array(packets, length=MAX_PACKET_LEN):
+    # (N, length) array of the packets, zero padded as the C++ buffers
+    return np.array(
+        [list(bytes(packet[:length]).ljust(length, b"\0")) for packet in packets],
+        dtype=np.uint8,
+    ).reshape(-1, length)
+
+
+def load_adv_data(files):
+    # The data of the packets of the capture files, as arrays grouped by data length
+    datas = {}
+    for _, _, line in read_lines(files):
+        raw = parse_hex_line(line)
+        data = get_adv_data(raw) if raw is not None else None
+        if data:
+            datas.setdefault(len(data), []).append(data)
+    return {
+        data_len: packets_to_array(data, data_len) for data_len, data in datas.items()
+    }
+
+
+def u16(bufs, start, big_endian=False):
+    # the uint16 at position start of each row
+    lo = bufs[:, start + (1 if big_endian else 0)].astype(np.uint16)
+    hi = bufs[:, start + (0 if big_endian else 1)].astype(np.uint16)
+    return lo | (hi << 8)
+
+
+def htons(vals):
+    vals = np.asarray(vals, dtype=np.uint16)
+    return (vals >> 8) | (vals << 8)
+
+
+#########################
+## Encoding utils
+#########################
+def reverse_all(bufs):
+    return REVERSED_BYTES_ARRAY[bufs]
+
+
+def whiten(bufs, seed):
+    # seed: a single seed or one per row
+    if bufs.shape[1] > MAX_PACKET_LEN:
+        raise ValueError(f"Packets longer than {MAX_PACKET_LEN} bytes")
+    seed = np.asarray(seed) & 0x7F
+    return bufs ^ WHITENING_KEYSTREAMS[seed, : bufs.shape[1]]
+
+
+def checksum(bufs):
+    return (bufs.sum(axis=1, dtype=np.uint32) & 0xFF).astype(np.uint8)
+
+
+@cache
+def _crc16_table(reverse_poly):
+    table = np.zeros(256, dtype=np.uint16)
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ reverse_poly if crc & 0x0001 else crc >> 1
+        table[i] = crc
+    return table
+
+
+@cache
+def _crc16be_table(poly):
+    table = np.zeros(256, dtype=np.uint16)
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly if crc & 0x8000 else crc << 1) & 0xFFFF
+        table[i] = crc
+    return table
+
+
+def _crc_init(bufs, crc):
+    # the crc init value of each row, from a single value or one per row (C++ implicit uint16_t cast)
+    return np.broadcast_to(
+        np.asarray(crc, dtype=np.int64).astype(np.uint16), (bufs.shape[0],)
+    ).copy()
+
+
+def crc16(bufs, crc=0xFFFF, reverse_poly=0xA001, refin=False, refout=False):
+    table = _crc16_table(reverse_poly)
+    crc = _crc_init(bufs, crc)
+    if refin:
+        crc ^= 0xFFFF
+    for col in bufs.T:
+        crc = (crc >> 8) ^ table[(crc ^ col) & 0xFF]
+    return crc ^ 0xFFFF if refout else crc
+
+
+def crc16be(bufs, crc=0, poly=0x1021, refin=False, refout=False):
+    table = _crc16be_table(poly)
+    crc = _crc_init(bufs, crc)
+    if refin:
+        crc ^= 0xFFFF
+    for col in bufs.T:
+        crc = (crc << 8) ^ table[(crc >> 8) ^ col]
+    return crc ^ 0xFFFF if refout else crc
+
+
+#########################
+## Translators
+#########################
+def host_columns(cmd_class, cmds, size):
+    # The columns of the commands by config name, from the given ones or the defaults of the C++ class:
+    # float32 for float fields, int64 wrapped as uint8 for uint8_t fields, str objects for enums
+    columns = {}
+    for name, default in cmd_class.HOST_DEFAULTS.items():
+        column = np.asarray(cmds[name]) if name in cmds else np.full(size, default)
+        if isinstance(default, str):
+            columns[name] = column.astype(object)
+        else:
+            columns[name] = host_cast(default, column)
+    return columns
+
+
+def translate(translator, cmds, direct=True):
+    # Batch version of FullTranslator.g2e (direct) / e2g, with the same result for each row:
+    # cmds are the columns of the command fields by config name, as in host_cmd, lists or (N,) arrays.
+    # Returns the columns of the translated commands, and the (N,) mask of the rows translated.
+    src_class, dst_class = (GenCmd, EncCmd) if direct else (EncCmd, GenCmd)
+    size = len(next(iter(cmds.values())))
+    src = host_columns(src_class, cmds, size)
+    dst = host_columns(dst_class, {}, size)
+    translated = np.zeros(size, dtype=bool)
+    for cmd_val, trans_cmds in translator.get_host_tables()[0 if direct else 1].items():
+        # first matching command in override order, as dispatched by the switch on 'cmd' in C++
+        pending = src["cmd"] == cmd_val
+        for trans in trans_cmds:
+            if not pending.any():
+                break
+            checked, executed = trans.get_host_sides(direct)
+            rows = np.flatnonzero(pending & checked.eval_cond(src, ["cmd"]))
+            from_values = {name: column[rows] for name, column in src.items()}
+            values = {name: column[rows] for name, column in dst.items()}
+            executed.eval_exec(values, from_values)
+            for name, column in dst.items():
+                column[rows] = values[name]
+            pending[rows] = False
+            translated[rows] = True
+    return dst, translated
+
+
+def g2e(translator, gens):
+    return translate(translator, gens, True)
+
+
+def e2g(translator, encs):
+    return translate(translator, encs, False)
@@ -0,0 +1,905 @@
+#!/usr/bin/python3
+
+"""Offline decoder of raw BLE ADV packets, as captured by 'log_raw' or given to the 'raw_decode' service.
+
+Decodes capture files of any size with the codecs of 'ble_adv_handler' ported in python:
+the codecs table (BLE_ADV_CODECS) and the translators are the ones of the component,
+the dispatch by data type / first header byte and the decoding steps are the ones of the C++ encoders.
+
+One packet per line, in any of the formats accepted by the 'raw_decode' service, or a 'log_raw' log line:
+    0201021B03F9084913F069254E3151BA32080A24CB3B7C71DC8BB89708D04C
+    02.01.02.1B.03.F9.08.49.13.F0.69.25.4E.31.51.BA.32.08.0A.24.CB.3B.7C.71.DC.8B.B8.97.08.D0.4C (31)
+    [13:59:59][D][ble_adv_handler:251]: raw - 02.01.02.1B.16.F0.08.10.00.16.2D.64.D5.B5.BD.22.39 ... (31)
+
+Each decoded packet gives a JSON line with the decoded command and the configuration parameters
+(encoding, variant, forced_id, index), one entry per codec able to decode it, as done by the device.
+The input is read as a stream and decoded by chunks in a pool of processes, keeping the output order.
+
+usage: tools/ble_adv_decode.py [-j JOBS] [--all] [-o OUTPUT] [file ...]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from itertools import islice
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "components"
+    ),
+)
+
+from ble_adv_handler.codec import BLE_ADV_CODECS
+from ble_adv_handler.translator import FullTranslator, get_default_translators
+
+MAX_PACKET_LEN = 31
+
+# BLE AD types, as in esp_gap_ble_api.h
+ESP_BLE_AD_TYPE_FLAG = 0x01
+ESP_BLE_AD_TYPE_16SRV_CMPL = 0x03
+ESP_BLE_AD_TYPE_SERVICE_DATA = 0x16
+ESP_BLE_AD_MANUFACTURER_SPECIFIC_TYPE = 0xFF
+DATA_TYPES = [
+    ESP_BLE_AD_TYPE_16SRV_CMPL,
+    ESP_BLE_AD_TYPE_SERVICE_DATA,
+    ESP_BLE_AD_MANUFACTURER_SPECIFIC_TYPE,
+]
+
+
+#########################
+## Raw packets
+#########################
+def parse_hex_line(line):
+    # Same clean-up as BleAdvParam::from_hex_string, also accepting 'log_raw' log lines. None if not a packet.
+    if "raw - " in line:
+        line = line.split("raw - ", 1)[1]
+    raw = line.split("(", 1)[0].replace(".", "").replace(" ", "").strip()
+    if raw[:2] == "0x":
+        raw = raw[2:]
+    try:
+        return bytes.fromhex(raw[: 2 * MAX_PACKET_LEN])
+    except ValueError:
+        return None
+
+
+def get_adv_param(raw):
+    # The data type and data of the advertising packet, found as in BleAdvParam::from_raw. None if no data.
+    buf = raw[:MAX_PACKET_LEN].ljust(MAX_PACKET_LEN, b"\0")
+    data_index = None
+    cur_len = 0
+    while cur_len < len(raw) - 2:
+        sub_len = buf[cur_len]
+        if sub_len + cur_len >= len(raw):
+            break
+        if buf[cur_len + 1] in DATA_TYPES:
+            data_index = cur_len
+        cur_len += sub_len + 1
+    if data_index is None:
+        return None
+    data_len = (buf[data_index] - 1) & 0xFF
+    # as the C++ buffer, the data not sent are zeros
+    return (
+        buf[data_index + 1],
+        buf[data_index + 2 : data_index + 2 + data_len].ljust(data_len, b"\0"),
+    )
+
+
+def get_adv_data(raw):
+    # The data of the advertising packet. None if no data.
+    param = get_adv_param(raw)
+    return param[1] if param else None
+
+
+#########################
+## Encoding utils, as in BleAdvEncoder
+#########################
+REVERSED_BYTES = bytes(int(f"{x:08b}"[::-1], 2) for x in range(256))
+
+
+def reverse_all(buf, start, length):
+    for i in range(start, start + length):
+        buf[i] = REVERSED_BYTES[buf[i]]
+
+
+@cache
+def whitening_keystream(seed):
+    keystream = bytearray(MAX_PACKET_LEN)
+    r = seed
+    for i in range(MAX_PACKET_LEN):
+        b = 0
+        for j in range(8):
+            r = (r << 1) & 0xFF
+            if r & 0x80:
+                r ^= 0x11
+                b |= 1 << j
+            r &= 0x7F
+        keystream[i] = b
+    return keystream
+
+
+def whiten(buf, start, length, seed):
+    keystream = whitening_keystream(seed & 0x7F)
+    for i in range(length):
+        buf[start + i] ^= keystream[i]
+
+
+def checksum(buf):
+    return sum(buf) & 0xFF
+
+
+def crc16be(buf, crc):
+    # esphome::crc16be, poly 0x1021, no reflection
+    crc &= 0xFFFF
+    for byte in buf:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = (
+                ((crc << 1) ^ 0x1021) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+            )
+    return crc
+
+
+def crc16le(buf, crc=0):
+    # esphome::crc16 with reverse poly 0x8408, refin and refout
+    crc ^= 0xFFFF
+    for byte in buf:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x8408 if crc & 1 else crc >> 1
+    return crc ^ 0xFFFF
+
+
+def htons(val):
+    return ((val & 0xFF) << 8) | (val >> 8)
+
+
+def not_even(val):
+    # C++ 'val ^= ((val & 1) - 1)' on a uint8_t: all bits flipped if even
+    return val if val & 1 else val ^ 0xFF
+
+
+#########################
+## AES-128 encryption, for the FanLamp V2 sign
+#########################
+def _aes_sbox():
+    sbox = [0] * 256
+    p = q = 1
+    while True:
+        p = p ^ ((p << 1) & 0xFF) ^ (0x1B if p & 0x80 else 0)
+        q ^= q << 1
+        q ^= q << 2
+        q ^= q << 4
+        q &= 0xFF
+        if q & 0x80:
+            q ^= 0x09
+        x = q
+        for shift in range(1, 5):
+            x ^= ((q << shift) | (q >> (8 - shift))) & 0xFF
+        sbox[p] = x ^ 0x63
+        if p == 1:
+            break
+    sbox[0] = 0x63
+    return sbox
+
+
+AES_SBOX = _aes_sbox()
+AES_XTIME = [((x << 1) ^ (0x1B if x & 0x80 else 0)) & 0xFF for x in range(256)]
+
+
+@cache
+def aes_key_schedule(key):
+    # the schedule only depends on the key, kept for the next packets with the same one
+    words = [list(key[i : i + 4]) for i in range(0, 16, 4)]
+    rcon = 1
+    for i in range(4, 44):
+        word = list(words[i - 1])
+        if i % 4 == 0:
+            word = [AES_SBOX[b] for b in word[1:] + word[:1]]
+            word[0] ^= rcon
+            rcon = AES_XTIME[rcon]
+        words.append([a ^ b for a, b in zip(words[i - 4], word)])
+    return [[b for word in words[4 * r : 4 * r + 4] for b in word] for r in range(11)]
+
+
+def aes_encrypt_block(key, block):
+    round_keys = aes_key_schedule(bytes(key))
+    state = [a ^ b for a, b in zip(block, round_keys[0])]
+    for rnd in range(1, 11):
+        state = [AES_SBOX[b] for b in state]
+        state = [state[(i + 4 * (i % 4)) % 16] for i in range(16)]  # shift rows
+        if rnd < 10:
+            mixed = []
+            for c in range(0, 16, 4):
+                a = state[c : c + 4]
+                t = a[0] ^ a[1] ^ a[2] ^ a[3]
+                mixed += [a[i] ^ t ^ AES_XTIME[a[i] ^ a[(i + 1) % 4]] for i in range(4)]
+            state = mixed
+        state = [a ^ b for a, b in zip(state, round_keys[rnd])]
+    return bytes(state)
+
+
+#########################
+## Codecs, as the C++ encoders of the same name, decoding only
+#########################
+class BleAdvEncoder:
+    def __init__(self, encoding, variant, header, translator_id):
+        self.encoding = encoding
+        self.variant = variant
+        self.header = bytes(header)
+        self.data_type = None  # adv data type of 'ble_param', set by the BleAdvDecoder
+        self.translator = FullTranslator.Get(translator_id)
+        self.len = 0
+
+    def get_id(self):
+        return f"{self.encoding} - {self.variant}"
+
+    def get_dispatch_key(self):
+        # as BLE_ADV_DISPATCH generated by codec.py, the data length being checked by decode
+        return (self.data_type, self.header[0]) if self.header else None
+
+    def decode(self, data):
+        # returns (enc, cont) as dicts, None if not decoded
+        if len(data) - len(self.header) != self.len or not data.startswith(self.header):
+            return None
+        buf = bytearray(data[len(self.header) :].ljust(MAX_PACKET_LEN, b"\0"))
+        return self.decode_buf(buf)
+
+    def decode_buf(self, buf):
+        raise NotImplementedError
+
+    def translate_e2g(self, enc):
+        gen = self.translator.e2g(enc)
+        if gen is None and self.translator.get_root()._id == "agarce_base":
+            gen = agarce_base_e2g(enc)
+        return gen
+
+
+def enc_cmd(cmd, param1=0, args=(0, 0, 0)):
+    return {
+        "cmd": cmd & 0xFF,
+        "param": param1,
+        "arg0": args[0],
+        "arg1": args[1],
+        "arg2": args[2],
+    }
+
+
+def cont_param(tx_count=0, index=0, id=0, seed=0, app_restart_count=0):
+    return {
+        "tx_count": tx_count,
+        "index": index & 0xFF,
+        "id": id,
+        "seed": seed,
+        "app_restart_count": app_restart_count,
+    }
+
+
+class FanLampEncoderV1(BleAdvEncoder):
+    FORMAT = struct.Struct("<BH3BBBBBHH")
+
+    def __init__(
+        self,
+        *base,
+        pair_arg3,
+        pair_arg_only_on_pair=True,
+        xor1=False,
+        supp_prefix=0x00,
+        forced_crc16_2=0x0000,
+    ):
+        super().__init__(*base)
+        self.prefix = bytes([0xAA, 0x98, 0x43, 0xAF, 0x0B, 0x46, 0x46, 0x46])
+        if supp_prefix != 0x00:
+            self.prefix = bytes([supp_prefix]) + self.prefix
+        self.pair_arg3 = pair_arg3
+        self.pair_arg_only_on_pair = pair_arg_only_on_pair
+        self.with_crc2 = supp_prefix == 0x00 or forced_crc16_2 != 0
+        self.xor1 = xor1
+        self.forced_crc16_2 = forced_crc16_2
+        self.len = len(self.prefix) + self.FORMAT.size + (2 if self.with_crc2 else 1)
+
+    def decode_buf(self, buf):
+        whiten(buf, 0, self.len, 0x6F)
+        reverse_all(buf, 0, self.len)
+        start = len(self.prefix)
+        cmd, group_index, *args, tx_count, param1, src, r2, seed, crc = (
+            self.FORMAT.unpack_from(buf, start)
+        )
+
+        if buf[:start] != self.prefix:
+            return None
+        if cmd == 0x28 and self.pair_arg3 != args[2]:
+            return None
+        if cmd != 0x28 and not self.pair_arg_only_on_pair and self.pair_arg3 != args[2]:
+            return None
+        if cmd != 0x28 and self.pair_arg_only_on_pair and args[2] != 0:
+            return None
+
+        seed = htons(seed)
+        seed8 = seed & 0xFF
+        if (seed8 ^ 1 if self.xor1 else seed8) != r2:
+            return None
+        if htons(crc16be(buf[start : start + self.FORMAT.size - 2], ~seed)) != crc:
+            return None
+        if args[2] != 0 and self.pair_arg3 != args[2]:
+            return None
+
+        if self.with_crc2:
+            (crc16_data_2,) = struct.unpack_from("<H", buf, self.len - 2)
+            if self.forced_crc16_2 != 0x00:
+                if self.forced_crc16_2 != crc16_data_2:
+                    return None
+            else:
+                crc16_mac = crc16be(buf[1:6], 0xFFFF)
+                crc16_2 = htons(
+                    crc16be(buf[start : start + self.FORMAT.size], crc16_mac)
+                )
+                if crc16_2 != crc16_data_2:
+                    return None
+
+        rem_id = src ^ seed8
+        return enc_cmd(cmd, param1, args), cont_param(
+            tx_count,
+            (group_index & 0x0F00) >> 8,
+            group_index + 256 * 256 * rem_id,
+            seed,
+        )
+
+
+class FanLampEncoderV2(BleAdvEncoder):
+    FORMAT = struct.Struct("<BHIBHBB2BHBHH")
+    XBOXES = bytes(
+        [
+            0xB7, 0xFD, 0x93, 0x26, 0x36, 0x3F, 0xF7, 0xCC, 0x34, 0xA5, 0xE5, 0xF1, 0x71, 0xD8, 0x31, 0x15,
+            0x04, 0xC7, 0x23, 0xC3, 0x18, 0x96, 0x05, 0x9A, 0x07, 0x12, 0x80, 0xE2, 0xEB, 0x27, 0xB2, 0x75,
+            0xD0, 0xEF, 0xAA, 0xFB, 0x43, 0x4D, 0x33, 0x85, 0x45, 0xF9, 0x02, 0x7F, 0x50, 0x3C, 0x9F, 0xA8,
+            0x51, 0xA3, 0x40, 0x8F, 0x92, 0x9D, 0x38, 0xF5, 0xBC, 0xB6, 0xDA, 0x21, 0x10, 0xFF, 0xF3, 0xD2,
+            0xE0, 0x32, 0x3A, 0x0A, 0x49, 0x06, 0x24, 0x5C, 0xC2, 0xD3, 0xAC, 0x62, 0x91, 0x95, 0xE4, 0x79,
+            0xE7, 0xC8, 0x37, 0x6D, 0x8D, 0xD5, 0x4E, 0xA9, 0x6C, 0x56, 0xF4, 0xEA, 0x65, 0x7A, 0xAE, 0x08,
+            0xE1, 0xF8, 0x98, 0x11, 0x69, 0xD9, 0x8E, 0x94, 0x9B, 0x1E, 0x87, 0xE9, 0xCE, 0x55, 0x28, 0xDF,
+            0x8C, 0xA1, 0x89, 0x0D, 0xBF, 0xE6, 0x42, 0x68, 0x41, 0x99, 0x2D, 0x0F, 0xB0, 0x54, 0xBB, 0x16,
+        ]
+    )  # fmt: skip
+    SIGN_KEY = bytes(
+        [
+            0,
+            0,
+            0,
+            0x0D,
+            0xBF,
+            0xE6,
+            0x42,
+            0x68,
+            0x41,
+            0x99,
+            0x2D,
+            0x0F,
+            0xB0,
+            0x54,
+            0xBB,
+            0x16,
+        ]
+    )
+
+    def __init__(self, *base, prefix, device_type, with_sign):
+        super().__init__(*base)
+        self.prefix = bytes(prefix)
+        self.device_type = device_type
+        self.with_sign = with_sign
+        self.len = len(self.prefix) + self.FORMAT.size
+
+    def sign(self, buf, tx_count, seed):
+        key = bytes([seed & 0xFF, seed >> 8, tx_count]) + self.SIGN_KEY[3:]
+        (sign,) = struct.unpack_from("<H", aes_encrypt_block(key, buf[:16]))
+        return 0xFFFF if sign == 0 else sign
+
+    def whiten_v2(self, buf, start, size, seed, salt=0):
+        for i in range(size):
+            buf[start + i] ^= (
+                self.XBOXES[((seed + i + 9) & 0x1F) + (salt & 0x3) * 0x20] ^ seed
+            )
+
+    def decode_buf(self, buf):
+        start = len(self.prefix)
+        (seed,) = struct.unpack_from("<H", buf, start + self.FORMAT.size - 4)
+        crc16 = crc16be(buf[: self.len - 2], ~seed)
+        self.whiten_v2(buf, 2, self.len - 6, seed & 0xFF)
+        (
+            tx_count,
+            dev_type,
+            identifier,
+            group_index,
+            cmd,
+            _,
+            param1,
+            *args,
+            sign,
+            _,
+            seed,
+            crc,
+        ) = self.FORMAT.unpack_from(buf, start)
+
+        if buf[:start] != self.prefix:
+            return None
+        if self.device_type != dev_type:
+            return None
+        if self.with_sign and self.sign(buf[1:], tx_count, seed) != sign:
+            return None
+        if not self.with_sign and sign != 0:
+            return None
+        if crc16 != crc:
+            return None
+        return enc_cmd(cmd, param1, args + [0]), cont_param(
+            tx_count, group_index, identifier, seed
+        )
+
+
+class ZhijiaEncoder(BleAdvEncoder):
+    def __init__(self, *base, mac):
+        super().__init__(*base)
+        self.mac = bytes(mac)
+
+    @staticmethod
+    def uuid_to_id(uuid):
+        return int.from_bytes(bytes(uuid), "big")
+
+
+class ZhijiaEncoderV0(ZhijiaEncoder):
+    ADDR_LEN = 3
+    TXDATA_LEN = 8
+
+    def __init__(self, *base, mac):
+        super().__init__(*base, mac=mac)
+        self.len = self.ADDR_LEN + self.TXDATA_LEN + 2
+
+    def decode_buf(self, buf):
+        whiten(buf, 0, self.len, 0x37)
+        whiten(buf, 0, self.len, 0x7F)
+        (crc,) = struct.unpack_from("<H", buf, self.ADDR_LEN + self.TXDATA_LEN)
+        if crc16le(buf[: self.ADDR_LEN + self.TXDATA_LEN]) != crc:
+            return None
+        reverse_all(buf, 0, self.ADDR_LEN)
+        if bytes(reversed(buf[: self.ADDR_LEN])) != self.mac[: self.ADDR_LEN]:
+            return None
+
+        txdata = buf[self.ADDR_LEN : self.ADDR_LEN + self.TXDATA_LEN]
+        tx_count = txdata[0] ^ txdata[6]
+        arg0 = tx_count ^ txdata[7]
+        pivot = txdata[1] ^ arg0
+        uuid = [pivot ^ txdata[0], pivot ^ txdata[5]]
+        args = [arg0, pivot ^ txdata[3], uuid[0] ^ txdata[6]]
+        return enc_cmd(pivot ^ txdata[4], 0, args), cont_param(
+            tx_count, pivot ^ txdata[2], self.uuid_to_id(uuid)
+        )
+
+
+class ZhijiaEncoderV1(ZhijiaEncoder):
+    MAC_LEN = 4
+    ADDR_LEN = 3
+    TXDATA_LEN = 16
+
+    def __init__(self, *base, mac, uid_start=0):
+        super().__init__(*base, mac=mac)
+        self.uid_start = uid_start
+        self.len = self.MAC_LEN + self.TXDATA_LEN + 1 + 2
+
+    def from_txdata(self, txdata):
+        tx_count = txdata[4]
+        cmd = txdata[9]
+        addr = bytes([txdata[7], txdata[10], txdata[13] ^ tx_count])
+        uuid = [txdata[2], txdata[12] ^ txdata[2], txdata[15] ^ cmd]
+        if self.mac[self.uid_start : self.uid_start + self.ADDR_LEN] != addr:
+            return None
+        return enc_cmd(cmd, 0, [txdata[0], txdata[3], txdata[5]]), cont_param(
+            tx_count, txdata[6], self.uuid_to_id(uuid)
+        )
+
+    @staticmethod
+    def xor_all(buf, pivot):
+        return bytes(x ^ pivot for x in buf)
+
+    def decode_buf(self, buf):
+        whiten(buf, 0, self.len, 0x37)
+        (crc,) = struct.unpack_from("<H", buf, self.len - 2)
+        if crc16le(buf[: self.len - 2]) != crc:
+            return None
+        reverse_all(buf, 0, self.MAC_LEN)
+        if bytes(reversed(buf[: self.MAC_LEN])) != self.mac[: self.MAC_LEN]:
+            return None
+
+        pivot = buf[self.MAC_LEN + self.TXDATA_LEN]
+        txdata = self.xor_all(buf[self.MAC_LEN : self.MAC_LEN + self.TXDATA_LEN], pivot)
+        decoded = self.from_txdata(txdata)
+        if decoded is None:
+            return None
+        if txdata[7] != txdata[14] or txdata[8] != 0x00 or txdata[11] != 0x00:
+            return None
+        re_pivot = not_even(
+            txdata[2] ^ txdata[4] ^ txdata[9] ^ txdata[12] ^ txdata[13] ^ txdata[15]
+        )
+        if re_pivot != pivot:
+            return None
+        return decoded
+
+
+class ZhijiaEncoderV2(ZhijiaEncoderV1):
+    def __init__(self, *base, mac):
+        super().__init__(*base, mac=mac)
+        self.len = self.TXDATA_LEN + 1 + 7
+
+    def decode_buf(self, buf):
+        whiten(buf, 0, self.len, 0x6F)
+        whiten(buf, 0, self.len - 2, 0xD3)
+        pivot = buf[self.TXDATA_LEN]
+        txdata = self.xor_all(buf[: self.TXDATA_LEN], pivot)
+        decoded = self.from_txdata(txdata)
+        if decoded is None:
+            return None
+        if (
+            not_even(txdata[3] ^ txdata[7] ^ txdata[12] ^ txdata[13] ^ txdata[15])
+            != pivot
+        ):
+            return None
+        if (
+            txdata[2] ^ txdata[3] ^ txdata[4] ^ txdata[7] != txdata[8]
+            or txdata[11] != 0x00
+        ):
+            return None
+        if txdata[2] ^ txdata[3] ^ txdata[4] ^ txdata[9] != txdata[14]:
+            return None
+        return decoded
+
+
+class ZhijiaEncoderRemote(ZhijiaEncoderV1):
+    def __init__(self, *base, mac):
+        super().__init__(*base, mac=mac)
+        self.len = self.TXDATA_LEN + 1
+
+    def decode_buf(self, buf):
+        # workaround for pivot: at pos 5 is arg2 which is always 0, so effective pivot has this value
+        txdata = self.xor_all(buf[: self.TXDATA_LEN], buf[5])
+        decoded = self.from_txdata(txdata)
+        if decoded is None:
+            return None
+        if txdata[8] != 0x01 or txdata[11] != 0x02 or txdata[2] != txdata[14]:
+            return None
+        return decoded
+
+
+class ZhimeiEncoderV0(BleAdvEncoder):
+    FORMAT = struct.Struct("<BBHB3BB")
+
+    def __init__(self, *base):
+        super().__init__(*base)
+        self.len = self.FORMAT.size
+
+    def decode_buf(self, buf):
+        index, tx_count, id, cmd, *args, cks = self.FORMAT.unpack_from(buf)
+        if checksum(self.header + buf[: self.len - 1]) != cks:
+            return None
+        return enc_cmd(cmd, 0, args), cont_param(tx_count, index, id)
+
+
+class ZhimeiEncoderV1(BleAdvEncoder):
+    FORMAT = struct.Struct("<BBBIBBBB3BH6B")
+    MATRIX = bytes(
+        [29, 4, 17, 32, 152, 117, 40, 70, 11, 175, 67, 172, 214, 190, 137, 142]
+    )
+    PAD_LEN = 6
+
+    def __init__(self, *base):
+        super().__init__(*base)
+        self.len = self.FORMAT.size
+
+    def decrypt(self, buf, start, length, key):
+        pivot = ((buf[start] - self.MATRIX[key & 0xF]) ^ 0xFF) & 0xFF
+        for i in range(length):
+            buf[start + i] = (
+                (buf[start + i] - self.MATRIX[(key + i) & 0xF]) & 0xFF
+            ) ^ pivot
+
+    def decode_buf(self, buf):
+        data_len = self.len - self.PAD_LEN
+        self.decrypt(buf, 0, data_len, 6)
+        crc16 = crc16be(buf[: data_len - 3], 0)
+        if buf[7] != 0xB4:  # cmd
+            self.decrypt(buf, 9, 5, 10)
+        ff0, seed, tx_count, id, cmd, index, ff9, tx2, *fields = (
+            self.FORMAT.unpack_from(buf)
+        )
+        args, crc, padding = fields[:3], fields[3], fields[4:]
+        if cmd != 0xB4 and tx_count != tx2:
+            return None
+        if crc16 != crc or ff0 != 0xFF or ff9 != 0xFF:
+            return None
+        if padding != [data_len + i for i in range(self.PAD_LEN)]:
+            return None
+        return enc_cmd(cmd, 0, args), cont_param(tx_count, index, id, seed)
+
+
+class ZhimeiEncoderV2(BleAdvEncoder):
+    PREFIX = bytes([0x33, 0xAA, 0x55])
+    TXDATA_LEN = 8
+    PAD_LEN = 10
+
+    def __init__(self, *base):
+        super().__init__(*base)
+        self.len = len(self.PREFIX) + self.TXDATA_LEN + 2 + self.PAD_LEN
+
+    @staticmethod
+    def crc16(buf):
+        pre_cec = crc16be(bytes(REVERSED_BYTES[x] for x in buf), 0xFFFF)
+        return 0xFFFF ^ (
+            (REVERSED_BYTES[pre_cec & 0xFF] << 8) | REVERSED_BYTES[pre_cec >> 8]
+        )
+
+    def decode_buf(self, buf):
+        whiten(buf, 0, self.len - self.PAD_LEN, 0x48)
+        if buf[: len(self.PREFIX)] != self.PREFIX:
+            return None
+        crc_start = self.len - self.PAD_LEN - 2
+        (crc,) = struct.unpack_from("<H", buf, crc_start)
+        if self.crc16(buf[:crc_start]) != crc:
+            return None
+        padding = list(buf[self.len - self.PAD_LEN : self.len])
+        if padding != [self.len - self.PAD_LEN + i + 3 for i in range(self.PAD_LEN)]:
+            return None
+
+        txdata = buf[len(self.PREFIX) : len(self.PREFIX) + self.TXDATA_LEN]
+        pivot = txdata[0] ^ txdata[1] ^ txdata[6] ^ txdata[7]
+        args = [txdata[1] ^ pivot, txdata[3] ^ pivot, txdata[6] ^ txdata[0] ^ pivot]
+        return enc_cmd(txdata[4] ^ pivot, 0, args), cont_param(
+            txdata[7] ^ txdata[1] ^ pivot,
+            txdata[2] ^ pivot,
+            (txdata[5] ^ pivot) << 8 | (txdata[0] ^ pivot),
+        )
+
+
+class AgarceEncoder(BleAdvEncoder):
+    FORMAT = struct.Struct("<BHBBHIB3BBBB")
+    MATRIX = bytes([0xAA, 0xBB, 0xCC, 0xDD, 0x5A, 0xA5, 0xA5, 0x5A])
+
+    def __init__(self, *base, prefix):
+        super().__init__(*base)
+        self.prefix = prefix
+        self.len = self.FORMAT.size
+
+    def crypt(self, buf, start, length, seed):
+        pivots = [seed & 0xFF, seed >> 8]
+        for i in range(length):
+            buf[start + i] ^= self.MATRIX[i % 8] ^ pivots[(i + 1) // 2 % 2]
+
+    def decode_buf(self, buf):
+        if checksum(buf[: self.len - 1]) != buf[self.len - 1]:
+            return None
+        (seed,) = struct.unpack_from("<H", buf, 1)
+        self.crypt(buf, 3, self.len - 4, seed)
+        if checksum(buf[3 : self.len - 2]) != buf[self.len - 2]:
+            return None
+
+        prefix, seed, tx_count, app_restart_count, _, id, tx0, *args, tx4, _, _ = (
+            self.FORMAT.unpack_from(buf)
+        )
+        cmd = tx0 & 0xF0
+        # Exclude Group Commands, and wrong prefix
+        if cmd == 0x00 and args[1] == 0x00:
+            return None
+        if cmd != 0x00 and prefix != self.prefix:
+            return None
+        if cmd == 0x00 and prefix != (self.prefix & 0x0F):
+            return None
+        index = ((tx4 & 0x0F) << 4) | (args[2] if cmd == 0x00 else tx0 & 0x0F)
+        return enc_cmd(cmd, 0, args), cont_param(
+            tx_count, index, id, seed, app_restart_count
+        )
+
+
+class RemoteEncoder(BleAdvEncoder):
+    FORMAT = struct.Struct("<BIBBB")
+
+    def __init__(self, *base):
+        super().__init__(*base)
+        self.len = self.FORMAT.size
+
+    def decode_buf(self, buf):
+        press_count, identifier, cmd, tx_count, cks = self.FORMAT.unpack_from(buf)
+        if checksum(buf[: self.len - 1]) != cks:
+            return None
+        return enc_cmd(cmd & 0x3F, 0, [press_count, cmd & 0xC0, 0]), cont_param(
+            tx_count, 0, identifier
+        )
+
+
+def agarce_base_e2g(enc):
+    # BleAdvTranslator_agarce_base, hard coded in the software
+    if enc["cmd"] != 0x80:
+        return None
+    arg0, arg1, arg2 = enc["arg0"], enc["arg1"], enc["arg2"]
+    param = (2 if arg2 & 0x01 else 0) | (4 if arg2 & 0x02 else 0)
+    param |= (1 if arg2 & 0x08 else 0) | (8 if arg2 & 0x10 else 0)
+    return {
+        "cmd": "FAN_FULL",
+        "type": "FAN",
+        "index": 0,
+        "param": param,
+        "arg0": float(arg0 & 0x0F if arg0 & 0x80 else 0),
+        "arg1": float((arg0 & 0x10) > 0),
+        "arg2": float(arg1),
+    }
+
+
+# Keyword arguments of the python codecs, in the order of the C++ constructors
+CODEC_ARGS = {
+    "FanLampEncoderV1": [
+        "pair_arg3",
+        "pair_arg_only_on_pair",
+        "xor1",
+        "supp_prefix",
+        "forced_crc16_2",
+    ],
+    "FanLampEncoderV2": ["prefix", "device_type", "with_sign"],
+    "ZhijiaEncoderV0": ["mac"],
+    "ZhijiaEncoderV1": ["mac", "uid_start"],
+    "ZhijiaEncoderV2": ["mac"],
+    "ZhijiaEncoderRemote": ["mac"],
+    "ZhimeiEncoderV0": [],
+    "ZhimeiEncoderV1": [],
+    "ZhimeiEncoderV2": [],
+    "AgarceEncoder": ["prefix"],
+    "RemoteEncoder": [],
+}
+
+
+#########################
+## Decoding
+#########################
+class BleAdvDecoder:
+    # The codecs of BLE_ADV_CODECS, dispatched by data type and first header byte as by the BleAdvHandler
+    def __init__(self):
+        get_default_translators()
+        self.encoders = []
+        self.encoders_index = {}
+        for encoding, data in BLE_ADV_CODECS.items():
+            for variant, data_var in data["variants"].items():
+                class_name = data_var["class"]
+                kwargs = dict(zip(CODEC_ARGS[class_name], data_var["args"]))
+                encoder = globals()[class_name](
+                    encoding,
+                    variant,
+                    data_var["header"],
+                    data_var["translator"],
+                    **kwargs,
+                )
+                encoder.data_type = data_var["ble_param"][1]
+                self.encoders_index.setdefault(encoder.get_dispatch_key(), []).append(
+                    len(self.encoders)
+                )
+                self.encoders.append(encoder)
+
+    def decode(self, raw):
+        param = get_adv_param(raw)
+        if not param or not param[1]:
+            return []
+        data_type, data = param
+        decoded = []
+        # the codecs without header are tried on all the packets, in registration order
+        indexes = self.encoders_index.get((data_type, data[0]), [])
+        for index in sorted(indexes + self.encoders_index.get(None, [])):
+            encoder = self.encoders[index]
+            res = encoder.decode(data)
+            if res is None:
+                continue
+            enc, cont = res
+            decoded.append(
+                {
+                    "codec": encoder.get_id(),
+                    "encoding": encoder.encoding,
+                    "variant": encoder.variant,
+                    "forced_id": f"0x{cont['id']:X}",
+                    "index": cont["index"],
+                    "tx_count": cont["tx_count"],
+                    "enc": enc,
+                    "gen": encoder.translate_e2g(enc),
+                }
+            )
+        return decoded
+
+
+_decoder = None
+
+
+def init_worker():
+    global _decoder
+    _decoder = BleAdvDecoder()
+
+
+def decode_chunk(chunk):
+    results = []
+    for source, line_nb, line in chunk:
+        raw = parse_hex_line(line)
+        if raw is None:
+            continue
+        results.append(
+            {
+                "file": source,
+                "line": line_nb,
+                "raw": raw.hex(".").upper(),
+                "decoded": _decoder.decode(raw),
+            }
+        )
+    return results
+
+
+def read_lines(files):
+    for file in files:
+        source = "-" if file == "-" else file
+        with (
+            sys.stdin
+            if file == "-"
+            else open(file, encoding="utf-8", errors="replace") as stream
+        ):
+            for line_nb, line in enumerate(stream, 1):
+                yield (source, line_nb, line)
+
+
+def decode_all(files, jobs, chunk_size):
+    # Decode by chunks in a pool of processes, with a bounded number of chunks in flight
+    # to keep the memory constant whatever the input size, yielding the results in the input order
+    lines = read_lines(files)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker) as pool:
+        pending = deque()
+        while True:
+            while len(pending) < 2 * jobs:
+                chunk = list(islice(lines, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(decode_chunk, chunk))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline decoding of raw BLE ADV packets."
+    )
+    parser.add_argument(
+        "files", nargs="*", default=["-"], help="capture files, '-' for stdin (default)"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=argparse.FileType("w", encoding="utf-8"),
+        default=sys.stdout,
+        help="output file, stdout by default",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count(), help="number of processes"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=5000, help="number of lines per task"
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="also output the packets not decoded"
+    )
+    args = parser.parse_args()
+
+    nb_packets = 0
+    nb_decoded = 0
+    with args.output as output:
+        for result in decode_all(args.files, args.jobs, args.chunk_size):
+            nb_packets += 1
+            if result["decoded"]:
+                nb_decoded += 1
+            if result["decoded"] or args.all:
+                output.write(json.dumps(result) + "\n")
+    print(f"{nb_packets} packets, {nb_decoded} decoded.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()